@@ -0,0 +1,454 @@
+"""
+agregador.py
+
+Agregación en línea y de memoria constante de los resultados de un torneo.
+
+En lugar de guardar todos los resultados y resumirlos al final, el coordinador
+actualiza, al llegar cada partida, los acumulados de su pareja de estrategias:
+
+- Contadores exactos (victorias, disparos, aciertos, mensajes...).
+- Media y varianza de turnos y duración con el algoritmo de Welford.
+- Bocetos de cuantiles para turnos y duración con error relativo acotado, al estilo
+  de DDSketch: cada valor cae en la cubeta ceil(log_gamma(x)), con
+  gamma = (1 + alfa) / (1 - alfa), y cualquier cuantil se estima con un error relativo
+  menor que alfa. El número de cubetas depende del rango de valores, no del número de
+  partidas, y se limita con MAX_CUBETAS.
+
+Todos los acumulados se pueden fusionar (la media y varianza con la fórmula de Chan y
+los bocetos sumando cubetas), así que los agregadores de varios coordinadores o ranks
+se combinan en uno solo, por ejemplo con comm.reduce(..., op=fusionar_agregadores).
+Para no serializar los objetos con pickle, AgregadorTorneo.empaquetar() los convierte
+en arrays de NumPy (contadores que se suman, estados de Welford y cubetas de los
+bocetos) que lotes.py combina con Reduce, Gather y Gatherv, y
+AgregadorTorneo.desempaquetar() rehace el agregador a partir de ellos.
+
+Con los contadores de victorias, CriterioParada decide cuándo el porcentaje de
+victorias de una pareja ya se conoce con suficiente precisión (parada adaptativa de
+main.py): cuando el intervalo de Wilson es más estrecho que un ancho objetivo, o
+cuando un intervalo más exigente (z_decision) excluye el 50 % y el ganador está
+decidido. Usar un z mayor que el del intervalo compensa que el criterio se compruebe
+tras cada partida, al estilo de las pruebas secuenciales de Pocock.
+
+Clases:
+- Welford: media y varianza en línea.
+- BocetoCuantiles: cuantiles aproximados con error relativo acotado.
+- AgregadorPareja: acumulados de una pareja de estrategias.
+- AgregadorTorneo: agregadores por pareja e impresión del progreso.
+- CriterioParada: parada secuencial por pareja según el intervalo de victorias.
+
+Funciones:
+- intervalo_wilson(): intervalo de confianza de Wilson de una proporción.
+- fusionar_agregadores(): fusiona dos AgregadorTorneo (operación para reduce).
+"""
+
+import math
+import time
+import numpy as np
+
+from instrumentacion import Instrumentacion
+
+# Error relativo de los cuantiles y número máximo de cubetas de cada boceto
+ALFA_CUANTILES = 0.01
+MAX_CUBETAS = 2048
+
+# Contadores de AgregadorPareja que tienen todas las partidas, también las locales
+CONTADORES_LOTE = (
+    "j0_gana", "j1_gana", "disparos_j0", "disparos_j1", "aciertos_j0", "aciertos_j1",
+)
+
+
+class Welford:
+    """
+    Media y varianza en línea, numéricamente estables.
+    """
+
+    __slots__ = ("n", "media", "m2")
+
+    def __init__(self):
+        self.n = 0
+        self.media = 0.0
+        self.m2 = 0.0   # Suma de cuadrados de las desviaciones a la media
+
+    def actualizar(self, x):
+        self.n += 1
+        delta = x - self.media
+        self.media += delta / self.n
+        self.m2 += delta * (x - self.media)
+
+    def actualizar_lote(self, valores):
+        """
+        Añade un array de valores de una vez.
+        """
+        if len(valores):
+            lote = Welford()
+            lote.n = len(valores)
+            lote.media = float(np.mean(valores))
+            lote.m2 = float(np.sum((valores - lote.media) ** 2))
+            self.fusionar(lote)
+
+    def fusionar(self, otro):
+        """
+        Combina los acumulados de otro Welford (fórmula de Chan).
+        """
+        n = self.n + otro.n
+        if not n:
+            return self
+        delta = otro.media - self.media
+        self.media += delta * otro.n / n
+        self.m2 += otro.m2 + delta * delta * self.n * otro.n / n
+        self.n = n
+        return self
+
+    @property
+    def varianza(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def desviacion(self):
+        return math.sqrt(self.varianza)
+
+
+class BocetoCuantiles:
+    """
+    Boceto de cuantiles con error relativo alfa para valores no negativos.
+    """
+
+    __slots__ = ("alfa", "gamma", "log_gamma", "cubetas", "ceros", "n")
+
+    def __init__(self, alfa=ALFA_CUANTILES):
+        self.alfa = alfa
+        self.gamma = (1 + alfa) / (1 - alfa)
+        self.log_gamma = math.log(self.gamma)
+        self.cubetas = {}   # Índice de cubeta -> número de valores
+        self.ceros = 0      # Valores <= 0 (p. ej. duraciones redondeadas a 0)
+        self.n = 0
+
+    def anadir(self, x):
+        self.n += 1
+        if x <= 0:
+            self.ceros += 1
+            return
+        k = math.ceil(math.log(x) / self.log_gamma)
+        self.cubetas[k] = self.cubetas.get(k, 0) + 1
+        if len(self.cubetas) > MAX_CUBETAS:
+            self._colapsar()
+
+    def anadir_lote(self, valores):
+        """
+        Añade un array de valores de una vez.
+        """
+        valores = np.asarray(valores, dtype=np.float64)
+        positivos = valores[valores > 0]
+        self.n += len(valores)
+        self.ceros += len(valores) - len(positivos)
+        indices, cuentas = np.unique(np.ceil(np.log(positivos) / self.log_gamma), return_counts=True)
+        for k, c in zip(indices.astype(np.int64).tolist(), cuentas.tolist()):
+            self.cubetas[k] = self.cubetas.get(k, 0) + c
+        if len(self.cubetas) > MAX_CUBETAS:
+            self._colapsar()
+
+    def _colapsar(self):
+        # Se pierde precisión en los valores más pequeños, los menos interesantes
+        # para tiempos y turnos: las cubetas más bajas se unen a la primera que queda.
+        indices = sorted(self.cubetas)
+        sobrantes = indices[:len(indices) - MAX_CUBETAS]
+        destino = indices[len(sobrantes)]
+        for k in sobrantes:
+            self.cubetas[destino] += self.cubetas.pop(k)
+
+    def fusionar(self, otro):
+        if otro.alfa != self.alfa:
+            raise ValueError("Solo se pueden fusionar bocetos con el mismo error relativo.")
+        self.n += otro.n
+        self.ceros += otro.ceros
+        for k, c in otro.cubetas.items():
+            self.cubetas[k] = self.cubetas.get(k, 0) + c
+        if len(self.cubetas) > MAX_CUBETAS:
+            self._colapsar()
+        return self
+
+    def cuantil(self, q):
+        """
+        Devuelve una estimación del cuantil q (0 <= q <= 1), o None si está vacío.
+        """
+        if not self.n:
+            return None
+        rango = q * (self.n - 1)
+        acumulado = self.ceros
+        if acumulado > rango:
+            return 0.0
+        for k in sorted(self.cubetas):
+            acumulado += self.cubetas[k]
+            if acumulado > rango:
+                return 2 * self.gamma ** k / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.cubetas) / (self.gamma + 1)
+
+
+class AgregadorPareja:
+    """
+    Acumulados de todas las partidas de una pareja de estrategias.
+    """
+
+    CONTADORES = CONTADORES_LOTE + ("partidas_mpi", "mensajes", "bytes")
+
+    def __init__(self):
+        for campo in self.CONTADORES:
+            setattr(self, campo, 0)
+        self.turnos = Welford()
+        self.duracion = Welford()
+        self.cuantiles_turnos = BocetoCuantiles()
+        self.cuantiles_duracion = BocetoCuantiles()
+        self.instrumentacion = None
+        self.parada = None   # Motivo de la parada adaptativa, si se ha detenido
+
+    @property
+    def partidas(self):
+        return self.j0_gana + self.j1_gana
+
+    def actualizar(self, r):
+        """
+        Añade el diccionario de resultado de una partida.
+        """
+        if r["ganador"] == 0:
+            self.j0_gana += 1
+        else:
+            self.j1_gana += 1
+        self.disparos_j0 += r["disparos_j0"]
+        self.disparos_j1 += r["disparos_j1"]
+        self.aciertos_j0 += r["aciertos_j0"]
+        self.aciertos_j1 += r["aciertos_j1"]
+        # Solo las partidas jugadas por MPI informan de su comunicación
+        if "mensajes" in r:
+            self.partidas_mpi += 1
+            self.mensajes += r["mensajes"]
+            self.bytes += r["bytes"]
+        if "instrumentacion" in r:
+            if self.instrumentacion is None:
+                self.instrumentacion = Instrumentacion(partidas=0)
+            self.instrumentacion.acumular_partida(r["instrumentacion"])
+
+        self.turnos.actualizar(r["turnos"])
+        self.duracion.actualizar(r["duracion"])
+        self.cuantiles_turnos.anadir(r["turnos"])
+        self.cuantiles_duracion.anadir(r["duracion"])
+
+    def actualizar_lote(self, registros):
+        """
+        Añade un bloque de partidas con los campos de lotes.DTYPE_RESULTADO (un array
+        estructurado o un diccionario de arrays).
+        """
+        self.j0_gana += int(np.count_nonzero(registros["ganador"] == 0))
+        self.j1_gana += int(np.count_nonzero(registros["ganador"] == 1))
+        for campo in ("disparos_j0", "disparos_j1", "aciertos_j0", "aciertos_j1"):
+            setattr(self, campo, getattr(self, campo) + int(np.sum(registros[campo])))
+        self.turnos.actualizar_lote(registros["turnos"])
+        self.duracion.actualizar_lote(registros["duracion"])
+        self.cuantiles_turnos.anadir_lote(registros["turnos"])
+        self.cuantiles_duracion.anadir_lote(registros["duracion"])
+
+    def fusionar(self, otro):
+        for campo in self.CONTADORES:
+            setattr(self, campo, getattr(self, campo) + getattr(otro, campo))
+        self.turnos.fusionar(otro.turnos)
+        self.duracion.fusionar(otro.duracion)
+        self.cuantiles_turnos.fusionar(otro.cuantiles_turnos)
+        self.cuantiles_duracion.fusionar(otro.cuantiles_duracion)
+        if otro.instrumentacion is not None:
+            if self.instrumentacion is None:
+                self.instrumentacion = otro.instrumentacion
+            else:
+                self.instrumentacion.acumular_partida(otro.instrumentacion)
+        return self
+
+
+class AgregadorTorneo:
+    """
+    Agregadores por pareja de estrategias de un torneo, con impresión periódica del
+    progreso.
+    """
+
+    def __init__(self, total=None, intervalo_progreso=None):
+        """
+        Parámetros:
+            total: partidas esperadas, para mostrar el porcentaje completado.
+            intervalo_progreso: segundos entre impresiones del progreso (None para
+                                no imprimirlo).
+        """
+        self.parejas = {}
+        self.total = total
+        self.intervalo_progreso = intervalo_progreso
+        self.partidas = 0
+        self.inicio = time.perf_counter()
+        self.ultimo_progreso = self.inicio
+
+    def pareja(self, e0, e1):
+        agregador = self.parejas.get((e0, e1))
+        if agregador is None:
+            agregador = self.parejas[(e0, e1)] = AgregadorPareja()
+        return agregador
+
+    def actualizar(self, r):
+        """
+        Añade el resultado de una partida a su pareja de estrategias.
+        """
+        self.pareja(r["estrategia_j0"], r["estrategia_j1"]).actualizar(r)
+        self.partidas += 1
+        self.progreso()
+
+    def actualizar_lote(self, e0, e1, registros):
+        self.pareja(e0, e1).actualizar_lote(registros)
+        self.partidas += len(registros["ganador"])
+        self.progreso()
+
+    def fusionar(self, otro):
+        for clave, agregador in otro.parejas.items():
+            if clave in self.parejas:
+                self.parejas[clave].fusionar(agregador)
+            else:
+                self.parejas[clave] = agregador
+        self.partidas += otro.partidas
+        return self
+
+    def empaquetar(self, parejas):
+        """
+        Empaqueta los acumulados de las parejas indicadas, en ese orden, en arrays de
+        NumPy. Solo incluye los campos de las partidas locales (CONTADORES_LOTE): la
+        comunicación y la instrumentación de las partidas por MPI no se empaquetan.
+
+        Returns:
+            (contadores, welford, cubetas):
+            - contadores: int64 (parejas, len(CONTADORES_LOTE) + 4), con los contadores
+              y los ceros y valores de los dos bocetos; se combinan sumándolos.
+            - welford: float64 (parejas, 2, 3), (n, media, m2) de turnos y duración.
+            - cubetas: int64 (cubetas, 4), filas (pareja, boceto, cubeta, cuenta) con
+              boceto 0 para turnos y 1 para duración.
+        """
+        contadores = np.zeros((len(parejas), len(CONTADORES_LOTE) + 4), dtype=np.int64)
+        welford = np.zeros((len(parejas), 2, 3), dtype=np.float64)
+        cubetas = []
+        for i, clave in enumerate(parejas):
+            pareja = self.parejas.get(clave)
+            if pareja is None:
+                continue
+            bocetos = (pareja.cuantiles_turnos, pareja.cuantiles_duracion)
+            contadores[i] = [getattr(pareja, campo) for campo in CONTADORES_LOTE] + [
+                valor for boceto in bocetos for valor in (boceto.ceros, boceto.n)
+            ]
+            for j, acumulado in enumerate((pareja.turnos, pareja.duracion)):
+                welford[i, j] = acumulado.n, acumulado.media, acumulado.m2
+            for j, boceto in enumerate(bocetos):
+                cubetas.extend((i, j, k, c) for k, c in boceto.cubetas.items())
+        return contadores, welford, np.array(cubetas, dtype=np.int64).reshape(-1, 4)
+
+    @classmethod
+    def desempaquetar(cls, parejas, contadores, welford, cubetas):
+        """
+        Rehace un agregador a partir de lo que devuelve empaquetar() en varios ranks:
+        los contadores ya sumados, los estados de Welford de todos los ranks
+        (float64 (ranks, parejas, 2, 3)) y sus cubetas concatenadas.
+        """
+        agregador = cls()
+        for i, clave in enumerate(parejas):
+            pareja = agregador.pareja(*clave)
+            fila = contadores[i].tolist()
+            for campo, valor in zip(CONTADORES_LOTE, fila):
+                setattr(pareja, campo, valor)
+            ceros_y_valores = fila[len(CONTADORES_LOTE):]
+            for j, boceto in enumerate((pareja.cuantiles_turnos, pareja.cuantiles_duracion)):
+                boceto.ceros, boceto.n = ceros_y_valores[2 * j:2 * j + 2]
+            for j, acumulado in enumerate((pareja.turnos, pareja.duracion)):
+                for n, media, m2 in welford[:, i, j].tolist():
+                    parcial = Welford()
+                    parcial.n, parcial.media, parcial.m2 = int(n), media, m2
+                    acumulado.fusionar(parcial)
+            agregador.partidas += pareja.partidas
+        for i, j, k, c in cubetas.tolist():
+            pareja = agregador.parejas[parejas[i]]
+            boceto = (pareja.cuantiles_turnos, pareja.cuantiles_duracion)[j]
+            boceto.cubetas[k] = boceto.cubetas.get(k, 0) + c
+        for pareja in agregador.parejas.values():
+            for boceto in (pareja.cuantiles_turnos, pareja.cuantiles_duracion):
+                if len(boceto.cubetas) > MAX_CUBETAS:
+                    boceto._colapsar()
+        return agregador
+
+    def progreso(self, forzar=False):
+        """
+        Imprime las partidas completadas, el ritmo y el tiempo restante estimado si ha
+        pasado el intervalo de progreso desde la última impresión.
+        """
+        if self.intervalo_progreso is None:
+            return
+        ahora = time.perf_counter()
+        if not forzar and ahora - self.ultimo_progreso < self.intervalo_progreso:
+            return
+        self.ultimo_progreso = ahora
+        transcurrido = ahora - self.inicio
+        ritmo = self.partidas / transcurrido if transcurrido else 0.0
+        linea = f"[Progreso] {self.partidas}"
+        if self.total:
+            restante = (self.total - self.partidas) / ritmo if ritmo else float("inf")
+            linea += f"/{self.total} partidas ({100 * self.partidas / self.total:.1f}%)"
+            linea += f", {ritmo:.1f} partidas/s, quedan ~{restante:.0f}s"
+        else:
+            linea += f" partidas, {ritmo:.1f} partidas/s"
+        print(linea, flush=True)
+
+
+def intervalo_wilson(exitos, n, z):
+    """
+    Devuelve el intervalo (inferior, superior) de Wilson para exitos de n ensayos con
+    el cuantil normal z, o (0, 1) si n es 0.
+    """
+    if not n:
+        return 0.0, 1.0
+    p = exitos / n
+    z2 = z * z
+    denominador = 1 + z2 / n
+    centro = (p + z2 / (2 * n)) / denominador
+    radio = z * math.sqrt(p * (1 - p) / n + z2 / (4 * n * n)) / denominador
+    return max(0.0, centro - radio), min(1.0, centro + radio)
+
+
+class CriterioParada:
+    """
+    Decide si una pareja ya tiene partidas suficientes a partir de las victorias del
+    jugador 1.
+    """
+
+    def __init__(self, ancho, z=1.96, z_decision=3.29, minimo=30):
+        """
+        Parámetros:
+            ancho: ancho del intervalo de confianza (entre 0 y 1) con el que se para.
+            z: cuantil normal del intervalo (1.96 para el 95 %).
+            z_decision: cuantil del intervalo con el que se da por decidido el ganador
+                        si no contiene el 50 % (3.29 para el 99.9 %).
+            minimo: partidas mínimas antes de comprobar el criterio.
+        """
+        self.ancho = ancho
+        self.z = z
+        self.z_decision = z_decision
+        self.minimo = minimo
+
+    def comprobar(self, pareja):
+        """
+        Devuelve el motivo de la parada ("intervalo" o "decidida") si la pareja
+        (AgregadorPareja) ya no necesita más partidas, o None.
+        """
+        n = pareja.partidas
+        if n < self.minimo:
+            return None
+        inferior, superior = intervalo_wilson(pareja.j1_gana, n, self.z)
+        if superior - inferior <= self.ancho:
+            return "intervalo"
+        inferior, superior = intervalo_wilson(pareja.j1_gana, n, self.z_decision)
+        if superior < 0.5 or inferior > 0.5:
+            return "decidida"
+        return None
+
+
+def fusionar_agregadores(a, b):
+    """
+    Fusiona dos AgregadorTorneo. Sirve como operación de comm.reduce().
+    """
+    return a.fusionar(b)
@@ -0,0 +1,201 @@
+"""
+almacen.py
+
+Almacén en disco de los resultados de un torneo, por bloques y en columnas.
+
+Los resultados se acumulan en un array estructurado de NumPy de tamaño fijo y, cada
+vez que se llena o que pasa el intervalo de volcado, se escriben como un fichero .npy
+nuevo (un bloque) en el directorio del almacén. Así un proceso terminado a la fuerza
+(SIGKILL, MPI_Abort) pierde como mucho las partidas de ese intervalo. Los bloques no se modifican nunca: solo se añaden. Un manifiesto JSON
+describe la configuración del torneo y los bloques escritos; tanto los bloques como el
+manifiesto se escriben en un fichero temporal y se renombran, de modo que un proceso
+interrumpido nunca deja un bloque a medias en el manifiesto.
+
+Cada registro guarda la pareja de estrategias (índices en la lista del manifiesto), el
+índice de la partida (del que dependen sus flotas y su semilla), el ganador, los
+turnos, los disparos y aciertos de cada jugador y la duración.
+
+Al relanzar main.py con el mismo directorio, el almacén lee el manifiesto, marca las
+partidas ya completadas para que no se repitan y devuelve sus resultados al
+agregador. La lectura para análisis abre los bloques como memoria mapeada
+(np.load(mmap_mode="r")), sin cargarlos enteros ni convertirlos en objetos de Python.
+
+Clases:
+- AlmacenResultados: escritura por bloques, manifiesto y reanudación.
+
+Funciones:
+- leer_bloques(): recorre los bloques de un almacén como arrays mapeados en memoria.
+"""
+
+import json
+import os
+import time
+import numpy as np
+
+from lotes import DTYPE_RESULTADO
+
+# Registro de una partida en el almacén: pareja e índice + los campos de DTYPE_RESULTADO
+DTYPE_REGISTRO = np.dtype(
+    [("e0", np.uint8), ("e1", np.uint8), ("indice", np.int64)] + DTYPE_RESULTADO.descr
+)
+
+MANIFIESTO = "manifiesto.json"
+VERSION = 1
+
+
+def escribir_atomico(ruta, escribir):
+    """
+    Escribe un fichero mediante escribir(f) en una ruta temporal y lo renombra.
+    """
+    temporal = ruta + ".tmp"
+    with open(temporal, "wb") as f:
+        escribir(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporal, ruta)
+
+def leer_manifiesto(directorio):
+    with open(os.path.join(directorio, MANIFIESTO)) as f:
+        return json.load(f)
+
+def leer_bloques(directorio):
+    """
+    Recorre los bloques de un almacén, cada uno como array estructurado con
+    DTYPE_REGISTRO mapeado en memoria.
+    """
+    for bloque in leer_manifiesto(directorio)["bloques"]:
+        yield np.load(os.path.join(directorio, bloque["fichero"]), mmap_mode="r")
+
+
+class AlmacenResultados:
+    """
+    Resultados de un torneo escritos por bloques en un directorio, con reanudación.
+    """
+
+    def __init__(self, directorio, configuracion, estrategias, tam_bloque, intervalo_volcado=None):
+        """
+        Abre el almacén del directorio o lo crea si no existe.
+
+        Parámetros:
+            directorio: directorio del almacén.
+            configuracion: diccionario con los parámetros que deben coincidir para
+                           reanudar (tamaño del tablero, flota, partidas por pareja...).
+            estrategias: nombres de las estrategias del torneo.
+            tam_bloque: registros por bloque.
+            intervalo_volcado: segundos tras los que se escriben los registros
+                               pendientes aunque el bloque no esté lleno (None para
+                               escribir solo bloques llenos).
+
+        Raises:
+            ValueError: si el almacén existente es de otro torneo.
+        """
+        self.directorio = directorio
+        self.tam_bloque = tam_bloque
+        self.buffer = np.zeros(tam_bloque, dtype=DTYPE_REGISTRO)
+        self.pendientes = 0   # Registros en el buffer aún no escritos
+        self.intervalo_volcado = intervalo_volcado
+        self.ultimo_volcado = time.monotonic()
+
+        ruta = os.path.join(directorio, MANIFIESTO)
+        if os.path.exists(ruta):
+            self.manifiesto = leer_manifiesto(directorio)
+            if self.manifiesto["configuracion"] != configuracion:
+                raise ValueError(
+                    f"El almacén {directorio} es de otro torneo: "
+                    f"{self.manifiesto['configuracion']} != {configuracion}"
+                )
+            # Las estrategias nuevas se añaden al final, sin cambiar los índices guardados
+            for nombre in estrategias:
+                if nombre not in self.manifiesto["estrategias"]:
+                    self.manifiesto["estrategias"].append(nombre)
+        else:
+            os.makedirs(directorio, exist_ok=True)
+            self.manifiesto = {
+                "version": VERSION,
+                "configuracion": configuracion,
+                "estrategias": list(estrategias),
+                "bloques": [],
+            }
+            self.guardar_manifiesto()
+        self.codigos = {nombre: i for i, nombre in enumerate(self.manifiesto["estrategias"])}
+
+    def __len__(self):
+        return sum(b["registros"] for b in self.manifiesto["bloques"]) + self.pendientes
+
+    def guardar_manifiesto(self):
+        datos = json.dumps(self.manifiesto, indent=2).encode()
+        escribir_atomico(os.path.join(self.directorio, MANIFIESTO), lambda f: f.write(datos))
+
+    def anadir(self, r, indice):
+        """
+        Añade el resultado de una partida; si el bloque se llena o ha pasado el
+        intervalo de volcado, lo escribe en disco.
+
+        Parámetros:
+            r: diccionario de resultado de la partida.
+            indice: índice de la partida.
+        """
+        registro = self.buffer[self.pendientes]
+        registro["e0"] = self.codigos[r["estrategia_j0"]]
+        registro["e1"] = self.codigos[r["estrategia_j1"]]
+        registro["indice"] = indice
+        for campo in DTYPE_RESULTADO.names:
+            registro[campo] = r[campo]
+        self.pendientes += 1
+        if self.pendientes == self.tam_bloque or (
+            self.intervalo_volcado is not None
+            and time.monotonic() - self.ultimo_volcado >= self.intervalo_volcado
+        ):
+            self.volcar()
+
+    def volcar(self):
+        """
+        Escribe los registros pendientes como un bloque nuevo y lo añade al manifiesto.
+        """
+        self.ultimo_volcado = time.monotonic()
+        if not self.pendientes:
+            return
+        bloques = self.manifiesto["bloques"]
+        fichero = f"bloque_{len(bloques):06d}.npy"
+        datos = self.buffer[:self.pendientes]
+        escribir_atomico(os.path.join(self.directorio, fichero), lambda f: np.save(f, datos))
+        bloques.append({"fichero": fichero, "registros": self.pendientes})
+        self.guardar_manifiesto()
+        self.pendientes = 0
+
+    def completadas(self, estrategias, num_simulaciones):
+        """
+        Devuelve, para cada pareja (e0, e1) del torneo, una máscara booleana con las
+        partidas (por índice) que ya están guardadas en disco.
+        """
+        mascaras = {
+            (e0, e1): np.zeros(num_simulaciones, dtype=bool)
+            for e0 in estrategias for e1 in estrategias
+        }
+        for bloque in leer_bloques(self.directorio):
+            for (e0, e1), mascara in mascaras.items():
+                seleccion = (bloque["e0"] == self.codigos[e0]) & (bloque["e1"] == self.codigos[e1])
+                indices = bloque["indice"][seleccion]
+                mascara[indices[indices < num_simulaciones]] = True
+        return mascaras
+
+    def restaurar(self, agregador, estrategias, num_simulaciones):
+        """
+        Añade al agregador los resultados ya guardados de las parejas del torneo con
+        índice menor que num_simulaciones.
+
+        Returns:
+            número de partidas restauradas.
+        """
+        total = 0
+        for bloque in leer_bloques(self.directorio):
+            en_rango = bloque["indice"] < num_simulaciones
+            for e0 in estrategias:
+                for e1 in estrategias:
+                    seleccion = (
+                        en_rango & (bloque["e0"] == self.codigos[e0]) & (bloque["e1"] == self.codigos[e1])
+                    )
+                    if seleccion.any():
+                        agregador.actualizar_lote(e0, e1, bloque[seleccion])
+                        total += int(np.count_nonzero(seleccion))
+        return total
@@ -0,0 +1,168 @@
+"""
+barrido.py
+
+Barrido de configuraciones: juega un torneo entre estrategias para cada combinación de
+tamaño de tablero y flota de una rejilla y escribe una tabla de resultados por punto.
+
+Cada punto de la rejilla es una Configuracion (ver configuracion.py) que se pasa a los
+motores de juego, así que todo el barrido se ejecuta en los mismos procesos sin editar
+constantes.py. Las partidas de cada punto se reparten entre todos los ranks con el
+modo por lotes (ver lotes.py) y el rank 0 recibe los acumulados fusionados. Todas las
+partidas derivan sus generadores de la misma semilla raíz (ver semillas.py), de modo
+que con números aleatorios comunes cada pareja de un punto ve las mismas flotas.
+
+Por cada punto se escribe <salida>/<nombre de la configuración>.csv con una fila por
+pareja de estrategias, y al final <salida>/resumen.csv con las filas de todos los
+puntos y las columnas board_size y flota. Las flotas que no caben en un tablero se
+omiten, igual que las parejas con una estrategia que no admite el tamaño del tablero
+(la de densidad en los tableros dispersos, ver tablero.py).
+
+Uso:
+    python barrido.py --tamanos 10 20 50 --flotas clasica corta --partidas 200
+    mpiexec -n 8 python barrido.py --tamanos 20 100 --estrategias optimizada densidad
+"""
+
+import argparse
+import csv
+import io
+import os
+import random
+import sys
+import time
+from mpi4py import MPI
+
+from configuracion import Configuracion, FLOTAS
+from almacen import escribir_atomico
+from flota import ColocadorFlota
+from lotes import ejecutar_por_lotes
+from agregador import intervalo_wilson
+from semillas import semilla_nueva
+from constantes import ESTRATEGIAS, ESTRATEGIAS_DISPONIBLES, SEMILLA_RAIZ, Z_INTERVALO
+
+COLUMNAS = (
+    "estrategia_j0", "estrategia_j1", "partidas", "j0_gana", "j1_gana",
+    "pct_j1", "ic_inf", "ic_sup", "turnos_media", "turnos_desv", "turnos_p50", "turnos_p90",
+    "disparos_j0_media", "disparos_j1_media", "duracion_media",
+)
+
+
+def cabe(configuracion):
+    """
+    Indica si la flota de la configuración se puede colocar en su tablero. Usa un
+    generador con semilla fija para que todos los ranks lleguen a la misma respuesta.
+    """
+    try:
+        ColocadorFlota(configuracion.board_size, configuracion.tamanos_barcos, random.Random(0)).colocar()
+    except ValueError:
+        return False
+    return True
+
+def filas_configuracion(agregador):
+    """
+    Devuelve las filas de la tabla de un punto, una por pareja, con las columnas de
+    COLUMNAS.
+    """
+    filas = []
+    for (e0, e1), data in sorted(agregador.parejas.items()):
+        n = data.partidas
+        inferior, superior = intervalo_wilson(data.j1_gana, n, Z_INTERVALO)
+        filas.append({
+            "estrategia_j0": e0,
+            "estrategia_j1": e1,
+            "partidas": n,
+            "j0_gana": data.j0_gana,
+            "j1_gana": data.j1_gana,
+            "pct_j1": round(100 * data.j1_gana / n, 2),
+            "ic_inf": round(100 * inferior, 2),
+            "ic_sup": round(100 * superior, 2),
+            "turnos_media": round(data.turnos.media, 2),
+            "turnos_desv": round(data.turnos.desviacion, 2),
+            "turnos_p50": round(data.cuantiles_turnos.cuantil(0.5), 1),
+            "turnos_p90": round(data.cuantiles_turnos.cuantil(0.9), 1),
+            "disparos_j0_media": round(data.disparos_j0 / n, 2),
+            "disparos_j1_media": round(data.disparos_j1 / n, 2),
+            "duracion_media": round(data.duracion.media, 4),
+        })
+    return filas
+
+def escribir_tabla(ruta, filas, columnas):
+    """
+    Escribe las filas como CSV de forma atómica.
+    """
+    texto = io.StringIO()
+    escritor = csv.DictWriter(texto, fieldnames=columnas)
+    escritor.writeheader()
+    escritor.writerows(filas)
+    datos = texto.getvalue().encode()
+    escribir_atomico(ruta, lambda f: f.write(datos))
+
+def main():
+    parser = argparse.ArgumentParser(description="Juega un torneo por cada tamaño de tablero y flota.")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[10, 20, 50],
+                        help="tamaños de tablero del barrido")
+    parser.add_argument("--flotas", nargs="+", choices=sorted(FLOTAS), default=sorted(FLOTAS),
+                        help="flotas del barrido (ver configuracion.FLOTAS)")
+    parser.add_argument("--estrategias", nargs="+", choices=sorted(ESTRATEGIAS),
+                        default=list(ESTRATEGIAS_DISPONIBLES),
+                        help="estrategias del torneo (por defecto, ESTRATEGIAS_DISPONIBLES)")
+    parser.add_argument("--partidas", type=int, default=100, help="partidas por pareja y punto")
+    parser.add_argument("--semilla", type=int, default=None,
+                        help="semilla raíz (por defecto, SEMILLA_RAIZ o una nueva)")
+    parser.add_argument("--salida", default="barrido", help="directorio de las tablas")
+    args = parser.parse_args()
+
+    comm = MPI.COMM_WORLD
+    rank = comm.Get_rank()
+
+    semilla = args.semilla if args.semilla is not None else SEMILLA_RAIZ
+    if semilla is None and rank == 0:
+        semilla = semilla_nueva()
+    semilla = comm.bcast(semilla, root=0)
+
+    parejas = [(e0, e1) for e0 in args.estrategias for e1 in args.estrategias]
+    configuraciones = [
+        (nombre_flota, Configuracion(n, FLOTAS[nombre_flota]))
+        for n in args.tamanos for nombre_flota in args.flotas
+    ]
+    if rank == 0:
+        os.makedirs(args.salida, exist_ok=True)
+        print(f"Semilla raíz: {semilla}")
+        print(f"Barrido de {len(configuraciones)} configuraciones, {len(parejas)} parejas y "
+              f"{args.partidas} partidas por pareja en {comm.Get_size()} procesos")
+
+    resumen = []
+    for nombre_flota, configuracion in configuraciones:
+        if not cabe(configuracion):
+            if rank == 0:
+                print(f"  {configuracion.nombre}: la flota {nombre_flota} no cabe en el tablero, se omite")
+            continue
+
+        n = configuracion.board_size
+        excluidas = sorted(e for e in args.estrategias if not ESTRATEGIAS[e].admite_tablero(n))
+        parejas_punto = [(e0, e1) for e0, e1 in parejas if e0 not in excluidas and e1 not in excluidas]
+        if excluidas and rank == 0:
+            print(f"  {configuracion.nombre}: {', '.join(excluidas)} no admite un tablero de {n}x{n}, se omite")
+        if not parejas_punto:
+            continue
+
+        inicio = time.perf_counter()
+        agregador, _ = ejecutar_por_lotes(
+            comm, parejas_punto, args.partidas, semilla=semilla, configuracion=configuracion
+        )
+        if rank != 0:
+            continue
+
+        filas = filas_configuracion(agregador)
+        ruta = os.path.join(args.salida, f"{configuracion.nombre}.csv")
+        escribir_tabla(ruta, filas, COLUMNAS)
+        for fila in filas:
+            resumen.append({"board_size": configuracion.board_size, "flota": nombre_flota, **fila})
+        print(f"  {configuracion.nombre}: {ruta} ({time.perf_counter() - inicio:.1f} s)")
+
+    if rank == 0:
+        escribir_tabla(os.path.join(args.salida, "resumen.csv"), resumen, ("board_size", "flota") + COLUMNAS)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
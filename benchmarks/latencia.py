@@ -0,0 +1,188 @@
+"""
+benchmarks/latencia.py
+
+Latencia por turno de los transportes de una partida (ver transporte.py):
+
+- Ping-pong de un turno (disparo de 4 bytes y resultado de 1 byte) con Canal sobre
+  cada transporte, y con comm.send/comm.recv de MPI (tuplas y cadenas serializadas
+  con pickle) como referencia.
+- Partidas completas con jugar_una_partida(), en nanosegundos por turno.
+
+El transporte en memoria compartida se mide siempre, con una ParejaMemoria (sin
+mpirun). Lanzado con al menos dos procesos MPI se miden también los transportes MPI
+entre los ranks 0 y 1; mientras rank 0 mide el de memoria, rank 1 espera sin ocupar
+la CPU.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.latencia
+    mpiexec -n 2 python -m benchmarks.latencia --turnos 20000 --salida latencia.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import sys
+import time
+
+from mpi4py import MPI
+
+from partida import ParejaMemoria, jugar_una_partida
+from protocolo import Canal
+from transporte import TransporteMPI, crear_transportes_memoria
+from benchmarks.rendimiento import cronometrar, sin_impresion
+from constantes import ESTRATEGIAS_DISPONIBLES, BOARD_SIZE
+
+# Pausa de rank 1 entre comprobaciones mientras rank 0 mide el transporte en memoria
+PAUSA_ESPERA = 0.01
+
+
+def ping_pong(canal, turnos):
+    """
+    Juega turnos de ping-pong con Canal: rank 0 dispara y rank 1 responde.
+
+    Returns:
+        (nanosegundos, turnos) en rank 0, None en rank 1.
+    """
+    if canal.transporte.rank == 1:
+        for _ in range(turnos):
+            canal.recibir_disparo()
+            canal.enviar_resultado('agua')
+        return None
+    inicio = time.perf_counter_ns()
+    for i in range(turnos):
+        canal.enviar_disparo(i % BOARD_SIZE, 0)
+        canal.recibir_resultado()
+    return time.perf_counter_ns() - inicio, turnos
+
+def ping_pong_pickle(comm, turnos):
+    """
+    Como ping_pong(), con los mensajes de antes del protocolo binario: una tupla y una
+    cadena enviadas con comm.send/comm.recv.
+    """
+    if comm.Get_rank() == 1:
+        for _ in range(turnos):
+            comm.recv(source=0, tag=0)
+            comm.send('agua', dest=0, tag=1)
+        return None
+    inicio = time.perf_counter_ns()
+    for i in range(turnos):
+        comm.send((i % BOARD_SIZE, 0), dest=1, tag=0)
+        comm.recv(source=1, tag=1)
+    return time.perf_counter_ns() - inicio, turnos
+
+def _ping_pong_hijo(transporte, turnos, repeticiones):
+    canal = Canal(transporte)
+    for _ in range(repeticiones):
+        ping_pong(canal, turnos)
+    transporte.liberar()
+
+def bench_memoria(nombre_estrategia, turnos, repeticiones, partidas):
+    """
+    Mide el transporte en memoria compartida con un proceso hijo.
+
+    Returns:
+        dict {nombre de la entrada: resultado de cronometrar()}.
+    """
+    resultados = {}
+    transporte, transporte_hijo = crear_transportes_memoria()
+    hijo = multiprocessing.Process(target=_ping_pong_hijo, args=(transporte_hijo, turnos, repeticiones))
+    hijo.start()
+    canal = Canal(transporte)
+    resultados["ping_pong/memoria"] = cronometrar(lambda: ping_pong(canal, turnos), repeticiones)
+    hijo.join()
+    transporte.liberar()
+
+    with ParejaMemoria() as pareja:
+        def medir():
+            inicio = time.perf_counter_ns()
+            resultado = pareja.jugar(nombre_estrategia, nombre_estrategia)
+            return time.perf_counter_ns() - inicio, resultado["turnos"]
+        resultados[f"partida/memoria/{nombre_estrategia}"] = cronometrar(medir, partidas)
+    return resultados
+
+def bench_mpi(pareja, nombre_estrategia, turnos, repeticiones, partidas):
+    """
+    Mide los transportes MPI entre los ranks 0 y 1 de la pareja.
+
+    Returns (solo en rank 0):
+        dict {nombre de la entrada: resultado de cronometrar()}.
+    """
+    rank = pareja.Get_rank()
+    canal = Canal(TransporteMPI(pareja))
+    tiempos = {"ping_pong/mpi": [], "ping_pong/mpi_pickle": [], f"partida/mpi/{nombre_estrategia}": []}
+
+    def medir(clave, funcion):
+        pareja.Barrier()
+        medida = funcion()
+        if rank == 0:
+            tiempos[clave].append(medida)
+
+    for _ in range(repeticiones):
+        medir("ping_pong/mpi", lambda: ping_pong(canal, turnos))
+        medir("ping_pong/mpi_pickle", lambda: ping_pong_pickle(pareja, turnos))
+    canal.cerrar()
+
+    def partida():
+        inicio = time.perf_counter_ns()
+        resultado = jugar_una_partida(nombre_estrategia, nombre_estrategia, comm=pareja)
+        if resultado is not None:
+            return time.perf_counter_ns() - inicio, resultado["turnos"]
+    for _ in range(partidas):
+        medir(f"partida/mpi/{nombre_estrategia}", partida)
+
+    if rank != 0:
+        return {}
+    # cronometrar() resume las medidas ya tomadas, sincronizadas con la barrera
+    return {clave: cronometrar(iter(medidas).__next__, len(medidas)) for clave, medidas in tiempos.items()}
+
+def imprimir_resultados(resultados):
+    ancho = max(len(clave) for clave in resultados)
+    print(f"{'Entrada':<{ancho}}  {'ns/turno':>10}  {'mínimo':>10}")
+    for clave, r in sorted(resultados.items()):
+        print(f"{clave:<{ancho}}  {r['ns_por_llamada']:>10,.0f}  {r['ns_min']:>10,.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latencia por turno de los transportes de una partida.")
+    parser.add_argument("--turnos", type=int, default=5000, help="turnos de cada ping-pong")
+    parser.add_argument("--repeticiones", type=int, default=5, help="repeticiones de cada ping-pong")
+    parser.add_argument("--partidas", type=int, default=10, help="partidas completas por transporte")
+    parser.add_argument("--salida", default=None, help="fichero JSON de resultados (opcional)")
+    args = parser.parse_args()
+
+    comm = MPI.COMM_WORLD
+    rank = comm.Get_rank()
+    nombre_estrategia = next(iter(ESTRATEGIAS_DISPONIBLES))
+
+    resultados = {}
+    with sin_impresion():
+        if comm.Get_size() >= 2:
+            pareja = comm.Split(0 if rank < 2 else MPI.UNDEFINED, rank)
+            if pareja != MPI.COMM_NULL:
+                resultados.update(bench_mpi(pareja, nombre_estrategia, args.turnos, args.repeticiones, args.partidas))
+                pareja.Free()
+        elif rank == 0:
+            print("Un solo proceso MPI: solo se mide el transporte en memoria compartida "
+                  "(lanzar con mpiexec -n 2 para compararlo con MPI).")
+
+        # Los demás ranks esperan sin ocupar la CPU mientras rank 0 mide la memoria
+        final = comm.Ibarrier() if rank != 0 else None
+        while final is not None and not final.Test():
+            time.sleep(PAUSA_ESPERA)
+        if rank != 0:
+            return 0
+        resultados.update(bench_memoria(nombre_estrategia, args.turnos, args.repeticiones, args.partidas))
+        comm.Ibarrier().Wait()
+
+    print()
+    imprimir_resultados(resultados)
+    if args.salida:
+        with open(args.salida, "w") as f:
+            json.dump({"board_size": BOARD_SIZE, "estrategia": nombre_estrategia,
+                       "procesos_mpi": comm.Get_size(), "resultados": resultados}, f, indent=2)
+        print(f"\nResultados guardados en {args.salida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
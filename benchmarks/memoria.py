@@ -0,0 +1,125 @@
+"""
+benchmarks/memoria.py
+
+Mide la memoria que ocupa el estado inicial de una partida (dos jugadores con su
+tablero, su flota y su estrategia) para distintos tamaños de tablero.
+
+Compara la representación actual (tablero de un byte por casilla, índice de la flota y
+clases con __slots__) con la representación anterior, que se reconstruye aquí:
+tablero como lista de listas de cadenas y objetos con __dict__.
+
+La representación actual se mide en sus dos variantes en todos los tamaños, forzando
+el umbral de tablero.py: densa (un byte por casilla) y dispersa (solo las casillas
+ocupadas), sea cual sea UMBRAL_TABLERO_DISPERSO. La reducción compara la anterior con
+la densa. Los tableros de TAMANOS_DISPERSOS solo se miden con la dispersa: las otras
+ocuparían cientos de megabytes o gigabytes.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.memoria
+"""
+
+import tracemalloc
+from contextlib import contextmanager
+
+import tablero
+from jugador import Jugador
+from configuracion import Configuracion
+from flota import generar_flotas
+from estrategias.optimizada2 import EstrategiaOptimizada2
+from constantes import TAMANOS_BARCOS, SIMBOLO_VACIO, SIMBOLO_BARCO
+
+TAMANOS_TABLERO = (20, 200, 2000)
+TAMANOS_DISPERSOS = (10000, 30000)
+
+
+class EstrategiaAnterior:
+    """
+    Estado de EstrategiaOptimizada2 tal y como se guardaba antes, con __dict__.
+    """
+
+    def __init__(self, board_size):
+        self.board_size = board_size
+        self.disparos_realizados = set()
+        self.modo = "exploracion"
+        self.tocados = []
+        self.candidatos = []
+        self.hundidos = []
+
+
+class JugadorAnterior:
+    """
+    Estado de Jugador tal y como se guardaba antes: tablero de listas de cadenas.
+    """
+
+    def __init__(self, estrategia, board_size, flota):
+        self.board_size = board_size
+        self.estrategia = estrategia
+        self.tablero = [[SIMBOLO_VACIO for _ in range(board_size)] for _ in range(board_size)]
+        self.flota = [list(barco) for barco in flota]
+        for barco in flota:
+            for x, y in barco:
+                self.tablero[x][y] = SIMBOLO_BARCO
+
+
+def medir(crear):
+    """
+    Devuelve los bytes reservados por crear() mientras su resultado sigue vivo.
+    """
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    objeto = crear()
+    despues = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objeto
+    return despues - antes
+
+@contextmanager
+def representacion(disperso):
+    """
+    Fuerza la representación densa o dispersa de los tableros mientras se mide.
+    """
+    anterior = tablero.UMBRAL_TABLERO_DISPERSO
+    tablero.UMBRAL_TABLERO_DISPERSO = 1 if disperso else None
+    try:
+        yield
+    finally:
+        tablero.UMBRAL_TABLERO_DISPERSO = anterior
+
+def huella_actual(board_size, flotas, disperso):
+    """
+    Devuelve los bytes del estado inicial de una partida con la representación actual,
+    densa o dispersa.
+    """
+    with representacion(disperso):
+        return medir(lambda: [
+            Jugador(EstrategiaOptimizada2(board_size), Configuracion(board_size), [list(b) for b in flota])
+            for flota in flotas
+        ])
+
+def huella_partida(board_size):
+    """
+    Devuelve (bytes antes, bytes densa, bytes dispersa) del estado inicial de una partida.
+    """
+    flotas = generar_flotas(2, TAMANOS_BARCOS, board_size)
+    anterior = medir(lambda: [
+        JugadorAnterior(EstrategiaAnterior(board_size), board_size, flota) for flota in flotas
+    ])
+    return anterior, huella_actual(board_size, flotas, False), huella_actual(board_size, flotas, True)
+
+def formatear(num_bytes):
+    for unidad in ("B", "KiB", "MiB", "GiB"):
+        if num_bytes < 1024:
+            return f"{num_bytes:.1f} {unidad}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} TiB"
+
+
+if __name__ == "__main__":
+    print(f"{'Tablero':>11} {'Antes':>12} {'Densa':>12} {'Reducción':>10} {'Dispersa':>12}")
+    for n in TAMANOS_TABLERO:
+        anterior, densa, dispersa = huella_partida(n)
+        print(f"{f'{n}x{n}':>11} {formatear(anterior):>12} {formatear(densa):>12} "
+              f"{anterior / densa:>9.1f}x {formatear(dispersa):>12}")
+    for n in TAMANOS_DISPERSOS:
+        dispersa = huella_actual(n, generar_flotas(2, TAMANOS_BARCOS, n), True)
+        print(f"{f'{n}x{n}':>11} {'-':>12} {'-':>12} {'-':>10} {formatear(dispersa):>12}")
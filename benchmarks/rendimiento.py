@@ -0,0 +1,314 @@
+"""
+benchmarks/rendimiento.py
+
+Batería de benchmarks de los caminos críticos del juego:
+
+- generar_flota(): colocación de una flota en un tablero vacío.
+- Jugador.recibir_disparo(): resolución de un disparo recibido.
+- siguiente_disparo() y registrar_resultado() de cada estrategia de
+  ESTRATEGIAS_DISPONIBLES, jugando contra una flota hasta hundirla.
+- Una partida completa: jugar_una_partida() si se lanza con al menos dos procesos MPI,
+  o el motor local (jugar_partida_local()) con uno solo.
+
+Los micro-benchmarks se repiten para varios tamaños de tablero y configuraciones de
+flota. Los resultados (mediana y mínimo en nanosegundos por llamada) se escriben en
+JSON y se pueden comparar con una ejecución anterior guardada como referencia: las
+entradas que empeoran más que el umbral se marcan como regresiones y el proceso
+termina con código 1.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.rendimiento
+    python -m benchmarks.rendimiento --rapido --salida base.json
+    python -m benchmarks.rendimiento --base base.json --umbral 0.10
+    mpiexec -n 2 python -m benchmarks.rendimiento
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from statistics import median
+
+import numpy as np
+from mpi4py import MPI
+
+import eventos
+import motor
+import partida
+from flota import generar_flota
+from jugador import Jugador
+from tablero import crear_tablero
+from configuracion import Configuracion, FLOTAS
+from constantes import ESTRATEGIAS_DISPONIBLES, BOARD_SIZE
+
+TAMANOS_TABLERO = (10, 20, 50, 100)
+TAMANOS_TABLERO_RAPIDO = (10, 20)
+
+CONFIGURACIONES_FLOTA = FLOTAS
+
+SALIDA_POR_DEFECTO = "benchmarks/ultima_ejecucion.json"
+
+
+def cronometrar(medir, repeticiones):
+    """
+    Ejecuta medir() repeticiones veces. medir() devuelve (nanosegundos, llamadas).
+
+    Returns:
+        dict con la mediana y el mínimo de nanosegundos por llamada.
+    """
+    por_llamada = []
+    llamadas = 0
+    for _ in range(repeticiones):
+        ns, n = medir()
+        por_llamada.append(ns / n)
+        llamadas += n
+    return {
+        "ns_por_llamada": median(por_llamada),
+        "ns_min": min(por_llamada),
+        "repeticiones": repeticiones,
+        "llamadas": llamadas,
+    }
+
+def bench_generar_flota(board_size, tamanos_barcos, repeticiones):
+    def medir():
+        lote = 20
+        tableros = [crear_tablero(board_size) for _ in range(lote)]
+        inicio = time.perf_counter_ns()
+        for tablero in tableros:
+            generar_flota(tablero, tamanos_barcos)
+        return time.perf_counter_ns() - inicio, lote
+    return cronometrar(medir, repeticiones)
+
+def bench_recibir_disparo(board_size, tamanos_barcos, repeticiones):
+    casillas = [(x, y) for x in range(board_size) for y in range(board_size)]
+
+    def medir():
+        flota = generar_flota(crear_tablero(board_size), tamanos_barcos)
+        jugador = Jugador(None, Configuracion(board_size, tamanos_barcos), flota=flota)
+        random.shuffle(casillas)
+        recibir = jugador.recibir_disparo
+        inicio = time.perf_counter_ns()
+        for x, y in casillas:
+            recibir(x, y)
+        return time.perf_counter_ns() - inicio, len(casillas)
+    return cronometrar(medir, repeticiones)
+
+def bench_estrategia(clase, board_size, tamanos_barcos, repeticiones):
+    """
+    Hunde una flota con la estrategia y mide por separado sus dos métodos.
+    """
+    tiempos = {"siguiente_disparo": [], "registrar_resultado": []}
+
+    def medir():
+        flota = generar_flota(crear_tablero(board_size), tamanos_barcos)
+        configuracion = Configuracion(board_size, tamanos_barcos)
+        rival = Jugador(None, configuracion, flota=flota)
+        estrategia = clase.desde_configuracion(configuracion)
+        decidir = registrar = disparos = 0
+        resultado = None
+        while resultado != "FIN":
+            t0 = time.perf_counter_ns()
+            x, y = estrategia.siguiente_disparo()
+            t1 = time.perf_counter_ns()
+            resultado = rival.recibir_disparo(x, y)
+            t2 = time.perf_counter_ns()
+            estrategia.registrar_resultado(x, y, resultado)
+            t3 = time.perf_counter_ns()
+            decidir += t1 - t0
+            registrar += t3 - t2
+            disparos += 1
+        tiempos["siguiente_disparo"].append(decidir / disparos)
+        tiempos["registrar_resultado"].append(registrar / disparos)
+        return decidir + registrar, disparos
+
+    total = cronometrar(medir, repeticiones)
+    return {
+        metodo: {
+            "ns_por_llamada": median(valores),
+            "ns_min": min(valores),
+            "repeticiones": repeticiones,
+            "llamadas": total["llamadas"],
+        }
+        for metodo, valores in tiempos.items()
+    }
+
+@contextmanager
+def sin_impresion():
+    """
+    Desactiva la impresión de eventos y tableros de los motores mientras se mide.
+    """
+    modulos = (motor, partida, eventos)
+    anteriores = [
+        (m, nombre, getattr(m, nombre))
+        for m in modulos for nombre in ("MOSTRAR_DISPAROS", "MOSTRAR_TABLERO")
+        if hasattr(m, nombre)
+    ]
+    for m, nombre, _ in anteriores:
+        setattr(m, nombre, "Ninguno" if nombre == "MOSTRAR_DISPAROS" else False)
+    try:
+        yield
+    finally:
+        for m, nombre, valor in anteriores:
+            setattr(m, nombre, valor)
+
+def bench_partida(comm, nombre_estrategia, repeticiones):
+    """
+    Mide partidas completas. Con dos o más procesos juegan los ranks 0 y 1 por MPI;
+    con uno solo se usa el motor local.
+
+    Returns (solo en el rank 0 de comm):
+        (nombre de la entrada, resultado de cronometrar()).
+    """
+    rank = comm.Get_rank()
+    if comm.Get_size() < 2:
+        def medir():
+            inicio = time.perf_counter_ns()
+            motor.jugar_partida_local(nombre_estrategia, nombre_estrategia)
+            return time.perf_counter_ns() - inicio, 1
+        with sin_impresion():
+            return "motor_local", cronometrar(medir, repeticiones)
+
+    pareja = comm.Split(0 if rank < 2 else MPI.UNDEFINED, rank)
+    if pareja == MPI.COMM_NULL:
+        return None, None
+
+    def medir():
+        pareja.Barrier()
+        inicio = time.perf_counter_ns()
+        partida.jugar_una_partida(nombre_estrategia, nombre_estrategia, comm=pareja)
+        return time.perf_counter_ns() - inicio, 1
+    with sin_impresion():
+        resultado = cronometrar(medir, repeticiones)
+    pareja.Free()
+    return "jugar_una_partida", resultado
+
+def ejecutar(tamanos_tablero, repeticiones):
+    """
+    Ejecuta los micro-benchmarks en el proceso actual.
+
+    Returns:
+        dict {nombre de la entrada: resultado}.
+    """
+    resultados = {}
+    for n in tamanos_tablero:
+        for nombre_flota, tamanos in CONFIGURACIONES_FLOTA.items():
+            sufijo = f"n={n}/{nombre_flota}"
+            try:
+                generar_flota(crear_tablero(n), tamanos)
+            except ValueError:
+                print(f"  {sufijo}: la flota no cabe en el tablero, se omite")
+                continue
+
+            print(f"  {sufijo}")
+            resultados[f"generar_flota/{sufijo}"] = bench_generar_flota(n, tamanos, repeticiones)
+            resultados[f"recibir_disparo/{sufijo}"] = bench_recibir_disparo(n, tamanos, repeticiones)
+            for nombre, clase in ESTRATEGIAS_DISPONIBLES.items():
+                for metodo, r in bench_estrategia(clase, n, tamanos, repeticiones).items():
+                    resultados[f"{nombre}.{metodo}/{sufijo}"] = r
+    return resultados
+
+def metadatos(args, comm):
+    return {
+        "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "plataforma": platform.platform(),
+        "procesos_mpi": comm.Get_size(),
+        "board_size_partida": BOARD_SIZE,
+        "tamanos_tablero": list(args.tamanos),
+        "repeticiones": args.repeticiones,
+    }
+
+def comparar(actual, base, umbral):
+    """
+    Compara dos ejecuciones entrada a entrada.
+
+    Returns:
+        lista de (entrada, ns base, ns actual, cociente, es_regresion) de las entradas
+        presentes en ambas, ordenada de peor a mejor cociente.
+    """
+    filas = []
+    for clave, r in actual.items():
+        if clave not in base:
+            continue
+        anterior = base[clave]["ns_por_llamada"]
+        cociente = r["ns_por_llamada"] / anterior if anterior else float("inf")
+        filas.append((clave, anterior, r["ns_por_llamada"], cociente, cociente > 1 + umbral))
+    filas.sort(key=lambda fila: fila[3], reverse=True)
+    return filas
+
+def imprimir_resultados(resultados):
+    ancho = max(len(clave) for clave in resultados)
+    for clave, r in resultados.items():
+        print(f"{clave:<{ancho}}  {r['ns_por_llamada']:>14,.0f} ns")
+
+def imprimir_comparacion(filas, umbral):
+    ancho = max(len(fila[0]) for fila in filas)
+    print(f"\n{'Entrada':<{ancho}}  {'Base (ns)':>14}  {'Actual (ns)':>14}  {'Cociente':>8}")
+    for clave, anterior, nuevo, cociente, regresion in filas:
+        marca = "  <-- REGRESIÓN" if regresion else ""
+        print(f"{clave:<{ancho}}  {anterior:>14,.0f}  {nuevo:>14,.0f}  {cociente:>8.2f}{marca}")
+    regresiones = sum(fila[4] for fila in filas)
+    print(f"\n{regresiones} regresiones por encima del {umbral:.0%} en {len(filas)} entradas comparadas.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de rendimiento de Hundir la Flota.")
+    parser.add_argument("--rapido", action="store_true",
+                        help=f"solo tableros {TAMANOS_TABLERO_RAPIDO} y 3 repeticiones")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=None,
+                        help=f"tamaños de tablero (por defecto {TAMANOS_TABLERO})")
+    parser.add_argument("--repeticiones", type=int, default=None,
+                        help="repeticiones de cada medida (por defecto 7)")
+    parser.add_argument("--partidas", type=int, default=20,
+                        help="partidas completas a medir")
+    parser.add_argument("--salida", default=SALIDA_POR_DEFECTO,
+                        help="fichero JSON de resultados")
+    parser.add_argument("--base", default=None,
+                        help="fichero JSON de referencia con el que comparar")
+    parser.add_argument("--umbral", type=float, default=0.10,
+                        help="empeoramiento relativo a partir del cual hay regresión")
+    args = parser.parse_args()
+    if args.tamanos is None:
+        args.tamanos = TAMANOS_TABLERO_RAPIDO if args.rapido else TAMANOS_TABLERO
+    if args.repeticiones is None:
+        args.repeticiones = 3 if args.rapido else 7
+
+    comm = MPI.COMM_WORLD
+    rank = comm.Get_rank()
+
+    resultados = {}
+    if rank == 0:
+        print("Micro-benchmarks:")
+        resultados = ejecutar(args.tamanos, args.repeticiones)
+    comm.Barrier()
+
+    nombre_estrategia = next(iter(ESTRATEGIAS_DISPONIBLES))
+    nombre, r = bench_partida(comm, nombre_estrategia, args.partidas)
+    if rank != 0:
+        return 0
+    resultados[f"partida.{nombre}/{nombre_estrategia}/n={BOARD_SIZE}"] = r
+
+    print()
+    imprimir_resultados(resultados)
+    with open(args.salida, "w") as f:
+        json.dump({"metadatos": metadatos(args, comm), "resultados": resultados}, f, indent=2)
+    print(f"\nResultados guardados en {args.salida}")
+
+    if args.base:
+        with open(args.base) as f:
+            base = json.load(f)["resultados"]
+        filas = comparar(resultados, base, args.umbral)
+        if filas:
+            imprimir_comparacion(filas, args.umbral)
+        if any(fila[4] for fila in filas):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""
+configuracion.py
+
+Configuración de una partida en tiempo de ejecución.
+
+BOARD_SIZE y TAMANOS_BARCOS de constantes.py son solo los valores por defecto: los
+motores de juego reciben un objeto Configuracion y lo pasan a Jugador, a las
+estrategias (Estrategia.desde_configuracion()) y, a través de ellos, a crear_tablero()
+y generar_flota(). Así se pueden jugar en el mismo proceso partidas con distintos
+tamaños de tablero y flotas, como hace barrido.py, sin editar constantes.py.
+
+Clases:
+- Configuracion: tamaño del tablero y tamaños de los barcos de una partida.
+
+Constantes:
+- FLOTAS: flotas con nombre usadas por los barridos y los benchmarks.
+"""
+
+from constantes import BOARD_SIZE, TAMANOS_BARCOS
+
+# Flotas con nombre
+FLOTAS = {
+    "clasica": (5, 4, 3, 3, 2),
+    "corta": (3, 2, 2),
+    "larga": (6, 5, 4, 4, 3, 3, 2, 2),
+}
+
+
+class Configuracion:
+    """
+    Parámetros de una partida. Es inmutable y se puede usar como clave de diccionario.
+    """
+
+    __slots__ = ("board_size", "tamanos_barcos")
+
+    def __init__(self, board_size=BOARD_SIZE, tamanos_barcos=TAMANOS_BARCOS):
+        """
+        Parámetros:
+            board_size: tamaño del tablero (cuadrado).
+            tamanos_barcos: tamaños de los barcos de la flota.
+        """
+        object.__setattr__(self, "board_size", int(board_size))
+        object.__setattr__(self, "tamanos_barcos", tuple(int(t) for t in tamanos_barcos))
+
+    def __setattr__(self, nombre, valor):
+        raise AttributeError("Configuracion es inmutable.")
+
+    def __eq__(self, otra):
+        return (
+            isinstance(otra, Configuracion)
+            and self.board_size == otra.board_size
+            and self.tamanos_barcos == otra.tamanos_barcos
+        )
+
+    def __hash__(self):
+        return hash((self.board_size, self.tamanos_barcos))
+
+    def __repr__(self):
+        return f"Configuracion(board_size={self.board_size}, tamanos_barcos={list(self.tamanos_barcos)})"
+
+    def __reduce__(self):
+        return (Configuracion, (self.board_size, self.tamanos_barcos))
+
+    @property
+    def nombre(self):
+        """
+        Nombre corto para ficheros, p. ej. "n20_5-4-3-3-2".
+        """
+        return f"n{self.board_size}_" + "-".join(str(t) for t in self.tamanos_barcos)
+
+    def como_dict(self):
+        return {"board_size": self.board_size, "tamanos_barcos": list(self.tamanos_barcos)}
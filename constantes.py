@@ -11,23 +11,68 @@ y mantener una configuración centralizada.
 from estrategias.aleatoria import EstrategiaAleatoria
 from estrategias.optimizada import EstrategiaOptimizada
 from estrategias.optimizada2 import EstrategiaOptimizada2
+from estrategias.densidad import EstrategiaDensidad
 
 # === Parámetros generales ===
 
-# Tamaño del tablero (cuadrado)
+# Tamaño del tablero (cuadrado). Junto con TAMANOS_BARCOS, es la configuración por
+# defecto de las partidas (ver configuracion.py); barrido.py recorre otras.
 BOARD_SIZE = 20
 
+# Desde este tamaño de tablero, los tableros, el índice de la flota de cada jugador y
+# la colocación de barcos guardan solo las casillas ocupadas en lugar de N² bytes
+# (ver tablero.py). None para usar siempre la representación densa.
+UMBRAL_TABLERO_DISPERSO = 2000
+
 ### Está por defecto para mostrar una sola partida con estrategia optimizada2.
 
 # Número de simulaciones a realizar en una partida por estrategia
 NUM_SIMULACIONES = 1
 
-# Estrategias disponibles
+# Forma de repartir las partidas en main.py:
+# - "cola": el coordinador (rank 0) reparte las partidas una a una a los trabajadores.
+# - "lotes": cada proceso juega localmente un bloque de partidas y los resultados se
+#   agregan con operaciones colectivas. Recomendado para muchas simulaciones.
+# - "vectorizado": un único proceso juega todas las partidas de cada pareja a la vez
+#   con NumPy (solo para las estrategias con perfil en simulador_vectorizado.py).
+MODO_EJECUCION = "cola"
+
+# Organización de los procesos que no son el coordinador (rank 0) en el modo "cola":
+# - "parejas": se agrupan de dos en dos y cada pareja juega sus partidas por MPI.
+# - "local": cada proceso juega partidas completas él solo con el motor local.
+MODO_TRABAJADORES = "parejas"
+
+# Partidas que cada pareja de trabajadores juega a la vez en el modo "cola" (ver
+# multiplexado.py). Con más de una, los disparos de todas las partidas de la pareja
+# viajan juntos en un mensaje por intercambio.
+PARTIDAS_POR_PAREJA = 1
+
+# Especulación en las partidas por MPI (ver partida.py): mientras llega la respuesta a
+# un disparo, preparar el siguiente para cada respuesta posible sobre copias de la
+# estrategia. Copiar una estrategia cuesta más que decidir en todas las actuales, así
+# que solo compensa con estrategias más caras o con latencias de red altas.
+ESPECULAR_RESPUESTAS = False
+
+# Transporte en memoria compartida (ver transporte.py y partida.ParejaMemoria): bytes de
+# cada anillo y comprobaciones del anillo antes de bloquearse esperando un mensaje.
+CAPACIDAD_ANILLO = 1 << 20
+ESPERA_ACTIVA = 2000
+
+# Todas las estrategias implementadas, por nombre (los motores las buscan aquí)
+ESTRATEGIAS = {
+    "aleatoria": EstrategiaAleatoria,
+    "optimizada": EstrategiaOptimizada,
+    "optimizada2": EstrategiaOptimizada2,
+    "densidad": EstrategiaDensidad,
+}
+
+# Estrategias que enfrenta main.py
 # Se pueden añadir más estrategias comentando/descomentando las líneas correspondientes.
 ESTRATEGIAS_DISPONIBLES = {
     #"aleatoria": EstrategiaAleatoria,
     #"optimizada": EstrategiaOptimizada,
     "optimizada2": EstrategiaOptimizada2,
+    #"densidad": EstrategiaDensidad,
 }
 
 # Activa o desactiva la impresión en tiempo real
@@ -40,6 +85,60 @@ MOSTRAR_TABLERO = True
 # o simulaciones para evitar saturar la salida en MPI.
 # Solo está para debugging o pruebas locales.
 
+# Registro de disparos de cada partida (ver eventos.py): eventos retenidos como máximo
+# (los más antiguos se aplican al tablero base) y directorio donde se guarda el
+# registro de cada partida para verlo después con repeticion.py (None para no guardarlo).
+CAPACIDAD_EVENTOS = 100000
+DIRECTORIO_EVENTOS = None
+
+# Medir el tiempo de cada fase del turno (decidir, comunicar, resolver), los mensajes
+# por etiqueta y el histograma del tiempo de decisión de cada estrategia (ver
+# instrumentacion.py). Desactivado no añade coste apreciable.
+INSTRUMENTAR = False
+
+# Parada adaptativa (modo "cola"): NUM_SIMULACIONES pasa a ser el máximo por pareja y
+# el coordinador deja de repartir las partidas de una pareja cuando el intervalo de
+# confianza (Wilson, Z_INTERVALO) de las victorias de J1 mide menos de
+# ANCHO_INTERVALO_PARADA, o cuando el intervalo con Z_DECISION excluye el 50 %.
+# No se comprueba antes de MIN_PARTIDAS_PAREJA partidas.
+PARADA_ADAPTATIVA = False
+ANCHO_INTERVALO_PARADA = 0.05
+Z_INTERVALO = 1.96
+Z_DECISION = 3.29
+MIN_PARTIDAS_PAREJA = 30
+
+# Segundos entre los mensajes de progreso del coordinador (None para no mostrarlos)
+INTERVALO_PROGRESO = 10
+
+# Directorio donde main.py guarda los resultados por bloques (ver almacen.py) para
+# poder reanudar un torneo interrumpido; None para no guardarlos. Al relanzar con el
+# mismo directorio se saltan las partidas ya completadas. Los resultados pendientes se
+# escriben cada INTERVALO_VOLCADO_RESULTADOS segundos aunque el bloque no esté lleno,
+# para no perderlos si el proceso muere. Solo en el modo "cola".
+DIRECTORIO_RESULTADOS = None
+TAM_BLOQUE_RESULTADOS = 10000
+INTERVALO_VOLCADO_RESULTADOS = 30
+
+# Semilla raíz de la que derivan los generadores de cada partida (ver semillas.py).
+# None para usar una nueva en cada ejecución (main.py la imprime para poder repetirla).
+SEMILLA_RAIZ = None
+
+# Jugar la partida i de todas las parejas con las mismas flotas y secuencias aleatorias
+# (números aleatorios comunes), lo que reduce la varianza al comparar parejas.
+NUMEROS_ALEATORIOS_COMUNES = True
+
+# Usar flotas pregeneradas (ver pool_flotas.py) en lugar de colocarlas en cada partida.
+# El pool de la configuración actual se genera con: python pool_flotas.py <num_flotas>
+USAR_POOL_FLOTAS = False
+DIRECTORIO_POOLS = "pools"
+
+# Usar el libro de aperturas de la estrategia de densidad (ver libro_aperturas.py) para
+# sus primeros disparos en lugar de calcularlos. Si no existe el libro de la
+# configuración, la estrategia calcula todos los disparos. Se genera con:
+# python libro_aperturas.py <profundidad>
+USAR_LIBRO_APERTURAS = False
+DIRECTORIO_LIBROS = "libros"
+
 # Tamaños de los barcos en la flota
 # (5 barcos: 1 de tamaño 5, 1 de tamaño 4, 2 de tamaño 3, 1 de tamaño 2)
 TAMANOS_BARCOS = [5, 4, 3, 3, 2]
@@ -49,3 +148,11 @@ SIMBOLO_VACIO = ' '
 SIMBOLO_BARCO = 'B'
 SIMBOLO_AGUA = 'O'
 SIMBOLO_TOCADO = 'X'
+
+# Códigos con los que se guarda cada estado en el tablero (un byte por casilla).
+# Solo se traducen a los símbolos anteriores al imprimir.
+CODIGO_VACIO = 0
+CODIGO_BARCO = 1
+CODIGO_AGUA = 2
+CODIGO_TOCADO = 3
+SIMBOLOS = (SIMBOLO_VACIO, SIMBOLO_BARCO, SIMBOLO_AGUA, SIMBOLO_TOCADO)
@@ -2,14 +2,47 @@
 base.py
 
 Define la clase base que todas las estrategias deben heredar.
+
+Toda la aleatoriedad de una estrategia pasa por self.rng: el generador de la partida
+(ver semillas.py) o, si no se indica ninguno, el módulo random.
 """
 
+import random
 from abc import ABC, abstractmethod
+from estrategias.objetivos import IndiceObjetivos
 
 class Estrategia(ABC):
-    def __init__(self, board_size):
+    __slots__ = ("board_size", "objetivos", "rng")
+
+    # Fracción aproximada del tablero que la estrategia dispara hasta hundir la flota.
+    # main.py la usa para repartir antes las partidas más largas; por defecto se
+    # supone el peor caso (todo el tablero).
+    fraccion_disparos_estimada = 1.0
+
+    # Si es True, el índice de objetivos separa las casillas en clases de paridad
+    # ((x + y) % 2) para que la estrategia pueda explorar en damero.
+    paridad = False
+
+    def __init__(self, board_size, rng=None):
         self.board_size = board_size
-        self.disparos_realizados = set()
+        self.rng = rng if rng is not None else random
+        self.objetivos = IndiceObjetivos(board_size, self.paridad, self.rng)  # Casillas aún disparables
+
+    @classmethod
+    def admite_tablero(cls, board_size):
+        """
+        Indica si la estrategia puede jugar en un tablero de ese tamaño. Las que
+        reservan memoria proporcional al área lo rechazan en los tableros dispersos.
+        """
+        return True
+
+    @classmethod
+    def desde_configuracion(cls, configuracion, rng=None):
+        """
+        Crea la estrategia para la Configuracion de una partida. Las estrategias que
+        necesitan algo más que el tamaño del tablero la redefinen.
+        """
+        return cls(configuracion.board_size, rng=rng)
 
     @abstractmethod
     def siguiente_disparo(self):
@@ -0,0 +1,253 @@
+"""
+densidad.py
+
+Estrategia de disparo por densidad de probabilidad ("mapa de calor").
+
+Para cada casilla se cuenta cuántas colocaciones legales de los barcos que quedan a
+flote la cubren. Una colocación es legal si no pasa por ninguna casilla descartada:
+agua, barcos hundidos, su halo (casillas adyacentes, incluidas diagonales) y las
+diagonales de cada tocado, pues los barcos son rectos y nunca se tocan.
+
+1. Modo "exploración":
+   - Se dispara a la casilla libre con mayor densidad (desempates al azar).
+
+2. Modo "caza":
+   - Mientras haya tocados sin hundir, solo cuentan las colocaciones legales que pasan
+     por algún tocado, y se dispara a la casilla libre que más de ellas cubre.
+
+Los conteos no se recalculan desde cero: para cada longitud de barco se guardan las
+posiciones de inicio legales (horizontales y verticales) y la cobertura que generan.
+Al descartar casillas solo se recalculan, con sumas de ventana deslizante de NumPy, las
+filas y columnas afectadas, y la diferencia se resta de la densidad.
+
+Los arrays ocupan varias veces N² casillas (la densidad, por ejemplo, 8 bytes por
+casilla), así que la estrategia no admite los tableros dispersos de tablero.py
+(UMBRAL_TABLERO_DISPERSO): lanza ValueError al crearla en lugar de agotar la memoria.
+
+Con USAR_LIBRO_APERTURAS, los primeros disparos de exploración se toman del libro de
+aperturas de la configuración (ver libro_aperturas.py) mientras todos hayan sido agua.
+"""
+
+import numpy as np
+
+from estrategias.base import Estrategia
+
+
+def suma_ventana(a, longitud):
+    """
+    Suma de las ventanas de la longitud indicada a lo largo del último eje, mediante
+    sumas acumuladas.
+    """
+    acumulada = np.zeros(a.shape[:-1] + (a.shape[-1] + 1,), dtype=np.int32)
+    np.cumsum(a, axis=-1, out=acumulada[..., 1:])
+    return acumulada[..., longitud:] - acumulada[..., :-longitud]
+
+def cobertura(inicios, longitud):
+    """
+    Convierte inicios legales de colocación (k, N - L + 1) en el número de colocaciones
+    que cubren cada casilla (k, N).
+    """
+    relleno = np.zeros(inicios.shape[:-1] + (inicios.shape[-1] + 2 * (longitud - 1),), dtype=np.int8)
+    relleno[..., longitud - 1:relleno.shape[-1] - longitud + 1] = inicios
+    return suma_ventana(relleno, longitud)
+
+
+class EstrategiaDensidad(Estrategia):
+    __slots__ = (
+        "tamanos_barcos", "barcos_restantes", "descartadas", "disparadas",
+        "inicios_h", "inicios_v", "coberturas", "densidad", "tocados",
+        "libro", "clave_libro", "aguas_libro",
+    )
+
+    # Medida con 1000 flotas en un tablero de 20x20: unos 134 disparos
+    fraccion_disparos_estimada = 0.34
+
+    @classmethod
+    def desde_configuracion(cls, configuracion, rng=None):
+        from libro_aperturas import libro_activo
+        return cls(
+            configuracion.board_size, configuracion.tamanos_barcos, rng=rng,
+            libro=libro_activo(configuracion),
+        )
+
+    @classmethod
+    def admite_tablero(cls, board_size):
+        from tablero import es_disperso
+        return not es_disperso(board_size)
+
+    def __init__(self, board_size, tamanos_barcos=None, rng=None, libro=None):
+        if not self.admite_tablero(board_size):
+            raise ValueError(
+                f"La estrategia de densidad usa arrays de {board_size}x{board_size} casillas y "
+                f"no admite tableros dispersos (UMBRAL_TABLERO_DISPERSO)."
+            )
+        super().__init__(board_size, rng)
+        if tamanos_barcos is None:
+            from constantes import TAMANOS_BARCOS
+            tamanos_barcos = TAMANOS_BARCOS
+        n = board_size
+        self.tamanos_barcos = tamanos_barcos
+
+        # Barcos a flote por longitud
+        self.barcos_restantes = {}
+        for tam in tamanos_barcos:
+            self.barcos_restantes[tam] = self.barcos_restantes.get(tam, 0) + 1
+
+        self.descartadas = np.zeros((n, n), dtype=np.int8)   # Casillas donde no puede haber barco
+        self.disparadas = np.zeros((n, n), dtype=bool)
+        self.tocados = set()                                 # Tocados aún sin hundir
+
+        # Por longitud: inicios legales horizontales (fila, columna de inicio), verticales
+        # (columna, fila de inicio) y número de colocaciones que cubren cada casilla.
+        self.inicios_h = {}
+        self.inicios_v = {}
+        self.coberturas = {}
+        self.densidad = np.zeros((n, n), dtype=np.int64)
+        for tam, cuantos in self.barcos_restantes.items():
+            self.inicios_h[tam] = np.ones((n, n - tam + 1), dtype=np.int8)
+            self.inicios_v[tam] = np.ones((n, n - tam + 1), dtype=np.int8)
+            self.coberturas[tam] = (
+                cobertura(self.inicios_h[tam], tam) + cobertura(self.inicios_v[tam], tam).T
+            ).astype(np.int64)
+            self.densidad += cuantos * self.coberturas[tam]
+
+        # Libro de aperturas, clave del historial de aguas y aguas aún no descartadas:
+        # dentro del libro la densidad no se necesita y se actualiza de una vez al salir.
+        self.libro = libro
+        self.clave_libro = 0
+        self.aguas_libro = []
+
+    def siguiente_disparo(self):
+        x, y = self.disparo_caza() if self.tocados else self.disparo_exploracion()
+        self.disparadas[x, y] = True
+        self.objetivos.descartar(x, y)
+        return x, y
+
+    def registrar_resultado(self, x, y, resultado):
+        if self.libro is not None:
+            if resultado == 'agua':
+                self.clave_libro ^= self.libro.zobrist[x * self.board_size + y]
+                self.aguas_libro.append((x, y))
+                return
+            self.salir_libro()
+
+        if resultado == 'agua':
+            self.descartar([(x, y)])
+        elif resultado == 'tocado':
+            self.tocados.add((x, y))
+            self.descartar([(x + dx, y + dy) for dx in (-1, 1) for dy in (-1, 1)])
+        elif resultado == 'hundido':
+            barco = self.barco_hundido(x, y)
+            tam = len(barco)
+            if self.barcos_restantes.get(tam):
+                self.barcos_restantes[tam] -= 1
+                self.densidad -= self.coberturas[tam]
+            self.descartar([
+                (bx + dx, by + dy) for bx, by in barco for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+            ])
+        # Con 'FIN' la partida ha terminado
+
+    def barco_hundido(self, x, y):
+        """
+        Devuelve las casillas del barco hundido en (x, y): el grupo de tocados conectados
+        con esa casilla, que se retiran de los tocados pendientes.
+        """
+        barco = [(x, y)]
+        pendientes = [(x, y)]
+        while pendientes:
+            cx, cy = pendientes.pop()
+            for vecino in ((cx - 1, cy), (cx + 1, cy), (cx, cy - 1), (cx, cy + 1)):
+                if vecino in self.tocados:
+                    self.tocados.discard(vecino)
+                    barco.append(vecino)
+                    pendientes.append(vecino)
+        return barco
+
+    def descartar(self, casillas):
+        """
+        Marca las casillas como imposibles para un barco y actualiza los inicios legales,
+        las coberturas y la densidad de las filas y columnas afectadas.
+        """
+        n = self.board_size
+        nuevas = [
+            (x, y) for x, y in casillas
+            if 0 <= x < n and 0 <= y < n and not self.descartadas[x, y]
+        ]
+        if not nuevas:
+            return
+        filas = sorted({x for x, _ in nuevas})
+        columnas = sorted({y for _, y in nuevas})
+        for x, y in nuevas:
+            self.descartadas[x, y] = 1
+
+        for tam, cuantos in self.barcos_restantes.items():
+            if not cuantos:
+                continue
+            # Horizontales: filas afectadas
+            legales = (suma_ventana(self.descartadas[filas], tam) == 0).astype(np.int8)
+            perdidas = cobertura(self.inicios_h[tam][filas] - legales, tam)
+            self.inicios_h[tam][filas] = legales
+            self.coberturas[tam][filas] -= perdidas
+            self.densidad[filas] -= cuantos * perdidas
+            # Verticales: columnas afectadas
+            legales = (suma_ventana(self.descartadas[:, columnas].T, tam) == 0).astype(np.int8)
+            perdidas = cobertura(self.inicios_v[tam][columnas] - legales, tam).T
+            self.inicios_v[tam][columnas] = legales
+            self.coberturas[tam][:, columnas] -= perdidas
+            self.densidad[:, columnas] -= cuantos * perdidas
+
+    def disparo_caza(self):
+        """
+        Elige la casilla libre cubierta por más colocaciones legales que pasen por los
+        tocados pendientes.
+        """
+        n = self.board_size
+        puntuacion = {}
+        for tx, ty in self.tocados:
+            for tam, cuantos in self.barcos_restantes.items():
+                if not cuantos:
+                    continue
+                for inicio in range(max(0, ty - tam + 1), min(ty, n - tam) + 1):
+                    if self.inicios_h[tam][tx, inicio]:
+                        for y in range(inicio, inicio + tam):
+                            if not self.disparadas[tx, y]:
+                                puntuacion[(tx, y)] = puntuacion.get((tx, y), 0) + cuantos
+                for inicio in range(max(0, tx - tam + 1), min(tx, n - tam) + 1):
+                    if self.inicios_v[tam][ty, inicio]:
+                        for x in range(inicio, inicio + tam):
+                            if not self.disparadas[x, ty]:
+                                puntuacion[(x, ty)] = puntuacion.get((x, ty), 0) + cuantos
+
+        if not puntuacion:
+            # Ninguna colocación explica los tocados: se explora con la densidad global
+            self.tocados.clear()
+            return self.disparo_exploracion()
+        maximo = max(puntuacion.values())
+        return self.rng.choice([c for c, p in puntuacion.items() if p == maximo])
+
+    def disparo_exploracion(self):
+        """
+        Elige la casilla libre con mayor densidad, del libro de aperturas si el
+        historial está en él.
+        """
+        if self.libro is not None:
+            mejores = self.libro.jugadas(self.clave_libro)
+            if mejores is not None:
+                return divmod(self.rng.choice(mejores), self.board_size)
+            self.salir_libro()
+        return divmod(int(self.rng.choice(self.casillas_exploracion())), self.board_size)
+
+    def salir_libro(self):
+        """
+        Deja de usar el libro de aperturas y descarta las aguas registradas en él.
+        """
+        self.libro = None
+        self.descartar(self.aguas_libro)
+        self.aguas_libro = []
+
+    def casillas_exploracion(self):
+        """
+        Devuelve las casillas libres con mayor densidad (índices x * N + y, en orden).
+        """
+        puntuacion = np.where(self.disparadas, -1, self.densidad)
+        return np.flatnonzero(puntuacion == puntuacion.max())
@@ -0,0 +1,227 @@
+"""
+objetivos.py
+
+Índice de las casillas a las que una estrategia todavía puede disparar.
+
+Las estrategias elegían su disparo sorteando (x, y) hasta dar con una casilla válida.
+Al final de la partida casi todos los sorteos fallan, y si las casillas que admite la
+estrategia se agotan el bucle no termina nunca. El índice guarda las casillas
+disponibles repartidas en clases de paridad ((x + y) % 2) y permite, en O(1):
+
+- sortear una casilla disponible de una clase,
+- descartar una casilla (al dispararla o al excluirla por el halo de un barco hundido),
+- consultar si una casilla sigue disponible.
+
+Cada clase es una permutación de Fisher-Yates dispersa: las casillas de la clase se
+numeran de 0 a n-1 y las primeras `restantes` posiciones de la permutación son las
+disponibles. Solo se guardan en diccionarios las posiciones que se han intercambiado,
+de modo que la memoria crece con el número de disparos y no con el tamaño del tablero.
+
+Para tableros grandes (ver tablero.py) el índice ofrece además consultas que no
+recorren el tablero:
+
+- la casilla disponible más cercana a otra dentro de una clase de paridad, buscando
+  por anillos de distancia creciente, de modo que el coste depende de la distancia y
+  no del tamaño del tablero;
+- si una casilla cae en el halo de un barco hundido (la casilla o alguna adyacente,
+  incluidas diagonales, es de un barco hundido), en O(1). Solo se guardan las casillas
+  de los barcos hundidos: el halo no se descarta del índice, porque eso añadiría
+  entradas por cada una de sus casillas.
+
+Los sorteos usan el generador que recibe el índice (un random.Random propio de la
+partida, ver semillas.py) o, si no recibe ninguno, el módulo random.
+
+Clases:
+- IndiceObjetivos: casillas disponibles de un tablero, por clases de paridad.
+"""
+
+import random
+
+
+class ClaseObjetivos:
+    """
+    Permutación dispersa de los índices 0..n-1 de una clase de casillas.
+    """
+
+    __slots__ = ("restantes", "valor", "posicion")
+
+    def __init__(self, tamano):
+        self.restantes = tamano
+        self.valor = {}      # posición -> índice, solo si difiere de la identidad
+        self.posicion = {}   # índice -> posición, solo si difiere de la identidad
+
+    def contiene(self, k):
+        return self.posicion.get(k, k) < self.restantes
+
+    def muestrear(self, rng):
+        i = rng.randrange(self.restantes)
+        return self.valor.get(i, i)
+
+    def descartar(self, k):
+        """
+        Intercambia k con la última posición disponible y la saca del rango disponible.
+        """
+        i = self.posicion.get(k, k)
+        if i >= self.restantes:
+            return
+        ultima = self.restantes - 1
+        k_ultima = self.valor.get(ultima, ultima)
+        self.valor[i] = k_ultima
+        self.posicion[k_ultima] = i
+        self.valor[ultima] = k
+        self.posicion[k] = ultima
+        self.restantes = ultima
+
+
+class IndiceObjetivos:
+    """
+    Casillas disponibles de un tablero de board_size x board_size.
+
+    Con paridad=True las casillas se reparten en dos clases según (x + y) % 2; sin
+    paridad hay una sola clase con todo el tablero.
+    """
+
+    __slots__ = ("board_size", "paridad", "clases", "rng", "hundidas")
+
+    def __init__(self, board_size, paridad=False, rng=None):
+        self.board_size = board_size
+        self.paridad = paridad
+        self.rng = rng if rng is not None else random
+        self.hundidas = set()   # Casillas de los barcos hundidos
+        if paridad:
+            self.clases = (
+                ClaseObjetivos(self._tamano_clase(0)),
+                ClaseObjetivos(self._tamano_clase(1)),
+            )
+        else:
+            self.clases = (ClaseObjetivos(board_size * board_size),)
+
+    def __len__(self):
+        return sum(clase.restantes for clase in self.clases)
+
+    def _tamano_clase(self, p):
+        # Cada par de filas tiene exactamente board_size casillas de cada clase; si el
+        # número de filas es impar, la última fila (par) aporta las de su paridad.
+        n = self.board_size
+        return (n // 2) * n + ((n - p + 1) // 2 if n % 2 else 0)
+
+    def _a_indice(self, x, y):
+        """
+        Devuelve (clase, índice dentro de la clase) de la casilla (x, y).
+        """
+        n = self.board_size
+        if not self.paridad:
+            return 0, x * n + y
+        p = (x + y) % 2
+        k = (x // 2) * n
+        if x % 2:
+            k += (n - p + 1) // 2 + (y - (1 - p)) // 2
+        else:
+            k += (y - p) // 2
+        return p, k
+
+    def _a_casilla(self, p, k):
+        n = self.board_size
+        if not self.paridad:
+            return divmod(k, n)
+        bloque, r = divmod(k, n)
+        primera = (n - p + 1) // 2   # casillas de la clase en la fila par del bloque
+        if r < primera:
+            return 2 * bloque, 2 * r + p
+        return 2 * bloque + 1, 2 * (r - primera) + 1 - p
+
+    def restantes(self, clase=0):
+        return self.clases[clase].restantes
+
+    def contiene(self, x, y):
+        """
+        Devuelve True si (x, y) está dentro del tablero y sigue disponible.
+        """
+        if not (0 <= x < self.board_size and 0 <= y < self.board_size):
+            return False
+        p, k = self._a_indice(x, y)
+        return self.clases[p].contiene(k)
+
+    def descartar(self, x, y):
+        """
+        Quita (x, y) de las casillas disponibles. No hace nada si ya no lo estaba o si
+        cae fuera del tablero.
+        """
+        if 0 <= x < self.board_size and 0 <= y < self.board_size:
+            p, k = self._a_indice(x, y)
+            self.clases[p].descartar(k)
+
+    def muestrear(self, clase=0):
+        """
+        Devuelve una casilla disponible de la clase indicada, elegida al azar, sin
+        descartarla. Si la clase está vacía devuelve None.
+        """
+        c = self.clases[clase]
+        if not c.restantes:
+            return None
+        return self._a_casilla(clase, c.muestrear(self.rng))
+
+    def muestrear_cualquiera(self):
+        """
+        Devuelve una casilla disponible de cualquier clase, uniforme sobre todas ellas,
+        o None si no queda ninguna.
+        """
+        total = len(self)
+        if not total:
+            return None
+        r = self.rng.randrange(total)
+        for p, clase in enumerate(self.clases):
+            if r < clase.restantes:
+                return self._a_casilla(p, clase.valor.get(r, r))
+            r -= clase.restantes
+
+    def mas_cercana(self, x, y, clase=0, fuera_de_halo=False):
+        """
+        Devuelve la casilla disponible de la clase indicada más cercana a (x, y) en
+        distancia de Chebyshev, o None si no hay ninguna. Con fuera_de_halo se saltan
+        las casillas del halo de los barcos hundidos. Recorre anillos alrededor de
+        (x, y), así que el coste depende de la distancia y no del tablero.
+        """
+        if not self.clases[clase].restantes:
+            return None
+        n = self.board_size
+        alcance = max(x, y, n - 1 - x, n - 1 - y)
+        for r in range(alcance + 1):
+            for cx, cy in self._anillo(x, y, r):
+                if 0 <= cx < n and 0 <= cy < n:
+                    p, k = self._a_indice(cx, cy)
+                    if p == clase and self.clases[p].contiene(k) and not (
+                        fuera_de_halo and self.en_halo(cx, cy)
+                    ):
+                        return cx, cy
+        return None
+
+    @staticmethod
+    def _anillo(x, y, r):
+        """
+        Casillas a distancia de Chebyshev exactamente r de (x, y), dentro o no del tablero.
+        """
+        if r == 0:
+            yield x, y
+            return
+        for d in range(-r, r + 1):
+            yield x - r, y + d
+            yield x + r, y + d
+        for d in range(-r + 1, r):
+            yield x + d, y - r
+            yield x + d, y + r
+
+    def registrar_hundido(self, barco):
+        """
+        Registra las casillas de un barco hundido para en_halo(). Su halo no se descarta
+        del índice: en tableros grandes eso añadiría entradas por cada casilla del halo.
+        """
+        self.hundidas.update(barco)
+
+    def en_halo(self, x, y):
+        """
+        Devuelve True si (x, y) es una casilla de un barco hundido o adyacente a ella.
+        """
+        return any(
+            (x + dx, y + dy) in self.hundidas for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+        )
@@ -23,33 +23,35 @@ Ventajas de esta estrategia:
 """
 
 
-import random
+from collections import deque
 from estrategias.base import Estrategia
 
 class EstrategiaOptimizada(Estrategia):
-    def __init__(self, board_size):
-        super().__init__(board_size)
+    __slots__ = ("modo", "tocados", "candidatos", "hundidos")
+
+    # Media medida en resultados.md: unos 212 disparos en un tablero de 20x20
+    fraccion_disparos_estimada = 0.53
+
+    def __init__(self, board_size, rng=None):
+        super().__init__(board_size, rng)
         self.board_size = board_size
         self.modo = "exploracion"
         self.tocados = []         # Coordenadas de los barcos del rival tocados
-        self.candidatos = []      # Coordenadas para probar en modo caza
+        self.candidatos = deque() # Coordenadas para probar en modo caza
         self.hundidos = []        # Coordenadas de los barcos del rival hundidos
 
     def siguiente_disparo(self):
         if self.modo == "caza" and self.candidatos:
             while self.candidatos:
-                x, y = self.candidatos.pop(0)
+                x, y = self.candidatos.popleft()
                 if self.es_disparo_valido(x, y):
-                    self.disparos_realizados.add((x, y))
+                    self.objetivos.descartar(x, y)
                     return x, y
 
-        # Exploración aleatoria tipo damero
-        while True:
-            x = random.randint(0, self.board_size - 1)
-            y = random.randint(0, self.board_size - 1)
-            if self.es_disparo_valido(x, y):
-                self.disparos_realizados.add((x, y))
-                return x, y
+        # Exploración aleatoria entre las casillas aún disponibles
+        x, y = self.objetivos.muestrear_cualquiera()
+        self.objetivos.descartar(x, y)
+        return x, y
 
     def registrar_resultado(self, x, y, resultado):
         if resultado == 'tocado':
@@ -69,23 +71,8 @@ class EstrategiaOptimizada(Estrategia):
         Devuelve True si (x, y) es una coordenada válida para disparar:
         - Dentro del tablero
         - No ha sido disparada antes
-        - No está adyacente (incluyendo diagonales) a ningún barco hundido
         """
-        valido = (
-            0 <= x < self.board_size and
-            0 <= y < self.board_size and
-            (x, y) not in self.disparos_realizados
-        )
-
-        if not valido:
-            return False
-
-        #for bx, by in self.hundidos:
-         #   if abs(bx - x) <= 1 and abs(by - y) <= 1:
-          #      valido = False
-           #     break
-
-        return valido
+        return self.objetivos.contiene(x, y)
 
 
     def actualizar_candidatos(self):
@@ -117,6 +104,6 @@ class EstrategiaOptimizada(Estrategia):
             ]
 
         # Añadir solo los que sean válidos y aún no disparados
-        self.candidatos = [
+        self.candidatos.extend(
             (x, y) for (x, y) in vecinos if self.es_disparo_valido(x, y)
-        ]
\ No newline at end of file
+        )
\ No newline at end of file
@@ -11,7 +11,9 @@ la exploración y caza, se implementa un patrón de disparo más eficiente:
   ya que ningún barco puede ocupar una sola celda.
 
 - Ahora se almacenan los barcos hundidos para evitar disparos en celdas adyacentes,
-  pues no puede haber dos barcos con distancia de Chevyshev nula.
+  pues no puede haber dos barcos con distancia de Chevyshev nula. Se guardan en el
+  índice de objetivos, que solo retira una casilla del halo cuando se sortea, de modo
+  que la memoria crece con los barcos y no con su halo.
 
 Ventajas de esta estrategia:
 - Aumenta notablemente la eficiencia en la localización de barcos.
@@ -19,33 +21,50 @@ Ventajas de esta estrategia:
 """
 
 
-import random
+from collections import deque
 from estrategias.base import Estrategia
 
 class EstrategiaOptimizada2(Estrategia):
-    def __init__(self, board_size):
-        super().__init__(board_size)
+    __slots__ = ("modo", "tocados", "candidatos")
+
+    # Media medida en resultados.md: unos 154 disparos en un tablero de 20x20
+    fraccion_disparos_estimada = 0.38
+
+    paridad = True
+
+    def __init__(self, board_size, rng=None):
+        super().__init__(board_size, rng)
         self.board_size = board_size
         self.modo = "exploracion"
         self.tocados = []         # Coordenadas de los barcos del rival tocados
-        self.candidatos = []      # Coordenadas para probar en modo caza
-        self.hundidos = []        # Coordenadas de los barcos del rival hundidos
+        self.candidatos = deque() # Coordenadas para probar en modo caza
 
     def siguiente_disparo(self):
         if self.modo == "caza" and self.candidatos:
             while self.candidatos:
-                x, y = self.candidatos.pop(0)
+                x, y = self.candidatos.popleft()
                 if self.es_disparo_valido(x, y):
-                    self.disparos_realizados.add((x, y))
+                    self.objetivos.descartar(x, y)
                     return x, y
 
-        # Exploración aleatoria tipo ajedrez
-        while True:
-            x = random.randint(0, self.board_size - 1)
-            y = random.randint(0, self.board_size - 1)
-            if (x + y) % 2 == 0 and self.es_disparo_valido(x, y):
-                self.disparos_realizados.add((x, y))
-                return x, y
+        # Exploración aleatoria tipo ajedrez. Si las casillas blancas se agotan (todas
+        # disparadas o excluidas por el halo), se pasa a las negras.
+        casilla = self.muestrear_fuera_de_halo(0) or self.muestrear_fuera_de_halo(1)
+        x, y = casilla
+        self.objetivos.descartar(x, y)
+        return x, y
+
+    def muestrear_fuera_de_halo(self, clase):
+        """
+        Sortea una casilla disponible de la clase que no esté en el halo de un barco
+        hundido, o devuelve None si no queda ninguna. Las del halo que salen se
+        descartan, así que el sorteo es uniforme sobre las demás.
+        """
+        casilla = self.objetivos.muestrear(clase)
+        while casilla is not None and self.objetivos.en_halo(*casilla):
+            self.objetivos.descartar(*casilla)
+            casilla = self.objetivos.muestrear(clase)
+        return casilla
 
     def registrar_resultado(self, x, y, resultado):
         if resultado == 'tocado':
@@ -54,7 +73,7 @@ class EstrategiaOptimizada2(Estrategia):
             self.actualizar_candidatos()
         elif resultado == 'hundido':
             self.tocados.append((x, y))
-            self.hundidos.extend(self.tocados)
+            self.objetivos.registrar_hundido(self.tocados)
             self.tocados.clear()
             self.candidatos.clear()
             self.modo = "exploracion"
@@ -67,21 +86,7 @@ class EstrategiaOptimizada2(Estrategia):
         - No ha sido disparada antes
         - No es adyacente (incluyendo diagonales) a ningún barco hundido
         """
-        valido = (
-            0 <= x < self.board_size and
-            0 <= y < self.board_size and
-            (x, y) not in self.disparos_realizados
-        )
-
-        if not valido:
-            return False
-
-        for bx, by in self.hundidos:
-            if abs(bx - x) <= 1 and abs(by - y) <= 1:
-                valido = False
-                break
-
-        return valido
+        return self.objetivos.contiene(x, y) and not self.objetivos.en_halo(x, y)
 
 
     def actualizar_candidatos(self):
@@ -113,6 +118,6 @@ class EstrategiaOptimizada2(Estrategia):
             ]
 
         # Añade solo los que sean válidos y aún no disparados
-        self.candidatos = [
+        self.candidatos.extend(
             (x, y) for (x, y) in vecinos if self.es_disparo_valido(x, y)
-        ]
\ No newline at end of file
+        )
\ No newline at end of file
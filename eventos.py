@@ -0,0 +1,339 @@
+"""
+eventos.py
+
+Este módulo gestiona el registro y la impresión de los eventos de una partida.
+
+Se separa de partida.py para que cualquier motor de juego (MPI o local, en un único
+proceso) pueda reutilizarlo sin depender de mpi4py.
+
+Cada partida tiene su propio registro (RegistroEventos) con el flujo de disparos:
+para cada turno se guarda solo el delta (turno, atacante, x, y, código del resultado)
+en un array estructurado de NumPy de 10 bytes por evento, en lugar de un diccionario
+con una copia del tablero. El registro es un buffer circular de CAPACIDAD_EVENTOS
+eventos: cuando se llena, el evento más antiguo se aplica al tablero base de su
+receptor (el tablero con la flota inicial) antes de sobrescribirlo. Así, el tablero
+de cualquier jugador en cualquier turno retenido se reconstruye aplicando los deltas
+sobre su base, y el coste de memoria está acotado sea cual sea la duración de la
+partida.
+
+Funciones:
+- aplicar_disparo(): aplica un disparo a un tablero con la flota colocada.
+- guardar_registro(): guarda el registro de una partida en DIRECTORIO_EVENTOS.
+- texto_evento(): texto de un disparo y, opcionalmente, del tablero del receptor.
+- imprimir_eventos_guardados(): imprime los eventos guardados al final de la partida.
+
+Clases:
+- FiltroEventos: decide qué disparos se imprimen según MOSTRAR_DISPAROS.
+- RegistroEventos: buffer circular de deltas de una partida y reconstrucción de tableros.
+
+Ver repeticion.py para reconstruir e imprimir tableros de un registro guardado.
+"""
+
+import json
+import os
+import sys
+import numpy as np
+
+from tablero import Tablero, RenderizadorTablero, CeldasDispersas
+from protocolo import CODIGOS, RESULTADOS
+from constantes import (
+    MOSTRAR_DISPAROS, CAPACIDAD_EVENTOS, DIRECTORIO_EVENTOS,
+    CODIGO_BARCO, CODIGO_TOCADO, CODIGO_AGUA,
+)
+
+# Eventos reservados al crear un registro; el buffer se duplica hasta la capacidad
+EVENTOS_INICIALES = 256
+
+# Un evento por disparo: el receptor es siempre 1 - atacante
+DTYPE_EVENTO = np.dtype([
+    ("turno", np.int32),
+    ("atacante", np.uint8),
+    ("x", np.int16),
+    ("y", np.int16),
+    ("codigo", np.int8),   # Código de protocolo.py (AGUA, TOCADO, HUNDIDO, FIN)
+])
+
+
+class FiltroEventos:
+    """
+    Decide, disparo a disparo, si un evento debe imprimirse según MOSTRAR_DISPAROS.
+
+    Cada jugador que recibe disparos tiene su propio filtro, ya que el criterio
+    depende de los resultados anteriores que ha ido respondiendo.
+    """
+
+    def __init__(self, nombre_estrategia):
+        """
+        Parámetros:
+            nombre_estrategia: nombre de la estrategia del jugador que recibe los disparos.
+        """
+        self.nombre_estrategia = nombre_estrategia
+        self.caza = False  # Variable para indicar si se está cazando
+        self.resultado_anterior = None
+
+    def debe_guardar(self, turno, resultado):
+        """
+        Devuelve True si el disparo del turno indicado debe mostrarse.
+
+        Parámetros:
+            turno: número de turno.
+            resultado: resultado del disparo ("agua", "tocado", "hundido", "FIN").
+        """
+        if self.nombre_estrategia == "optimizada":
+            if resultado == 'tocado':
+                self.caza = True
+            elif resultado == 'hundido':
+                self.caza = False
+
+        match MOSTRAR_DISPAROS:
+            case "Solo aciertos":
+                debe_guardar = (
+                    turno < 2 or
+                    resultado in {'tocado', 'hundido'} or
+                    self.resultado_anterior == 'hundido' or
+                    self.caza
+                )
+                self.resultado_anterior = resultado
+            case "Todos":
+                debe_guardar = True
+            case "Ninguno":
+                debe_guardar = True
+
+        return debe_guardar
+
+
+def aplicar_disparo(tablero, x, y):
+    """
+    Marca un disparo en un tablero con la flota colocada, igual que
+    Jugador.recibir_disparo(): tocado si hay barco, agua si no.
+    """
+    if tablero.obtener(x, y) in (CODIGO_BARCO, CODIGO_TOCADO):
+        tablero.marcar(x, y, CODIGO_TOCADO)
+    else:
+        tablero.marcar(x, y, CODIGO_AGUA)
+
+
+class RegistroEventos:
+    """
+    Buffer circular con los disparos de una partida y los tableros base de los
+    jugadores.
+    """
+
+    __slots__ = (
+        "board_size", "estrategias", "capacidad", "eventos", "siguiente", "retenidos",
+        "total", "bases", "turno_base",
+    )
+
+    def __init__(self, estrategias, tableros, board_size, capacidad=CAPACIDAD_EVENTOS):
+        """
+        Parámetros:
+            estrategias: nombres de las estrategias de los jugadores 0 y 1.
+            tableros: tableros de los jugadores 0 y 1 con la flota inicial (None para
+                      un jugador remoto, cuyos disparos recibidos no se registran aquí).
+            board_size: tamaño del tablero.
+            capacidad: eventos retenidos como máximo.
+        """
+        self.board_size = board_size
+        self.estrategias = tuple(estrategias)
+        self.capacidad = capacidad
+        self.eventos = np.zeros(min(capacidad, EVENTOS_INICIALES), dtype=DTYPE_EVENTO)
+        self.siguiente = 0      # Posición del próximo evento en el buffer
+        self.retenidos = 0      # Eventos en el buffer
+        self.total = 0          # Eventos registrados, incluidos los ya aplicados a la base
+        self.bases = [t.copia() if t is not None else None for t in tableros]
+        self.turno_base = -1    # Último turno aplicado a los tableros base
+
+    def __len__(self):
+        return self.retenidos
+
+    def anotar(self, turno, atacante, x, y, resultado):
+        """
+        Registra un disparo. Si el buffer ha llegado a la capacidad, el evento más
+        antiguo se aplica al tablero base de su receptor.
+        """
+        i = self.siguiente
+        if self.retenidos == self.capacidad:
+            self._aplicar_a_base(self.eventos[i])
+        else:
+            if self.retenidos == len(self.eventos):
+                # Hasta llenarse por primera vez el buffer no da la vuelta: basta ampliarlo
+                self.eventos = np.concatenate((self.eventos, np.zeros_like(self.eventos)))[:self.capacidad]
+            self.retenidos += 1
+        self.eventos[i] = (turno, atacante, x, y, CODIGOS[resultado])
+        self.siguiente = (i + 1) % self.capacidad
+        self.total += 1
+
+    def _aplicar_a_base(self, evento):
+        aplicar_disparo(self.bases[1 - evento["atacante"]], int(evento["x"]), int(evento["y"]))
+        self.turno_base = max(self.turno_base, int(evento["turno"]))
+
+    def ordenados(self):
+        """
+        Devuelve los eventos retenidos en orden cronológico.
+        """
+        if self.retenidos < self.capacidad:
+            return self.eventos[:self.retenidos]
+        return np.concatenate((self.eventos[self.siguiente:], self.eventos[:self.siguiente]))
+
+    def fusionar(self, otro):
+        """
+        Añade los eventos y tableros base de otro registro de la misma partida (el del
+        otro jugador en una partida por MPI) y devuelve este registro.
+        """
+        todos = np.concatenate((self.ordenados(), otro.ordenados()))
+        todos = todos[np.argsort(todos["turno"], kind="stable")]
+        for j, base in enumerate(otro.bases):
+            if self.bases[j] is None:
+                self.bases[j] = base
+        self.turno_base = max(self.turno_base, otro.turno_base)
+        sobrantes = len(todos) - self.capacidad
+        for evento in todos[:max(sobrantes, 0)]:
+            self._aplicar_a_base(evento)
+        todos = todos[max(sobrantes, 0):]
+        self.eventos = np.zeros(max(len(todos), min(self.capacidad, EVENTOS_INICIALES)), dtype=DTYPE_EVENTO)
+        self.eventos[:len(todos)] = todos
+        self.retenidos = len(todos)
+        self.siguiente = self.retenidos % self.capacidad
+        self.total += otro.total
+        return self
+
+    def recorrer(self):
+        """
+        Recorre los eventos retenidos en orden cronológico junto con el tablero de su
+        receptor justo después del disparo. El tablero es el mismo objeto en todos
+        los eventos de un jugador: hay que copiarlo para guardarlo.
+
+        Yields:
+            (evento, tablero)
+        """
+        tableros = [base.copia() if base is not None else None for base in self.bases]
+        for evento in self.ordenados():
+            tablero = tableros[1 - evento["atacante"]]
+            aplicar_disparo(tablero, int(evento["x"]), int(evento["y"]))
+            yield evento, tablero
+
+    def tablero_en(self, jugador, turno):
+        """
+        Reconstruye el tablero de un jugador tras el disparo del turno indicado.
+
+        Raises:
+            ValueError: si el turno ya no está en el buffer.
+        """
+        if turno < self.turno_base:
+            raise ValueError(
+                f"El turno {turno} ya no está en el registro (empieza en el turno "
+                f"{self.turno_base})."
+            )
+        tablero = self.bases[jugador].copia()
+        for evento in self.ordenados():
+            if evento["turno"] > turno:
+                break
+            if evento["atacante"] != jugador:
+                aplicar_disparo(tablero, int(evento["x"]), int(evento["y"]))
+        return tablero
+
+    def guardar(self, ruta):
+        """
+        Guarda el registro en un fichero .npz comprimido.
+        """
+        meta = {
+            "board_size": self.board_size,
+            "estrategias": self.estrategias,
+            "capacidad": self.capacidad,
+            "total": self.total,
+            "turno_base": self.turno_base,
+        }
+        bases = {}
+        for j, base in enumerate(self.bases):
+            if base is None:
+                continue
+            if isinstance(base.celdas, CeldasDispersas):
+                # Tablero disperso: pares (índice de casilla, código)
+                bases[f"dispersa_j{j}"] = np.array(list(base.celdas.items()), dtype=np.int64).reshape(-1, 2)
+            else:
+                bases[f"base_j{j}"] = np.frombuffer(base.celdas, dtype=np.uint8)
+        np.savez_compressed(ruta, eventos=self.ordenados(), meta=json.dumps(meta), **bases)
+
+    @classmethod
+    def cargar(cls, ruta):
+        """
+        Carga un registro guardado con guardar().
+        """
+        with np.load(ruta) as datos:
+            meta = json.loads(str(datos["meta"]))
+            n = meta["board_size"]
+            tableros = [None, None]
+            for j in (0, 1):
+                if f"base_j{j}" in datos.files:
+                    tableros[j] = Tablero(n, bytearray(datos[f"base_j{j}"].tobytes()))
+                elif f"dispersa_j{j}" in datos.files:
+                    tableros[j] = Tablero(n, CeldasDispersas(datos[f"dispersa_j{j}"].tolist()))
+            eventos = datos["eventos"]
+        registro = cls(meta["estrategias"], tableros, n, max(meta["capacidad"], len(eventos)))
+        registro.eventos = np.zeros(max(len(eventos), 1), dtype=DTYPE_EVENTO)
+        registro.eventos[:len(eventos)] = eventos
+        registro.retenidos = len(eventos)
+        registro.siguiente = registro.retenidos % registro.capacidad
+        registro.total = meta["total"]
+        registro.turno_base = meta["turno_base"]
+        return registro
+
+
+def guardar_registro(registro, indice):
+    """
+    Guarda el registro de la partida con ese índice en DIRECTORIO_EVENTOS, si está
+    definido. Las partidas sin índice no se guardan.
+    """
+    if DIRECTORIO_EVENTOS is None or indice is None:
+        return
+    os.makedirs(DIRECTORIO_EVENTOS, exist_ok=True)
+    e0, e1 = registro.estrategias
+    registro.guardar(os.path.join(DIRECTORIO_EVENTOS, f"{e0}_vs_{e1}_{indice:06d}.npz"))
+
+def texto_evento(evento, renderizador=None):
+    """
+    Devuelve el texto de un disparo y, si se da el renderizador del receptor, su
+    tablero tras recibirlo.
+    """
+    turno = int(evento["turno"])
+    atacante = int(evento["atacante"])
+    receptor = 1 - atacante
+    coordenadas = (int(evento["x"]), int(evento["y"]))
+    resultado = RESULTADOS[evento["codigo"]]
+
+    lineas = [
+        "\n" + "=" * 60,
+        f"[ Turno {turno} ]",
+        f" -> Jugador {atacante} ha disparado en {coordenadas} al Jugador {receptor}.",
+    ]
+    if resultado == 'tocado':
+        lineas.append(" -> [TOCADO]")
+    elif resultado == 'hundido':
+        lineas.append(" -> [HUNDIDO]")
+    elif resultado == 'agua':
+        lineas.append(" -> [AGUA]")
+    if renderizador is not None:
+        lineas.append(f" -> Tablero del Jugador {receptor} tras recibir el disparo.")
+        return "\n".join(lineas) + "\n" + renderizador.fotograma()
+    return "\n".join(lineas) + "\n"
+
+def imprimir_eventos_guardados(registro, mostrar_tablero=False):
+    """
+    Imprime los eventos del registro de la partida en orden cronológico, con
+    información del disparo y, si se pide, el tablero del receptor reconstruido a
+    partir de los deltas. Cada receptor filtra los disparos con su FiltroEventos.
+
+    Los tableros se mantienen con un RenderizadorTablero por jugador, que solo
+    reformatea la casilla disparada, y cada evento se escribe con un único write().
+    """
+    filtros = [FiltroEventos(nombre) for nombre in registro.estrategias]
+    renderizadores = [None, None]
+    for evento, tablero in registro.recorrer():
+        receptor = 1 - evento["atacante"]
+        if mostrar_tablero:
+            if renderizadores[receptor] is None:
+                renderizadores[receptor] = RenderizadorTablero(tablero, jugador_id=receptor)
+            else:
+                renderizadores[receptor].actualizar(int(evento["x"]), int(evento["y"]))
+        if filtros[receptor].debe_guardar(int(evento["turno"]), RESULTADOS[evento["codigo"]]):
+            sys.stdout.write(texto_evento(evento, renderizadores[receptor]))
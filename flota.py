@@ -11,57 +11,301 @@ Responsabilidades principales:
 Cada barco se representa como una lista de coordenadas (x, y), y la flota es una
 lista de estos barcos.
 
+La colocación se hace con un índice de colocaciones: cada colocación posible de un
+barco de tamaño L (orientación y origen) se identifica con un entero, y el colocador
+lleva la cuenta de las casillas bloqueadas por los barcos ya colocados y su halo.
+- En tableros holgados, se sortean colocaciones directamente sobre todo el rango de
+  índices y se descartan las bloqueadas (muestreo por rechazo, sin memoria extra).
+- Si los fallos se acumulan, se construye la lista explícita de colocaciones aún
+  legales para ese barco y se va depurando al sortear, de modo que cada colocación
+  se descarta como mucho una vez.
+- Si un barco se queda sin colocaciones legales se deshace el anterior
+  (backtracking), y si no existe ninguna flota válida se lanza ValueError. La
+  búsqueda está limitada a MAX_NODOS_BUSQUEDA colocaciones: una flota imposible que
+  pasa la comprobación de área falla con ValueError en lugar de explorar un árbol de
+  tamaño exponencial.
+
+En tableros dispersos (ver tablero.py) los bloqueos solo guardan las casillas de los
+barcos colocados y su halo, de modo que colocar una flota no reserva N² bytes. El
+muestreo uniforme y la lista explícita recorren todas las colocaciones, así que en esos
+tableros conviene el muestreo por defecto, que casi nunca falla.
+
+El tamaño del tablero y los barcos llegan como parámetros (la configuración de la
+partida, ver configuracion.py); el módulo no lee constantes globales de tamaño.
+
 Dependencias:
-- constantes.py: proporciona valores como el tamaño del tablero y símbolos del juego.
+- constantes.py: proporciona el código de casilla de los barcos.
 """
 
+import math
 import random
-from constantes import BOARD_SIZE, SIMBOLO_BARCO, SIMBOLO_VACIO
+from constantes import CODIGO_BARCO
+from tablero import crear_celdas
+
+# Fallos seguidos del muestreo por rechazo antes de pasar a la lista explícita
+INTENTOS_ALEATORIOS = 32
+
+# Intentos máximos del muestreo exactamente uniforme
+INTENTOS_UNIFORME = 100000
+
+# Colocaciones máximas que prueba la búsqueda con backtracking de una flota
+MAX_NODOS_BUSQUEDA = 100000
+
+
+def num_colocaciones(board_size, tam):
+    """
+    Devuelve el número de colocaciones posibles de un barco de tamaño tam.
+    Los barcos de tamaño 1 solo se cuentan en horizontal, para no repetirlos.
+    """
+    if tam > board_size:
+        return 0
+    horizontales = board_size * (board_size - tam + 1)
+    return horizontales if tam == 1 else 2 * horizontales
+
+def celdas_colocacion(board_size, tam, indice):
+    """
+    Devuelve las coordenadas (x, y) de la colocación con ese índice. Los primeros
+    índices corresponden a las colocaciones horizontales y el resto a las verticales.
+    """
+    horizontales = board_size * (board_size - tam + 1)
+    if indice < horizontales:
+        x, y = divmod(indice, board_size - tam + 1)
+        return [(x, y + i) for i in range(tam)]
+    x, y = divmod(indice - horizontales, board_size)
+    return [(x + i, y) for i in range(tam)]
+
 
-def generar_flota(tablero, tamanos_barcos):
+class ColocadorFlota:
+    """
+    Coloca flotas de barcos asegurando que haya al menos una casilla de separación
+    (incluso diagonal) entre barcos.
+    """
+
+    def __init__(self, board_size, tamanos_barcos, rng=None):
+        """
+        Parámetros:
+            board_size: tamaño del tablero.
+            tamanos_barcos: lista con los tamaños de cada barco (ej: [5,4,3,3,2]).
+            rng: generador con randrange() y random() (por defecto, el módulo random).
+
+        Lanza ValueError si se puede descartar de antemano que exista una flota válida.
+        """
+        self.board_size = board_size
+        self.tamanos = list(tamanos_barcos)
+        self.rng = rng if rng is not None else random
+        self.totales = [num_colocaciones(board_size, tam) for tam in self.tamanos]
+
+        # Un barco de tamaño L con su halo ocupa un rectángulo de (L + 1) x 2 en un
+        # tablero de (N + 1) x (N + 1): si no caben ni por área, no hay solución
+        area = sum(2 * (tam + 1) for tam in self.tamanos)
+        if 0 in self.totales or area > (board_size + 1) ** 2:
+            raise ValueError(
+                f"No existe ninguna colocación válida de los barcos {self.tamanos} "
+                f"en un tablero de {board_size}x{board_size}."
+            )
+
+        # Número de barcos (incluido su halo) que cubren cada casilla
+        self.bloqueos = crear_celdas(board_size)
+        self.factible = False   # Se ha encontrado ya alguna flota válida
+        self.nodos = 0          # Colocaciones probadas por la búsqueda actual
+        self.colocaciones = {}  # Tamaño -> colocaciones precalculadas (muestreo uniforme)
+
+    def libre(self, celdas):
+        """
+        Devuelve True si ninguna casilla está ocupada ni es adyacente a otro barco.
+        """
+        n = self.board_size
+        return not any(self.bloqueos[x * n + y] for x, y in celdas)
+
+    def marcar(self, celdas, delta):
+        """
+        Suma delta al contador de bloqueos de las casillas del barco y de su halo.
+        """
+        n = self.board_size
+        halo = {
+            (x + dx) * n + (y + dy)
+            for x, y in celdas
+            for dx in (-1, 0, 1)
+            for dy in (-1, 0, 1)
+            if 0 <= x + dx < n and 0 <= y + dy < n
+        }
+        for celda in halo:
+            self.bloqueos[celda] += delta
+
+    def legales(self, k, excluidas=()):
+        """
+        Devuelve la lista de índices de colocaciones legales del barco k.
+        """
+        tam = self.tamanos[k]
+        return [
+            i for i in range(self.totales[k])
+            if i not in excluidas and self.libre(celdas_colocacion(self.board_size, tam, i))
+        ]
+
+    def buscar(self, k, flota):
+        """
+        Coloca los barcos desde el k-ésimo en adelante, deshaciendo colocaciones
+        cuando un barco se queda sin opciones.
+
+        Returns:
+            True si ha completado la flota.
+
+        Raises:
+            ValueError: si se superan MAX_NODOS_BUSQUEDA colocaciones sin completarla.
+        """
+        if k == len(self.tamanos):
+            return True
+
+        tam = self.tamanos[k]
+        total = self.totales[k]
+        probadas = set()
+        lista = None
+        fallos = 0
+
+        while True:
+            if lista is None and fallos >= INTENTOS_ALEATORIOS:
+                lista = self.legales(k, probadas)
+
+            if lista is None:
+                indice = self.rng.randrange(total)
+            else:
+                if not lista:
+                    return False
+                j = self.rng.randrange(len(lista))
+                indice = lista[j]
+                lista[j] = lista[-1]
+                lista.pop()
+
+            coords = celdas_colocacion(self.board_size, tam, indice)
+            if indice in probadas or not self.libre(coords):
+                fallos += 1
+                continue
+
+            self.nodos += 1
+            if self.nodos > MAX_NODOS_BUSQUEDA:
+                raise ValueError(
+                    f"No se ha encontrado ninguna colocación de los barcos {self.tamanos} en "
+                    f"un tablero de {self.board_size}x{self.board_size} tras probar "
+                    f"{MAX_NODOS_BUSQUEDA} colocaciones; probablemente no existe."
+                )
+            probadas.add(indice)
+            self.marcar(coords, 1)
+            flota.append(coords)
+            if self.buscar(k + 1, flota):
+                return True
+            self.marcar(coords, -1)
+            flota.pop()
+
+    def colocaciones_tam(self, tam):
+        """
+        Devuelve todas las colocaciones de un barco de tamaño tam como tuplas
+        (coordenadas, casillas, halo), con las casillas y el halo en índices x * N + y.
+        Se calculan la primera vez y se reutilizan.
+        """
+        colocaciones = self.colocaciones.get(tam)
+        if colocaciones is None:
+            n = self.board_size
+            colocaciones = self.colocaciones[tam] = []
+            for i in range(num_colocaciones(n, tam)):
+                coords = celdas_colocacion(n, tam, i)
+                halo = tuple({
+                    (x + dx) * n + (y + dy)
+                    for x, y in coords
+                    for dx in (-1, 0, 1)
+                    for dy in (-1, 0, 1)
+                    if 0 <= x + dx < n and 0 <= y + dy < n
+                })
+                colocaciones.append((coords, tuple(x * n + y for x, y in coords), halo))
+        return colocaciones
+
+    def muestrear_uniforme(self):
+        """
+        Coloca una flota elegida de forma exactamente uniforme entre todas las válidas.
+
+        Cada barco se elige uniformemente entre sus n_k colocaciones legales, lo que da
+        a cada flota una probabilidad 1 / prod(n_k). Aceptándola con probabilidad
+        prod(n_k) / cota, todas las flotas tienen la misma probabilidad 1 / cota.
+        Las colocaciones de cada barco se precalculan una vez (colocaciones_tam()) y en
+        cada intento solo se comprueban sus bloqueos.
+        """
+        cota = math.prod(self.totales)
+        por_barco = [self.colocaciones_tam(tam) for tam in self.tamanos]
+        for _ in range(INTENTOS_UNIFORME):
+            bloqueos = self.bloqueos = crear_celdas(self.board_size)
+            flota = []
+            peso = 1
+            for colocaciones in por_barco:
+                lista = [c for c in colocaciones if not any(bloqueos[i] for i in c[1])]
+                if not lista:
+                    peso = 0
+                    break
+                peso *= len(lista)
+                coords, _, halo = lista[self.rng.randrange(len(lista))]
+                for celda in halo:
+                    bloqueos[celda] += 1
+                flota.append(list(coords))
+            if peso and self.rng.random() * cota < peso:
+                return flota
+        raise RuntimeError(
+            f"No se ha aceptado ninguna flota uniforme tras {INTENTOS_UNIFORME} intentos."
+        )
+
+    def colocar(self, uniforme=False):
+        """
+        Genera una flota completa.
+
+        Parámetros:
+            uniforme: si es True, todas las flotas válidas son equiprobables. Si es
+                      False (más rápido), cada barco se elige uniformemente entre sus
+                      colocaciones legales dados los anteriores.
+
+        Returns:
+            flota: lista de barcos en el orden de tamanos_barcos, donde cada barco es
+                   una lista de coordenadas (x, y).
+        """
+        if uniforme and self.factible:
+            return self.muestrear_uniforme()
+
+        self.bloqueos = crear_celdas(self.board_size)
+        self.nodos = 0
+        flota = []
+        if not self.buscar(0, flota):
+            raise ValueError(
+                f"No existe ninguna colocación válida de los barcos {self.tamanos} "
+                f"en un tablero de {self.board_size}x{self.board_size}."
+            )
+        self.factible = True
+        if uniforme:
+            flota = self.muestrear_uniforme()
+        return flota
+
+
+def generar_flota(tablero, tamanos_barcos, uniforme=False, rng=None):
     """
     Genera y coloca una flota de barcos en el tablero dado, asegurando que
     haya al menos una casilla de separación (incluso diagonal) entre barcos.
 
     Args:
-        tablero: matriz 2D que representa el tablero del jugador.
+        tablero: tablero del jugador (ver tablero.Tablero).
         tamanos_barcos: lista con los tamaños de cada barco (ej: [5,4,3,3,2]).
+        uniforme: si es True, la flota se elige uniformemente entre todas las válidas.
+        rng: generador de la partida (por defecto, el módulo random).
 
     Returns:
         flota: lista de barcos, donde cada barco es una lista de coordenadas (x, y).
     """
-    flota = []
-
-    def area_adyacente_libre(coords):
-        for x, y in coords:
-            for dx in [-1, 0, 1]:
-                for dy in [-1, 0, 1]:
-                    nx, ny = x + dx, y + dy
-                    if 0 <= nx < BOARD_SIZE and 0 <= ny < BOARD_SIZE:
-                        if tablero[nx][ny] == SIMBOLO_BARCO:
-                            return False
-        return True
-
-    for tam in tamanos_barcos:
-        colocado = False
-
-        while not colocado:
-            orientacion = random.choice(['H', 'V'])
-
-            if orientacion == 'H':
-                x = random.randint(0, BOARD_SIZE - 1)
-                y = random.randint(0, BOARD_SIZE - tam)
-                coords = [(x, y + i) for i in range(tam)]
-            else:
-                x = random.randint(0, BOARD_SIZE - tam)
-                y = random.randint(0, BOARD_SIZE - 1)
-                coords = [(x + i, y) for i in range(tam)]
+    flota = ColocadorFlota(len(tablero), tamanos_barcos, rng).colocar(uniforme)
+    for barco in flota:
+        for x, y in barco:
+            tablero.marcar(x, y, CODIGO_BARCO)
+    return flota
 
-            # Verifica que las casillas y las adyacentes estén libres
-            if all(tablero[xi][yi] == SIMBOLO_VACIO for xi, yi in coords) and area_adyacente_libre(coords):
-                for xi, yi in coords:
-                    tablero[xi][yi] = SIMBOLO_BARCO
-                flota.append(coords)
-                colocado = True
+def generar_flotas(n, tamanos_barcos, board_size, uniforme=False):
+    """
+    Genera n flotas independientes sin necesidad de tableros.
 
-    return flota
+    Returns:
+        lista de n flotas con el formato de generar_flota().
+    """
+    colocador = ColocadorFlota(board_size, tamanos_barcos)
+    return [colocador.colocar(uniforme) for _ in range(n)]
@@ -0,0 +1,143 @@
+"""
+instrumentacion.py
+
+Instrumentación opcional del bucle de turnos de una partida (INSTRUMENTAR en
+constantes.py).
+
+Con la instrumentación activada, cada turno se mide con time.perf_counter_ns() y su
+tiempo se reparte en tres fases:
+
+- decidir: trabajo de la estrategia del atacante (siguiente_disparo() y
+  registrar_resultado()).
+- comunicar: tiempo dentro de las llamadas de envío y recepción, incluida la espera
+  al otro jugador. En el motor local es siempre cero.
+- resolver: resolución del disparo recibido (Jugador.recibir_disparo()).
+
+Además se cuentan los mensajes y bytes enviados por etiqueta MPI y se guarda, por
+estrategia, un histograma del tiempo de decisión en cubetas logarítmicas (la cubeta b
+cuenta los turnos que tardaron entre 2^(b-1) y 2^b nanosegundos). Los objetos se
+pueden fusionar, de modo que rank 1 envía el suyo a rank 0 junto a sus estadísticas y
+el coordinador los acumula por pareja de estrategias.
+
+Con la instrumentación desactivada los motores no crean ningún objeto de esta clase y
+el bucle de turnos solo comprueba una variable local booleana.
+
+Clases:
+- Instrumentacion: tiempos por fase, mensajes por etiqueta e histogramas de decisión.
+
+Funciones:
+- imprimir_instrumentacion(): imprime el resumen de una Instrumentacion acumulada.
+"""
+
+FASES = ("decidir", "comunicar", "resolver")
+
+# Cubetas del histograma: ns.bit_length() de cualquier duración menor de 2^63 ns
+NUM_CUBETAS = 64
+
+
+class Instrumentacion:
+    """
+    Tiempos por fase, mensajes por etiqueta e histogramas de decisión de una o más
+    partidas.
+    """
+
+    __slots__ = ("partidas", "partidas_mpi", "turnos", "fases", "mensajes", "bytes", "histogramas")
+
+    def __init__(self, partidas=1, partidas_mpi=0):
+        """
+        Parámetros:
+            partidas: partidas que mide el objeto; 0 para un acumulador vacío.
+            partidas_mpi: cuántas de ellas se han jugado enviando mensajes por un canal
+                          (las del motor local no envían ninguno).
+        """
+        self.partidas = partidas
+        self.partidas_mpi = partidas_mpi
+        self.turnos = 0                          # Turnos atacando
+        self.fases = dict.fromkeys(FASES, 0)     # Nanosegundos por fase
+        self.mensajes = {}                       # Etiqueta -> mensajes enviados
+        self.bytes = {}                          # Etiqueta -> bytes enviados
+        self.histogramas = {}                    # Estrategia -> cubetas
+
+    def anotar_ataque(self, estrategia, decidir_ns, comunicar_ns=0):
+        """
+        Registra un turno de ataque de la estrategia indicada.
+        """
+        self.turnos += 1
+        self.fases["decidir"] += decidir_ns
+        self.fases["comunicar"] += comunicar_ns
+        histograma = self.histogramas.get(estrategia)
+        if histograma is None:
+            histograma = self.histogramas[estrategia] = [0] * NUM_CUBETAS
+        histograma[decidir_ns.bit_length()] += 1
+
+    def anotar_defensa(self, resolver_ns, comunicar_ns=0):
+        """
+        Registra la resolución de un disparo recibido.
+        """
+        self.fases["resolver"] += resolver_ns
+        self.fases["comunicar"] += comunicar_ns
+
+    def contar_mensajes(self, etiqueta, mensajes, num_bytes):
+        self.mensajes[etiqueta] = self.mensajes.get(etiqueta, 0) + mensajes
+        self.bytes[etiqueta] = self.bytes.get(etiqueta, 0) + num_bytes
+
+    def fusionar(self, otra):
+        """
+        Acumula en este objeto los datos de otra Instrumentacion. Si las dos miden la
+        misma partida (los dos jugadores por MPI), el número de partidas no se suma.
+        """
+        for fase in FASES:
+            self.fases[fase] += otra.fases[fase]
+        self.turnos += otra.turnos
+        for etiqueta, n in otra.mensajes.items():
+            self.contar_mensajes(etiqueta, n, otra.bytes[etiqueta])
+        for estrategia, cubetas in otra.histogramas.items():
+            propio = self.histogramas.setdefault(estrategia, [0] * NUM_CUBETAS)
+            for b, n in enumerate(cubetas):
+                propio[b] += n
+        return self
+
+    def acumular_partida(self, otra):
+        """
+        Acumula una partida distinta a las ya contadas.
+        """
+        self.fusionar(otra)
+        self.partidas += otra.partidas
+        self.partidas_mpi += otra.partidas_mpi
+        return self
+
+
+def cuantil_histograma(cubetas, q):
+    """
+    Devuelve la cota superior (en ns) de la cubeta en la que cae el cuantil q.
+    """
+    total = sum(cubetas)
+    if not total:
+        return 0
+    objetivo = q * total
+    acumulado = 0
+    for b, n in enumerate(cubetas):
+        acumulado += n
+        if acumulado >= objetivo:
+            return 1 << b
+    return 1 << (len(cubetas) - 1)
+
+def imprimir_instrumentacion(instrumentacion):
+    """
+    Imprime los tiempos medios por turno y fase, la comunicación por etiqueta y los
+    cuantiles del tiempo de decisión de cada estrategia.
+    """
+    turnos = instrumentacion.turnos or 1
+    # Los mensajes se reparten solo entre las partidas que los han enviado
+    partidas = instrumentacion.partidas_mpi
+    fases = ",  ".join(
+        f"{fase}={ns / turnos / 1000:.1f}us" for fase, ns in instrumentacion.fases.items()
+    )
+    print(f"  - Tiempo medio por turno: {fases}")
+    for etiqueta in sorted(instrumentacion.mensajes) if partidas else ():
+        print(f"  - Etiqueta {etiqueta}: {instrumentacion.mensajes[etiqueta] / partidas:.1f} mensajes, "
+              f"{instrumentacion.bytes[etiqueta] / partidas:.1f} bytes por partida")
+    for estrategia, cubetas in sorted(instrumentacion.histogramas.items()):
+        p50, p90, p99 = (cuantil_histograma(cubetas, q) / 1000 for q in (0.5, 0.9, 0.99))
+        print(f"  - Decisión {estrategia}: p50<{p50:.1f}us, p90<{p90:.1f}us, p99<{p99:.1f}us "
+              f"({sum(cubetas)} turnos)")
@@ -14,24 +14,57 @@ La clase está diseñada para funcionar en un entorno de memoria distribuida, es
 cada proceso MPI mantiene su propia instancia de Jugador, sin memoria compartida.
 """
 
-from tablero import crear_tablero, marcar_disparo
+from array import array
+from tablero import crear_tablero, marcar_disparo, es_disperso, CeldasDispersas
 from flota import generar_flota
-from constantes import TAMANOS_BARCOS, SIMBOLO_TOCADO, SIMBOLO_AGUA
+from constantes import CODIGO_BARCO, CODIGO_TOCADO, CODIGO_AGUA
 from estrategias.base import Estrategia
 
 class Jugador:
-    def __init__(self, estrategia: Estrategia, board_size: int):
+    __slots__ = (
+        "board_size", "estrategia", "tablero", "flota",
+        "id_barco", "restantes", "barcos_a_flote",
+    )
+
+    def __init__(self, estrategia: Estrategia, configuracion, flota=None, rng=None):
         """
         Inicializa un jugador con una estrategia de disparo y tablero vacío.
 
         Parámetros:
             estrategia: instancia de una clase que hereda de Estrategia.
-            board_size: tamaño del tablero.
+            configuracion: Configuracion de la partida (tamaño del tablero y barcos).
+            flota: flota ya colocada (por ejemplo, de un pool de flotas). Si es None,
+                   se genera una nueva.
+            rng: generador con el que se coloca la flota nueva (por defecto, el
+                 módulo random).
         """
+        board_size = configuracion.board_size
         self.board_size = board_size
         self.estrategia = estrategia
-        self.tablero = crear_tablero()
-        self.flota = generar_flota(self.tablero, TAMANOS_BARCOS)
+        self.tablero = crear_tablero(board_size)
+        if flota is None:
+            self.flota = generar_flota(self.tablero, configuracion.tamanos_barcos, rng=rng)
+        else:
+            self.flota = flota
+            for barco in flota:
+                for x, y in barco:
+                    self.tablero.marcar(x, y, CODIGO_BARCO)
+
+        # Índice de la flota: identificador del barco (+1) de cada casilla, 0 si es agua,
+        # y casillas sin tocar de cada barco. self.flota no se modifica durante la partida.
+        # Con menos de 255 barcos basta un byte por casilla; en tableros dispersos solo
+        # se guardan las casillas de los barcos.
+        if es_disperso(board_size):
+            self.id_barco = CeldasDispersas()
+        elif len(self.flota) < 255:
+            self.id_barco = bytearray(board_size * board_size)
+        else:
+            self.id_barco = array('H', bytes(2 * board_size * board_size))
+        for i, barco in enumerate(self.flota):
+            for x, y in barco:
+                self.id_barco[x * board_size + y] = i + 1
+        self.restantes = [len(barco) for barco in self.flota]
+        self.barcos_a_flote = len(self.flota)
 
     def siguiente_disparo(self):
         """
@@ -56,7 +89,8 @@ class Jugador:
         """
         Procesa un disparo que el oponente ha lanzado contra este jugador.
 
-        Actualiza el tablero y flota, y determina el resultado del impacto.
+        Actualiza el tablero y los contadores de la flota, y determina el resultado del
+        impacto en tiempo constante gracias al índice de casillas.
 
         Parámetros:
             x, y: coordenadas del disparo recibido.
@@ -64,18 +98,21 @@ class Jugador:
         Returns:
             resultado: 'agua', 'tocado', 'hundido' o 'FIN' si el jugador ha perdido.
         """
-        for barco in self.flota:
-            if (x, y) in barco:
-                marcar_disparo(self.tablero, x, y, SIMBOLO_TOCADO)
-                barco.remove((x, y))
-                if not barco:
-                    self.flota.remove(barco)
-                    if not self.flota:
-                        return "FIN"  # Toda la flota destruida
-                    return 'hundido'
-                else:
-                    return 'tocado'
-
-        # Si no impacta ningún barco
-        marcar_disparo(self.tablero, x, y, SIMBOLO_AGUA)
-        return 'agua'
+        barco = self.id_barco[x * self.board_size + y] - 1
+        if barco < 0:
+            # Si no impacta ningún barco
+            marcar_disparo(self.tablero, x, y, CODIGO_AGUA)
+            return 'agua'
+        if self.tablero.obtener(x, y) == CODIGO_TOCADO:
+            # Casilla ya tocada: no vuelve a contar
+            return 'agua'
+
+        marcar_disparo(self.tablero, x, y, CODIGO_TOCADO)
+        self.restantes[barco] -= 1
+        if self.restantes[barco]:
+            return 'tocado'
+
+        self.barcos_a_flote -= 1
+        if not self.barcos_a_flote:
+            return "FIN"  # Toda la flota destruida
+        return 'hundido'
@@ -0,0 +1,221 @@
+"""
+libro_aperturas.py
+
+Libro de aperturas de la estrategia de densidad.
+
+Al principio de la partida la estrategia de densidad (ver estrategias/densidad.py) toma
+siempre las mismas decisiones para una misma configuración: con el tablero vacío la
+casilla de mayor densidad es la misma en todas las partidas, y tras un agua en ella
+también lo es la siguiente. Justo entonces es cuando más cuesta decidir, porque la
+densidad cubre todo el tablero. El libro precalcula, para una Configuracion, las
+casillas de mayor densidad de cada historial de aguas de hasta una profundidad dada, y
+la estrategia las consulta en lugar de recalcular hasta que sale del libro (primer
+tocado o historial que no está en él).
+
+Cada historial se identifica con una clave de 64 bits de tipo Zobrist: el XOR de un
+valor aleatorio por cada casilla disparada. Se actualiza en O(1) con cada agua y no
+depende del orden de los disparos, igual que la densidad, así que los historiales que
+solo difieren en el orden comparten entrada. El libro guarda todas las casillas
+empatadas en el máximo, en el mismo orden que disparo_exploracion(), y la estrategia
+elige entre ellas con su generador: las partidas son idénticas con y sin libro.
+
+Los empates hacen que el árbol crezca deprisa: en un tablero vacío de 20x20 con la
+flota clásica hay 144 casillas empatadas en el máximo, así que la profundidad 2 ocupa
+145 entradas y la 3 unas 9500. max_entradas limita el recorrido; lo que quede fuera se
+calcula como siempre.
+
+El fichero es un .npz sin comprimir por configuración con la configuración, la tabla
+Zobrist, las claves, y las casillas (índices x * N + y) de cada entrada en un único
+array con sus desplazamientos.
+
+Uso:
+    python libro_aperturas.py 3            # profundidad 3, configuración actual
+    python libro_aperturas.py 4 50000      # como máximo 50000 entradas
+
+Funciones:
+- ruta_libro(): ruta del fichero del libro de una configuración.
+- construir_libro(): recorre los historiales de aguas y devuelve el libro.
+- generar_libro(): construye el libro y lo guarda en disco.
+- libro_activo(): devuelve el libro de una configuración si USAR_LIBRO_APERTURAS.
+
+Clases:
+- LibroAperturas: tabla de jugadas por clave del historial.
+"""
+
+import os
+import random
+import sys
+from collections import deque
+import numpy as np
+
+from configuracion import Configuracion
+from estrategias.densidad import EstrategiaDensidad
+from constantes import USAR_LIBRO_APERTURAS, DIRECTORIO_LIBROS
+
+# Límite por defecto de entradas de un libro
+MAX_ENTRADAS = 100000
+
+
+def ruta_libro(configuracion, directorio=DIRECTORIO_LIBROS):
+    """
+    Devuelve la ruta del fichero del libro de una configuración.
+    """
+    return os.path.join(directorio, f"libro_{configuracion.nombre}.npz")
+
+def tabla_zobrist(board_size, semilla=0):
+    """
+    Devuelve un valor aleatorio de 64 bits por casilla, indexado por x * N + y.
+    """
+    rng = random.Random(semilla)
+    return [rng.getrandbits(64) for _ in range(board_size * board_size)]
+
+
+class LibroAperturas:
+    """
+    Jugadas de apertura de una configuración, consultables por la clave del historial.
+    """
+
+    __slots__ = ("configuracion", "zobrist", "jugadas_por_clave")
+
+    def __init__(self, configuracion, zobrist, jugadas_por_clave):
+        """
+        Parámetros:
+            configuracion: Configuracion para la que se construyó el libro.
+            zobrist: valor de cada casilla (lista de enteros, índice x * N + y).
+            jugadas_por_clave: dict {clave: tupla de casillas empatadas (x * N + y)}.
+        """
+        self.configuracion = configuracion
+        self.zobrist = zobrist
+        self.jugadas_por_clave = jugadas_por_clave
+
+    def __len__(self):
+        return len(self.jugadas_por_clave)
+
+    def __deepcopy__(self, memo):
+        # Es de solo lectura: las copias de una estrategia comparten el libro
+        return self
+
+    def jugadas(self, clave):
+        """
+        Devuelve las casillas empatadas para el historial con esa clave, o None si no
+        está en el libro.
+        """
+        return self.jugadas_por_clave.get(clave)
+
+    def guardar(self, ruta):
+        claves = sorted(self.jugadas_por_clave)
+        desplazamientos = np.zeros(len(claves) + 1, dtype=np.uint32)
+        np.cumsum([len(self.jugadas_por_clave[c]) for c in claves], out=desplazamientos[1:])
+        casillas = np.fromiter(
+            (casilla for c in claves for casilla in self.jugadas_por_clave[c]),
+            dtype=np.uint32, count=int(desplazamientos[-1]),
+        )
+        os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+        with open(ruta, "wb") as f:
+            np.savez(
+                f,
+                board_size=np.int32(self.configuracion.board_size),
+                tamanos_barcos=np.array(self.configuracion.tamanos_barcos, dtype=np.int32),
+                zobrist=np.array(self.zobrist, dtype=np.uint64),
+                claves=np.array(claves, dtype=np.uint64),
+                desplazamientos=desplazamientos,
+                casillas=casillas,
+            )
+
+    @classmethod
+    def cargar(cls, ruta, configuracion=None):
+        """
+        Lee un libro guardado con guardar(). Si se indica la configuración, comprueba
+        que el libro le corresponde.
+        """
+        with np.load(ruta) as datos:
+            guardada = Configuracion(int(datos["board_size"]), datos["tamanos_barcos"].tolist())
+            if configuracion is not None and guardada != configuracion:
+                raise ValueError(f"El libro {ruta} no corresponde a {configuracion!r}.")
+            zobrist = datos["zobrist"].tolist()
+            claves = datos["claves"].tolist()
+            desplazamientos = datos["desplazamientos"].tolist()
+            casillas = datos["casillas"].tolist()
+        jugadas_por_clave = {
+            clave: tuple(casillas[desplazamientos[i]:desplazamientos[i + 1]])
+            for i, clave in enumerate(claves)
+        }
+        return cls(guardada, zobrist, jugadas_por_clave)
+
+
+def construir_libro(configuracion, profundidad, max_entradas=MAX_ENTRADAS):
+    """
+    Recorre en anchura los historiales de hasta profundidad aguas que la estrategia de
+    densidad puede producir (todas las ramas de cada empate) y guarda las casillas de
+    mayor densidad de cada uno. Se detiene al llegar a max_entradas.
+
+    Returns:
+        LibroAperturas.
+    """
+    n = configuracion.board_size
+    zobrist = tabla_zobrist(n)
+    jugadas_por_clave = {}
+    # Se guardan los historiales pendientes, no las estrategias: con cientos de ramas
+    # por nivel, rehacer cada estado con sus aguas ocupa mucha menos memoria.
+    pendientes = deque([(0, ())])   # (clave, casillas de las aguas)
+    while pendientes and len(jugadas_por_clave) < max_entradas:
+        clave, historial = pendientes.popleft()
+        if clave in jugadas_por_clave:
+            continue
+        estrategia = EstrategiaDensidad(n, configuracion.tamanos_barcos, rng=random.Random(0))
+        for casilla in historial:
+            x, y = divmod(casilla, n)
+            estrategia.disparadas[x, y] = True
+            estrategia.registrar_resultado(x, y, 'agua')
+        mejores = tuple(int(c) for c in estrategia.casillas_exploracion())
+        jugadas_por_clave[clave] = mejores
+        if len(historial) + 1 >= profundidad:
+            continue
+        for casilla in mejores:
+            hija = clave ^ zobrist[casilla]
+            if hija not in jugadas_por_clave:
+                pendientes.append((hija, historial + (casilla,)))
+    return LibroAperturas(configuracion, zobrist, jugadas_por_clave)
+
+def generar_libro(profundidad, configuracion=None, max_entradas=MAX_ENTRADAS, ruta=None):
+    """
+    Construye el libro de una configuración (por defecto, la de constantes.py) y lo
+    guarda en disco.
+
+    Returns:
+        (ruta del fichero generado, número de entradas).
+    """
+    if configuracion is None:
+        configuracion = Configuracion()
+    if ruta is None:
+        ruta = ruta_libro(configuracion)
+    libro = construir_libro(configuracion, profundidad, max_entradas)
+    libro.guardar(ruta)
+    return ruta, len(libro)
+
+
+_libros = {}
+
+def libro_activo(configuracion=None):
+    """
+    Devuelve el libro de la configuración indicada (por defecto, la de constantes.py)
+    si USAR_LIBRO_APERTURAS está activado, leyéndolo la primera vez, o None si no se
+    usa o no se ha generado.
+    """
+    if not USAR_LIBRO_APERTURAS:
+        return None
+    if configuracion is None:
+        configuracion = Configuracion()
+    if configuracion not in _libros:
+        ruta = ruta_libro(configuracion)
+        _libros[configuracion] = (
+            LibroAperturas.cargar(ruta, configuracion) if os.path.exists(ruta) else None
+        )
+    return _libros[configuracion]
+
+
+if __name__ == "__main__":
+    profundidad = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    max_entradas = int(sys.argv[2]) if len(sys.argv) > 2 else MAX_ENTRADAS
+    ruta, entradas = generar_libro(profundidad, max_entradas=max_entradas)
+    print(f"Libro de {entradas} entradas (profundidad {profundidad}) guardado en {ruta}")
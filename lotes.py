@@ -0,0 +1,130 @@
+"""
+lotes.py
+
+Este módulo implementa el modo de ejecución por lotes de main.py.
+
+En el modo por cola, el coordinador recibe un diccionario serializado por cada partida.
+Con cientos de miles de partidas ese tráfico satura al coordinador. En el modo por lotes,
+cada rank juega localmente su parte de las partidas de cada combinación de estrategias,
+guarda los resultados en un array estructurado de NumPy y los resume en un agregador de
+tamaño constante (ver agregador.py). El coordinador solo recibe, mediante operaciones
+colectivas sobre buffers de NumPy, los acumulados de todos los ranks y la carga de
+trabajo de cada uno: los contadores se suman con Reduce, los estados de Welford se
+juntan con Gather y las cubetas de los bocetos de cuantiles, cuyo número varía de un
+rank a otro, con Gatherv. Ningún agregador se serializa con pickle.
+
+Funciones:
+- jugar_lote(): juega un bloque de partidas y devuelve sus resultados empaquetados.
+- ejecutar_por_lotes(): reparte y juega todas las partidas y las agrega en el coordinador.
+- reducir_agregadores(): combina los agregadores de todos los ranks con colectivas de buffers.
+"""
+
+from mpi4py import MPI
+import numpy as np
+import time
+
+from agregador import AgregadorTorneo
+from motor import jugar_partida_local
+
+# Formato de un resultado de partida empaquetado
+DTYPE_RESULTADO = np.dtype([
+    ("ganador", np.int8),
+    ("turnos", np.int32),
+    ("disparos_j0", np.int32),
+    ("aciertos_j0", np.int32),
+    ("disparos_j1", np.int32),
+    ("aciertos_j1", np.int32),
+    ("duracion", np.float64),
+])
+
+
+def jugar_lote(nombre_estrategia_0, nombre_estrategia_1, indices, semilla=None, configuracion=None):
+    """
+    Juega un bloque de partidas con el motor local.
+
+    Parámetros:
+        indices: índices de las partidas del bloque.
+        semilla: semilla raíz del torneo (ver semillas.py).
+        configuracion: Configuracion de las partidas (por defecto, la de constantes.py).
+
+    Returns:
+        array de NumPy con DTYPE_RESULTADO y un registro por partida.
+    """
+    registros = np.zeros(len(indices), dtype=DTYPE_RESULTADO)
+    for i, indice in enumerate(indices):
+        r = jugar_partida_local(nombre_estrategia_0, nombre_estrategia_1, indice, semilla, configuracion)
+        registros[i] = (
+            r["ganador"], r["turnos"],
+            r["disparos_j0"], r["aciertos_j0"],
+            r["disparos_j1"], r["aciertos_j1"],
+            r["duracion"],
+        )
+    return registros
+
+def ejecutar_por_lotes(comm, parejas, num_simulaciones, raiz=0, semilla=None, configuracion=None):
+    """
+    Juega num_simulaciones partidas de cada pareja de estrategias repartidas entre
+    todos los ranks de comm y agrega los resultados en el rank raiz.
+
+    Las partidas de cada pareja se reparten de forma cíclica: el rank r juega las
+    de índice r, r + size, r + 2*size...
+
+    Parámetros:
+        comm: comunicador con todos los ranks que juegan.
+        parejas: lista de tuplas (e0, e1).
+        num_simulaciones: partidas por pareja.
+        raiz: rank que recibe los acumulados.
+        semilla: semilla raíz del torneo; cada partida deriva sus generadores de
+                 ella y de su índice, así que el resultado no depende del reparto.
+        configuracion: Configuracion de las partidas (por defecto, la de constantes.py).
+
+    Returns (solo en raiz):
+        (agregador, cargas): AgregadorTorneo con todas las partidas y matriz con las
+        partidas jugadas y el tiempo ocupado de cada rank.
+        En el resto de ranks devuelve (None, None).
+    """
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+    indices = range(rank, num_simulaciones, size)
+
+    agregador = AgregadorTorneo()
+    inicio = time.perf_counter()
+    for e0, e1 in parejas:
+        agregador.actualizar_lote(e0, e1, jugar_lote(e0, e1, indices, semilla, configuracion))
+    carga = np.array([len(indices) * len(parejas), time.perf_counter() - inicio], dtype=np.float64)
+
+    cargas = np.zeros((size, 2), dtype=np.float64) if rank == raiz else None
+    comm.Gather(carga, cargas, root=raiz)
+    agregador = reducir_agregadores(comm, agregador, parejas, raiz)
+
+    return agregador, cargas
+
+def reducir_agregadores(comm, agregador, parejas, raiz):
+    """
+    Combina en el rank raiz los agregadores de todos los ranks de comm con colectivas
+    de buffers (ver AgregadorTorneo.empaquetar()).
+
+    Returns:
+        AgregadorTorneo con las partidas de todos los ranks en raiz, None en el resto.
+    """
+    contadores, welford, cubetas = agregador.empaquetar(parejas)
+    es_raiz = comm.Get_rank() == raiz
+    size = comm.Get_size()
+
+    totales = np.zeros_like(contadores) if es_raiz else None
+    comm.Reduce(contadores, totales, op=MPI.SUM, root=raiz)
+    todos_welford = np.zeros((size,) + welford.shape, dtype=np.float64) if es_raiz else None
+    comm.Gather(welford, todos_welford, root=raiz)
+
+    filas = np.zeros(size, dtype=np.int64) if es_raiz else None
+    comm.Gather(np.array([len(cubetas)], dtype=np.int64), filas, root=raiz)
+    todas_cubetas = None
+    if es_raiz:
+        todas_cubetas = np.zeros((int(filas.sum()), 4), dtype=np.int64)
+        comm.Gatherv(cubetas, (todas_cubetas, filas * 4), root=raiz)
+    else:
+        comm.Gatherv(cubetas, None, root=raiz)
+
+    if not es_raiz:
+        return None
+    return AgregadorTorneo.desempaquetar(parejas, totales, todos_welford, todas_cubetas)
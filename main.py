@@ -2,128 +2,561 @@
 main.py
 
 Ejecuta simulaciones entre todas las combinaciones posibles de estrategias dos a dos.
+
+El rank 0 actúa como coordinador y agrupa el resto de ranks en trabajadores: parejas
+de jugadores que se comunican por MPI o ranks sueltos que juegan con el motor local.
+Las partidas se reparten desde una cola de trabajos (pareja de estrategias, índice de
+partida) a medida que los trabajadores quedan libres, empezando por las de mayor
+duración estimada. Con PARTIDAS_POR_PAREJA > 1, cada pareja de ranks tiene hasta ese
+número de partidas en curso a la vez y las juega multiplexadas (ver multiplexado.py).
+Al final se imprime la utilización de cada trabajador.
+
+En el modo por lotes (MODO_EJECUCION = "lotes") no hay cola: todos los ranks juegan
+localmente su parte de las partidas y los resultados se agregan con operaciones
+colectivas (ver lotes.py). En el modo vectorizado (MODO_EJECUCION = "vectorizado") el
+rank 0 juega todas las partidas de cada pareja a la vez con NumPy (ver
+simulador_vectorizado.py).
+
+Todas las partidas derivan sus generadores aleatorios de una semilla raíz y de su
+índice (ver semillas.py). El coordinador la elige (SEMILLA_RAIZ, la del almacén que se
+reanuda o una nueva), la imprime y la reparte a todos los ranks.
+
+Con PARADA_ADAPTATIVA, NUM_SIMULACIONES es el máximo de partidas por pareja: el
+coordinador comprueba tras cada resultado el intervalo de confianza de las victorias de
+la pareja (ver agregador.CriterioParada) y descarta sus trabajos pendientes en cuanto
+es suficientemente estrecho o el ganador está decidido.
 """
 
+from collections import deque
 from mpi4py import MPI
 import numpy as np
+import os
+import sys
+import time
 from rich.table import Table
 from rich.console import Console
-from partida import jugar_una_partida, ESTRATEGIAS_DISPONIBLES
-from constantes import NUM_SIMULACIONES
+from partida import jugar_una_partida
+from multiplexado import Multiplexor
+from motor import jugar_partida_local
+from lotes import ejecutar_por_lotes
+from simulador_vectorizado import simular_lote, PERFILES
+from agregador import AgregadorTorneo, CriterioParada, intervalo_wilson
+from almacen import AlmacenResultados, MANIFIESTO, leer_manifiesto
+from semillas import semilla_nueva
+from configuracion import Configuracion
+from instrumentacion import imprimir_instrumentacion
+from constantes import (
+    BOARD_SIZE, TAMANOS_BARCOS, ESTRATEGIAS_DISPONIBLES, NUM_SIMULACIONES, MODO_EJECUCION, MODO_TRABAJADORES,
+    PARTIDAS_POR_PAREJA,
+    INTERVALO_PROGRESO, DIRECTORIO_RESULTADOS, TAM_BLOQUE_RESULTADOS, INTERVALO_VOLCADO_RESULTADOS,
+    USAR_POOL_FLOTAS,
+    SEMILLA_RAIZ, NUMEROS_ALEATORIOS_COMUNES, PARADA_ADAPTATIVA, ANCHO_INTERVALO_PARADA,
+    Z_INTERVALO, Z_DECISION, MIN_PARTIDAS_PAREJA,
+)
+
+# Etiquetas de los mensajes entre el coordinador y los trabajadores
+TAG_TRABAJO = 0
+TAG_RESULTADO = 1
+TAG_PARADA = 9
+
+def imprimir_resumen(agregador):
+    """
+    Imprime el resumen por combinación de estrategias y la tabla de porcentajes
+    de victoria del Jugador 1 a partir de un AgregadorTorneo (ver agregador.py).
+    """
+    print("\n=== RESUMEN COMBINACIONES ===")
+    estrategias_set = list(set([e0 for e0, _ in agregador.parejas]))
+    estrategias_set.sort()
+    matriz = np.zeros((len(estrategias_set), len(estrategias_set)))  # filas: j0, columnas: j1
+
+    for (e0, e1), data in agregador.parejas.items():
+        total = data.partidas
+        idx0 = estrategias_set.index(e0)
+        idx1 = estrategias_set.index(e1)
+        pct_j1 = (data.j1_gana / total) * 100 if total else 0
+        matriz[idx0][idx1] = pct_j1
+        if not total:
+            continue
+
+        # También imprime resumen por combinación
+        prom_disparos_j0 = data.disparos_j0 / total
+        prom_disparos_j1 = data.disparos_j1 / total
+        prom_aciertos_j0 = data.aciertos_j0 / total
+        prom_aciertos_j1 = data.aciertos_j1 / total
+        prec_j0 = (prom_aciertos_j0 / prom_disparos_j0) * 100 if prom_disparos_j0 else 0
+        prec_j1 = (prom_aciertos_j1 / prom_disparos_j1) * 100 if prom_disparos_j1 else 0
+        turnos = data.cuantiles_turnos
+        duracion = data.cuantiles_duracion
+
+        print(f"{e0} vs {e1}:")
+        print(f"  - J0 gana {data.j0_gana}/{total},  J1 gana {data.j1_gana}/{total}")
+        print(f"  - Prom. turnos: {data.turnos.media:.1f} (desv. {data.turnos.desviacion:.1f}; "
+              f"p50 {turnos.cuantil(0.5):.0f}, p90 {turnos.cuantil(0.9):.0f}, p99 {turnos.cuantil(0.99):.0f})")
+        print(f"  - Prom. duracion: {data.duracion.media:.2f}s (desv. {data.duracion.desviacion:.2f}s; "
+              f"p50 {duracion.cuantil(0.5):.3f}s, p99 {duracion.cuantil(0.99):.3f}s)")
+        print(f"  - Precision J0: {prec_j0:.1f}%,  Precision J1: {prec_j1:.1f}%")
+        print(f"  - Disparos por partida: J0={prom_disparos_j0:.1f}, J1={prom_disparos_j1:.1f}")
+        if data.partidas_mpi:
+            n_mpi = data.partidas_mpi
+            print(f"  - Comunicacion por partida: {data.mensajes / n_mpi:.1f} mensajes, "
+                  f"{data.bytes / n_mpi:.1f} bytes")
+        if data.instrumentacion is not None:
+            imprimir_instrumentacion(data.instrumentacion)
+        print()
+
+    # === IMPRESIÓN DE TABLA DE PORCENTAJES DE VICTORIA DE J1 ===
+    console = Console()
+    table = Table(title="Porcentaje de victorias del Jugador 1", show_lines=True)
+    table.add_column("J0 \\ J1", justify="right")
+
+    for nombre in estrategias_set:
+        table.add_column(nombre, justify="center")
+
+    for i, e0 in enumerate(estrategias_set):
+        fila = [e0] + [f"{matriz[i][j]:.1f}%" for j in range(len(estrategias_set))]
+        table.add_row(*fila)
+
+    if NUM_SIMULACIONES >1: console.print(table)
+
+    if PARADA_ADAPTATIVA:
+        imprimir_partidas_necesarias(agregador)
+
+def imprimir_partidas_necesarias(agregador):
+    """
+    Imprime, por pareja, las partidas jugadas con la parada adaptativa, el porcentaje
+    de victorias de J1 con su intervalo de confianza y el motivo de la parada.
+    """
+    console = Console()
+    table = Table(title="Partidas necesarias por pareja (parada adaptativa)", show_lines=True)
+    for columna in ("J0 vs J1", "Partidas", "% del máximo", "Victorias J1", f"IC (z={Z_INTERVALO})", "Parada"):
+        table.add_column(columna, justify="center")
+
+    for (e0, e1), data in sorted(agregador.parejas.items()):
+        n = data.partidas
+        inferior, superior = intervalo_wilson(data.j1_gana, n, Z_INTERVALO)
+        table.add_row(
+            f"{e0} vs {e1}",
+            str(n),
+            f"{100 * n / NUM_SIMULACIONES:.1f}%",
+            f"{100 * data.j1_gana / n:.1f}%" if n else "-",
+            f"[{100 * inferior:.1f}%, {100 * superior:.1f}%]",
+            data.parada or "máximo",
+        )
+
+    console.print(table)
+
+
+def planificar_trabajadores(size, coordinador=0):
+    """
+    Agrupa los ranks distintos del coordinador en trabajadores.
+
+    En modo "parejas" los ranks se emparejan de dos en dos y cada pareja juega
+    partidas por MPI; si sobra un rank, juega solo con el motor local. En modo
+    "local" cada rank es un trabajador independiente con el motor local.
+
+    Returns:
+        lista de tuplas con los ranks de cada trabajador; el primero es el que
+        devuelve los resultados al coordinador.
+    """
+    libres = [r for r in range(size) if r != coordinador]
+    if MODO_TRABAJADORES == "local":
+        return [(r,) for r in libres]
+
+    trabajadores = [tuple(libres[i:i + 2]) for i in range(0, len(libres) - 1, 2)]
+    if len(libres) % 2:
+        trabajadores.append((libres[-1],))
+    return trabajadores
+
+def coste_estimado(e0, e1, configuracion=None):
+    """
+    Estima la duración relativa de una partida entre dos estrategias con una
+    configuración (por defecto, la de constantes.py).
+
+    La partida acaba cuando la estrategia más rápida hunde la flota rival, así que
+    el número de turnos crece con la menor de las fracciones de tablero que cada
+    estrategia necesita disparar.
+    """
+    if configuracion is None:
+        configuracion = Configuracion()
+    f0 = ESTRATEGIAS_DISPONIBLES[e0].fraccion_disparos_estimada
+    f1 = ESTRATEGIAS_DISPONIBLES[e1].fraccion_disparos_estimada
+    return 2 * min(f0, f1) * configuracion.board_size * configuracion.board_size
+
+def generar_trabajos(estrategias, completadas=None, configuracion=None):
+    """
+    Genera la cola de trabajos (e0, e1, indice) con los de mayor coste estimado
+    al principio, para que las partidas largas no queden en la cola del reparto.
+
+    Parámetros:
+        completadas: máscaras por pareja de las partidas ya guardadas en disco
+                     (ver AlmacenResultados.completadas()), que no se repiten.
+        configuracion: Configuracion de las partidas, para estimar su coste.
+    """
+    trabajos = [
+        (e0, e1, indice)
+        for e0 in estrategias
+        for e1 in estrategias
+        for indice in range(NUM_SIMULACIONES)
+        if completadas is None or not completadas[(e0, e1)][indice]
+    ]
+    trabajos.sort(key=lambda t: coste_estimado(t[0], t[1], configuracion), reverse=True)
+    return deque(trabajos)
+
+def detener_si_procede(agregador, parada, e0, e1):
+    """
+    Comprueba el criterio de parada de la pareja y, si se cumple, anota el motivo en
+    su agregador.
+
+    Returns:
+        True si la pareja está detenida.
+    """
+    pareja = agregador.pareja(e0, e1)
+    if pareja.parada is None and parada is not None:
+        pareja.parada = parada.comprobar(pareja)
+    return pareja.parada is not None
+
+def siguiente_trabajo(trabajos, agregador):
+    """
+    Saca de la cola el siguiente trabajo de una pareja no detenida, o None.
+    """
+    while trabajos:
+        trabajo = trabajos.popleft()
+        if agregador.pareja(trabajo[0], trabajo[1]).parada is None:
+            return trabajo
+    return None
+
+def multiplexado(trabajador):
+    """
+    Indica si el trabajador es una pareja que juega varias partidas a la vez. Sus
+    trabajos y la señal de parada solo se envían al líder, que se los pasa a su
+    compañero (ver multiplexado.py).
+    """
+    return len(trabajador) == 2 and PARTIDAS_POR_PAREJA > 1
+
+def coordinar(comm, trabajadores, trabajos, agregador, almacen=None, parada=None):
+    """
+    Reparte los trabajos entre los trabajadores a medida que quedan libres y
+    añade cada resultado al agregador (y al almacén en disco, si lo hay) en cuanto
+    llega. Con un CriterioParada, los trabajos de las parejas que lo cumplen se
+    descartan. Las parejas multiplexadas tienen hasta PARTIDAS_POR_PAREJA trabajos
+    asignados a la vez; el resto de trabajadores, uno.
+
+    Returns:
+        ocupacion: por trabajador, el número de partidas jugadas y el tiempo que ha
+        estado ocupado.
+    """
+    ocupacion = {t[0]: [0, 0.0] for t in trabajadores}
+    por_lider = {t[0]: t for t in trabajadores}
+
+    def despachar(trabajador):
+        trabajo = siguiente_trabajo(trabajos, agregador)
+        if trabajo is None:
+            return False
+        for r in (trabajador[:1] if multiplexado(trabajador) else trabajador):
+            comm.send(trabajo, dest=r, tag=TAG_TRABAJO)
+        return True
+
+    # Las parejas restauradas del almacén pueden haber cumplido ya el criterio
+    for e0, e1 in list(agregador.parejas):
+        detener_si_procede(agregador, parada, e0, e1)
+
+    # Un primer trabajo para cada trabajador y, por rondas, hasta PARTIDAS_POR_PAREJA
+    # para las parejas multiplexadas
+    activos = 0
+    for ronda in range(max(PARTIDAS_POR_PAREJA, 1)):
+        for trabajador in trabajadores:
+            if (ronda == 0 or multiplexado(trabajador)) and despachar(trabajador):
+                activos += 1
+
+    # Cada resultado libera un hueco de su trabajador, que recibe el siguiente trabajo
+    while activos:
+        status = MPI.Status()
+        resultado, tiempo, indice = comm.recv(source=MPI.ANY_SOURCE, tag=TAG_RESULTADO, status=status)
+        lider = status.Get_source()
+        agregador.actualizar(resultado)
+        if almacen is not None:
+            almacen.anadir(resultado, indice)
+        detener_si_procede(agregador, parada, resultado["estrategia_j0"], resultado["estrategia_j1"])
+        ocupacion[lider][0] += 1
+        ocupacion[lider][1] += tiempo
+        if not despachar(por_lider[lider]):
+            activos -= 1
+
+    # Después de todas las partidas, se manda una señal de parada
+    for trabajador in trabajadores:
+        for r in (trabajador[:1] if multiplexado(trabajador) else trabajador):
+            comm.send(None, dest=r, tag=TAG_PARADA)
+
+    return ocupacion
+
+def trabajar_multiplexado(comm, coordinador, comm_pareja, semilla):
+    """
+    Bucle de una pareja que juega varias partidas a la vez (ver multiplexado.py). El
+    líder recibe los trabajos del coordinador, juega rondas de todas las partidas en
+    curso y devuelve cada resultado en cuanto termina su partida; el compañero solo
+    habla con el líder.
+    """
+    multiplexor = Multiplexor(comm_pareja, PARTIDAS_POR_PAREJA, semilla)
+    if comm_pareja.Get_rank() == 1:
+        multiplexor.acompanar()
+        return
+
+    status = MPI.Status()
+    parar = False
+    ocupado_desde = time.perf_counter()
+    while True:
+        # Sin partidas en curso se espera al coordinador; con ellas, solo se recogen
+        # los trabajos que ya hayan llegado
+        while not parar and multiplexor.libres and (
+            not len(multiplexor) or comm.Iprobe(source=coordinador, tag=MPI.ANY_TAG)
+        ):
+            inactivo = not len(multiplexor)
+            datos = comm.recv(source=coordinador, tag=MPI.ANY_TAG, status=status)
+            if status.Get_tag() == TAG_PARADA:
+                parar = True
+            else:
+                multiplexor.alta(*datos)
+            if inactivo:
+                ocupado_desde = time.perf_counter()
+        if not len(multiplexor):
+            break
+
+        # El tiempo ocupado se reparte entre las partidas según terminan
+        for indice, resultado in multiplexor.ronda():
+            ahora = time.perf_counter()
+            comm.send((resultado, ahora - ocupado_desde, indice), dest=coordinador, tag=TAG_RESULTADO)
+            ocupado_desde = ahora
+    multiplexor.cerrar()
+
+def trabajar(comm, coordinador, comm_pareja, semilla):
+    """
+    Bucle de un trabajador: juega las partidas que le asigna el coordinador hasta
+    recibir la señal de parada. Si forma parte de una pareja juega por MPI con su
+    compañero; si no, juega la partida entera con el motor local.
+    """
+    if comm_pareja is not None and PARTIDAS_POR_PAREJA > 1:
+        trabajar_multiplexado(comm, coordinador, comm_pareja, semilla)
+        return
+    while True:
+        status = MPI.Status()
+        datos = comm.recv(source=coordinador, tag=MPI.ANY_TAG, status=status)
+        if status.Get_tag() == TAG_PARADA:
+            break
+        e0, e1, indice = datos
+        inicio = time.perf_counter()
+        if comm_pareja is None:
+            resultado = jugar_partida_local(e0, e1, indice, semilla)
+        else:
+            resultado = jugar_una_partida(e0, e1, comm=comm_pareja, indice=indice, semilla=semilla)
+        # En una pareja solo el rank 0 de la pareja devuelve el resultado
+        if resultado is not None:
+            comm.send((resultado, time.perf_counter() - inicio, indice), dest=coordinador, tag=TAG_RESULTADO)
+
+def imprimir_utilizacion(trabajadores, ocupacion, duracion_total):
+    """
+    Imprime, por trabajador, las partidas jugadas y el porcentaje del tiempo
+    total que ha estado ocupado.
+    """
+    console = Console()
+    table = Table(title="Utilización de los trabajadores", show_lines=True)
+    table.add_column("Ranks", justify="right")
+    table.add_column("Modo", justify="center")
+    table.add_column("Partidas", justify="center")
+    table.add_column("Ocupado", justify="center")
+    table.add_column("Utilización", justify="center")
+
+    for trabajador in trabajadores:
+        partidas, ocupado = ocupacion[trabajador[0]]
+        utilizacion = (ocupado / duracion_total) * 100 if duracion_total else 0
+        table.add_row(
+            ", ".join(str(r) for r in trabajador),
+            f"MPI x{PARTIDAS_POR_PAREJA}" if multiplexado(trabajador) else "MPI" if len(trabajador) == 2 else "local",
+            str(partidas),
+            f"{ocupado:.2f}s",
+            f"{utilizacion:.1f}%",
+        )
+
+    console.print(table)
+
+def ejecutar_modo_lotes(comm, estrategias, coordinador, semilla, configuracion=None):
+    """
+    Juega todas las partidas en modo por lotes (ver lotes.py): cada rank juega su
+    bloque localmente y el coordinador solo recibe los acumulados agregados.
+    """
+    parejas = [(e0, e1) for e0 in estrategias for e1 in estrategias]
+    if comm.Get_rank() == coordinador:
+        for e0, e1 in parejas:
+            print(f"\nSimulando {NUM_SIMULACIONES} partidas entre {e0.upper()} vs {e1.upper()} (por lotes)...\n")
+
+    comm.Barrier()  # Todos los ranks empiezan a contar a la vez
+    inicio = time.perf_counter()
+    agregador, cargas = ejecutar_por_lotes(
+        comm, parejas, NUM_SIMULACIONES, raiz=coordinador, semilla=semilla, configuracion=configuracion
+    )
+    duracion_total = time.perf_counter() - inicio
+
+    if comm.Get_rank() != coordinador:
+        return
+
+    trabajadores = [(r,) for r in range(comm.Get_size())]
+    ocupacion = {r: [int(partidas), ocupado] for r, (partidas, ocupado) in enumerate(cargas)}
+    imprimir_resumen(agregador)
+    imprimir_utilizacion(trabajadores, ocupacion, duracion_total)
+
+def ejecutar_modo_vectorizado(estrategias, semilla, configuracion=None):
+    """
+    Juega todas las partidas en el proceso actual con el simulador vectorizado
+    (ver simulador_vectorizado.py), un lote de NUM_SIMULACIONES partidas por pareja.
+    Termina con un mensaje si alguna estrategia no tiene perfil en el simulador.
+    """
+    sin_perfil = [e for e in estrategias if e not in PERFILES]
+    if sin_perfil:
+        sys.exit(
+            f"El modo vectorizado no admite las estrategias {', '.join(sin_perfil)} "
+            f"(admite: {', '.join(PERFILES)}). Desactívalas en ESTRATEGIAS_DISPONIBLES "
+            f"o usa otro MODO_EJECUCION."
+        )
+    agregador = AgregadorTorneo()
+    for e0 in estrategias:
+        for e1 in estrategias:
+            print(f"\nSimulando {NUM_SIMULACIONES} partidas entre {e0.upper()} vs {e1.upper()} (vectorizado)...\n")
+            agregador.actualizar_lote(
+                e0, e1, simular_lote(e0, e1, NUM_SIMULACIONES, semilla, configuracion)
+            )
+    imprimir_resumen(agregador)
+
+def elegir_semilla():
+    """
+    Devuelve la semilla raíz del torneo: SEMILLA_RAIZ si está definida; si no, la del
+    almacén de resultados que se va a reanudar o, si no lo hay, una nueva.
+    """
+    if SEMILLA_RAIZ is not None:
+        return SEMILLA_RAIZ
+    if DIRECTORIO_RESULTADOS is not None and os.path.exists(os.path.join(DIRECTORIO_RESULTADOS, MANIFIESTO)):
+        return leer_manifiesto(DIRECTORIO_RESULTADOS)["configuracion"].get("semilla", semilla_nueva())
+    return semilla_nueva()
+
+def abrir_almacen(estrategias, agregador, semilla):
+    """
+    Abre el almacén de resultados si DIRECTORIO_RESULTADOS está definido y recupera
+    en el agregador las partidas que ya estaban guardadas.
+
+    Returns:
+        (almacen, completadas): el almacén y las máscaras de partidas completadas por
+        pareja, o (None, None) si no se guardan resultados.
+    """
+    if DIRECTORIO_RESULTADOS is None:
+        return None, None
+    configuracion = {
+        "board_size": BOARD_SIZE,
+        "tamanos_barcos": list(TAMANOS_BARCOS),
+        "pool_flotas": USAR_POOL_FLOTAS,
+        "semilla": semilla,
+        "numeros_aleatorios_comunes": NUMEROS_ALEATORIOS_COMUNES,
+    }
+    almacen = AlmacenResultados(
+        DIRECTORIO_RESULTADOS, configuracion, estrategias, TAM_BLOQUE_RESULTADOS,
+        intervalo_volcado=INTERVALO_VOLCADO_RESULTADOS,
+    )
+    restauradas = almacen.restaurar(agregador, estrategias, NUM_SIMULACIONES)
+    if restauradas:
+        print(f"Reanudando desde {DIRECTORIO_RESULTADOS}: {restauradas} partidas ya completadas.")
+    return almacen, almacen.completadas(estrategias, NUM_SIMULACIONES)
 
 def main():
     comm = MPI.COMM_WORLD
     rank = comm.Get_rank()
     size = comm.Get_size()
+    coordinador = 0
 
-    if size < 3:
-        if rank == 0:
-            print("Este programa requiere al menos 3 procesos MPI (2 jugadores + 1 coordinador).")
+    estrategias = list(ESTRATEGIAS_DISPONIBLES.keys())
+    configuracion = Configuracion()
+
+    # Los modos "lotes" y "vectorizado" no pasan por el almacén: mejor parar que
+    # ignorar en silencio el directorio de resultados
+    if DIRECTORIO_RESULTADOS is not None and MODO_EJECUCION != "cola":
+        sys.exit(
+            f"DIRECTORIO_RESULTADOS solo se usa en el modo \"cola\" y MODO_EJECUCION es "
+            f"\"{MODO_EJECUCION}\": ponlo a None o usa el modo \"cola\" para poder reanudar."
+            if rank == coordinador else 1
+        )
+
+    # Semilla raíz común a todos los ranks
+    semilla = comm.bcast(elegir_semilla() if rank == coordinador else None, root=coordinador)
+    if rank == coordinador:
+        print(f"Semilla raíz: {semilla}")
+
+    if MODO_EJECUCION == "lotes":
+        ejecutar_modo_lotes(comm, estrategias, coordinador, semilla, configuracion)
         return
 
-    estrategias = list(ESTRATEGIAS_DISPONIBLES.keys())
+    if MODO_EJECUCION == "vectorizado":
+        if rank == coordinador:
+            ejecutar_modo_vectorizado(estrategias, semilla, configuracion)
+        return
+
+    trabajadores = planificar_trabajadores(size, coordinador)
 
-    if rank == 2:
-        resultados = []
-        # Proceso maestro: gestiona todas las combinaciones de estrategias y controla los turnos
+    # Cada pareja de jugadores obtiene su propio comunicador, en el que sus
+    # ranks son el 0 y el 1, para que jugar_una_partida no dependa de COMM_WORLD
+    color = MPI.UNDEFINED
+    for i, trabajador in enumerate(trabajadores):
+        if rank in trabajador and len(trabajador) == 2:
+            color = i
+    comm_pareja = comm.Split(color, rank)
+    if comm_pareja == MPI.COMM_NULL:
+        comm_pareja = None
+
+    if rank == coordinador:
+        # Los resultados se agregan según llegan, sin guardarlos en memoria
+        agregador = AgregadorTorneo(
+            total=NUM_SIMULACIONES * len(estrategias) ** 2,
+            intervalo_progreso=INTERVALO_PROGRESO,
+        )
+        almacen, completadas = abrir_almacen(estrategias, agregador, semilla)
+        trabajos = generar_trabajos(estrategias, completadas, configuracion)
+        parada = (
+            CriterioParada(ANCHO_INTERVALO_PARADA, Z_INTERVALO, Z_DECISION, MIN_PARTIDAS_PAREJA)
+            if PARADA_ADAPTATIVA else None
+        )
         for e0 in estrategias:
             for e1 in estrategias:
                 print(f"\nSimulando {NUM_SIMULACIONES} partidas entre {e0.upper()} vs {e1.upper()}...\n")
-                for _ in range(NUM_SIMULACIONES):
-                    # En cada partida, se envían las estrategias a rank 0 y 1
-                    comm.send((e0, e1), dest=0, tag=0)
-                    comm.send((e0, e1), dest=1, tag=0)
-
-                    # Recogemos los resultados desde el rank 0
-                    resultado = comm.recv(source=0, tag=1)
-                    resultados.append(resultado)
-        # Después de todas las partidas, se manda una señal de parada
-        comm.send(None, dest=0, tag=9)
-        comm.send(None, dest=1, tag=9)
-
-        # STATS FINALES DE LAS PARTIDAS (las imprime el rank 2)
-        resumen = {}
-        for r in resultados:
-            clave = (r["estrategia_j0"], r["estrategia_j1"])
-            if clave not in resumen:
-                resumen[clave] = {
-                    "j0_gana": 0,
-                    "j1_gana": 0,
-                    "turnos": [],
-                    "duraciones": [],
-                    "disparos_j0": [],
-                    "disparos_j1": [],
-                    "aciertos_j0": [],
-                    "aciertos_j1": [],
-                }
-
-            resumen[clave]["turnos"].append(r["turnos"])
-            resumen[clave]["duraciones"].append(r["duracion"])
-            resumen[clave]["disparos_j0"].append(r["disparos_j0"])
-            resumen[clave]["disparos_j1"].append(r["disparos_j1"])
-            resumen[clave]["aciertos_j0"].append(r["aciertos_j0"])
-            resumen[clave]["aciertos_j1"].append(r["aciertos_j1"])
-
-            if r["ganador"] == 0:
-                resumen[clave]["j0_gana"] += 1
-            else:
-                resumen[clave]["j1_gana"] += 1
-
-        print("\n=== RESUMEN COMBINACIONES ===")
-        estrategias_set = list(set([r["estrategia_j0"] for r in resultados]))
-        estrategias_set.sort()
-        matriz = np.zeros((len(estrategias_set), len(estrategias_set)))  # filas: j0, columnas: j1
-
-        for (e0, e1), data in resumen.items():
-            total = data["j0_gana"] + data["j1_gana"]
-            idx0 = estrategias_set.index(e0)
-            idx1 = estrategias_set.index(e1)
-            pct_j1 = (data["j1_gana"] / total) * 100 if total else 0
-            matriz[idx0][idx1] = pct_j1
-
-            # También imprime resumen por combinación
-            prom_turnos = sum(data["turnos"]) / total
-            prom_duracion = sum(data["duraciones"]) / total
-            prom_disparos_j0 = sum(data["disparos_j0"]) / total
-            prom_disparos_j1 = sum(data["disparos_j1"]) / total
-            prom_aciertos_j0 = sum(data["aciertos_j0"]) / total
-            prom_aciertos_j1 = sum(data["aciertos_j1"]) / total
-            prec_j0 = (prom_aciertos_j0 / prom_disparos_j0) * 100 if prom_disparos_j0 else 0
-            prec_j1 = (prom_aciertos_j1 / prom_disparos_j1) * 100 if prom_disparos_j1 else 0
-
-            print(f"{e0} vs {e1}:")
-            print(f"  - J0 gana {data['j0_gana']}/{total},  J1 gana {data['j1_gana']}/{total}")
-            print(f"  - Prom. turnos: {prom_turnos:.1f}")
-            print(f"  - Prom. duracion: {prom_duracion:.2f}s")
-            print(f"  - Precision J0: {prec_j0:.1f}%,  Precision J1: {prec_j1:.1f}%")
-            print(f"  - Disparos por partida: J0={prom_disparos_j0:.1f}, J1={prom_disparos_j1:.1f}")
-            print()
-
-        # === IMPRESIÓN DE TABLA DE PORCENTAJES DE VICTORIA DE J1 ===
-        console = Console()
-        table = Table(title="Porcentaje de victorias del Jugador 1", show_lines=True)
-        table.add_column("J0 \\ J1", justify="right")
-
-        for nombre in estrategias_set:
-            table.add_column(nombre, justify="center")
-
-        for i, e0 in enumerate(estrategias_set):
-            fila = [e0] + [f"{matriz[i][j]:.1f}%" for j in range(len(estrategias_set))]
-            table.add_row(*fila)
-
-        if NUM_SIMULACIONES >1: console.print(table)
-        
+
+        if not trabajadores:
+            # Sin más procesos, el coordinador juega todas las partidas con el motor local
+            try:
+                for e0, e1 in list(agregador.parejas):
+                    detener_si_procede(agregador, parada, e0, e1)
+                while (trabajo := siguiente_trabajo(trabajos, agregador)) is not None:
+                    e0, e1, i = trabajo
+                    resultado = jugar_partida_local(e0, e1, i, semilla)
+                    agregador.actualizar(resultado)
+                    if almacen is not None:
+                        almacen.anadir(resultado, i)
+                    detener_si_procede(agregador, parada, e0, e1)
+            finally:
+                if almacen is not None:
+                    almacen.volcar()
+            imprimir_resumen(agregador)
+            return
+
+        # Proceso maestro: reparte las partidas entre los trabajadores libres
+        inicio = time.perf_counter()
+        try:
+            ocupacion = coordinar(comm, trabajadores, trabajos, agregador, almacen, parada)
+        finally:
+            if almacen is not None:
+                almacen.volcar()
+        duracion_total = time.perf_counter() - inicio
+
+        # STATS FINALES DE LAS PARTIDAS (las imprime el coordinador)
+        imprimir_resumen(agregador)
+        imprimir_utilizacion(trabajadores, ocupacion, duracion_total)
+
     else:
-        # Jugadores: ejecutan partidas cuando reciben estrategias del coordinador
-        while True:
-            status = MPI.Status()
-            datos = comm.recv(source=2, tag=MPI.ANY_TAG, status=status)
-            if status.Get_tag() == 9:
-                break
-            e0, e1 = datos
-            resultado = jugar_una_partida(e0, e1)
-            if rank == 0:
-                comm.send(resultado, dest=2, tag=1)
+        # Jugadores: ejecutan partidas cuando reciben trabajos del coordinador
+        trabajar(comm, coordinador, comm_pareja, semilla)
 
 
 if __name__ == "__main__":
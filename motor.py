@@ -0,0 +1,135 @@
+"""
+motor.py
+
+Este módulo implementa un motor de juego local para "Hundir la Flota".
+
+A diferencia de partida.py, aquí los dos jugadores viven en el mismo proceso y los
+disparos se resuelven con llamadas directas a Jugador.recibir_disparo(), sin pasar
+por MPI. La lógica de turnos es la misma que en la versión distribuida, de modo que
+el diccionario de estadísticas devuelto es idéntico al de jugar_una_partida().
+
+Al no haber latencia de mensajes, el coste de cada turno se reduce al de la propia
+lógica del juego. MPI pasa a ser solo uno de los transportes posibles: main.py
+utiliza este motor cuando un proceso juega las partidas por sí solo.
+
+Funciones:
+- jugar_partida_local(): ejecuta una única partida en el proceso actual.
+"""
+
+from jugador import Jugador
+from pool_flotas import pool_activo
+from semillas import generadores_jugador
+from configuracion import Configuracion
+from instrumentacion import Instrumentacion
+from eventos import RegistroEventos, guardar_registro, imprimir_eventos_guardados
+from constantes import (
+    ESTRATEGIAS, MOSTRAR_TABLERO, MOSTRAR_DISPAROS, INSTRUMENTAR,
+    DIRECTORIO_EVENTOS,
+)
+
+import time
+
+
+def jugar_partida_local(nombre_estrategia_0, nombre_estrategia_1, indice=None, semilla=None,
+                        configuracion=None):
+    """
+    Ejecuta una partida completa entre dos jugadores en el proceso actual.
+
+    Parámetros:
+        nombre_estrategia_0 (str): nombre de la estrategia para el jugador 0.
+        nombre_estrategia_1 (str): nombre de la estrategia para el jugador 1.
+        indice (int): índice de la partida, con el que se toman las flotas del pool
+                      si USAR_POOL_FLOTAS está activado, y con el que se guarda
+                      su registro de eventos si DIRECTORIO_EVENTOS está definido.
+        semilla (int): semilla raíz del torneo. Con semilla e índice, las flotas y
+                       las estrategias usan los generadores de la partida (ver
+                       semillas.py); si no, el módulo random.
+        configuracion (Configuracion): tamaño del tablero y barcos de la partida. Por
+                       defecto, BOARD_SIZE y TAMANOS_BARCOS de constantes.py.
+
+    Returns:
+        dict con las mismas claves que partida.jugar_una_partida(), salvo las de
+        comunicación. Con INSTRUMENTAR, la instrumentación no tiene fase de comunicación
+        ni mensajes.
+    """
+    nombres = (nombre_estrategia_0, nombre_estrategia_1)
+    if configuracion is None:
+        configuracion = Configuracion()
+    pool = pool_activo(configuracion) if indice is not None else None
+    if semilla is not None and indice is not None:
+        generadores = [generadores_jugador(semilla, indice, i, *nombres) for i in range(2)]
+    else:
+        generadores = [(None, None), (None, None)]
+    jugadores = [
+        Jugador(
+            ESTRATEGIAS[nombre].desde_configuracion(configuracion, rng=generadores[i][1]),
+            configuracion,
+            flota=pool.flota_partida(indice, i) if pool else None,
+            rng=generadores[i][0],
+        )
+        for i, nombre in enumerate(nombres)
+    ]
+    # Registro de disparos, solo si se van a mostrar o guardar
+    registrar = MOSTRAR_DISPAROS != "Ninguno" or DIRECTORIO_EVENTOS is not None
+    registro = (
+        RegistroEventos(nombres, [j.tablero for j in jugadores], configuracion.board_size)
+        if registrar else None
+    )
+
+    disparos = [0, 0]
+    aciertos = [0, 0]
+    turno = 0
+    ganador = None
+    inicio = time.time()
+    medir = INSTRUMENTAR
+    instrumentacion = Instrumentacion() if medir else None
+    reloj = time.perf_counter_ns
+
+    # === Bucle principal del juego ===
+    while ganador is None:
+        atacante = turno % 2
+        receptor = 1 - atacante
+
+        if medir: t0 = reloj()
+        x, y = jugadores[atacante].siguiente_disparo()
+        if medir: t1 = reloj()
+        resultado = jugadores[receptor].recibir_disparo(x, y)
+        if medir: t2 = reloj()
+        jugadores[atacante].registrar_resultado_disparo(x, y, resultado)
+        if medir:
+            instrumentacion.anotar_ataque(nombres[atacante], (t1 - t0) + (reloj() - t2))
+            instrumentacion.anotar_defensa(t2 - t1)
+
+        disparos[atacante] += 1
+        if resultado in ['tocado', 'hundido']:
+            aciertos[atacante] += 1
+
+        if registrar:
+            registro.anotar(turno, atacante, x, y, resultado)
+
+        if resultado == "FIN":
+            ganador = atacante
+
+        turno += 1
+
+    fin = time.time()
+
+    if registrar:
+        guardar_registro(registro, indice)
+        if MOSTRAR_DISPAROS != "Ninguno":
+            imprimir_eventos_guardados(registro, MOSTRAR_TABLERO)
+
+    resultado_partida = {
+        "ganador": ganador,
+        "turnos": turno,
+        "disparos_j0": disparos[0],
+        "aciertos_j0": aciertos[0],
+        "disparos_j1": disparos[1],
+        "aciertos_j1": aciertos[1],
+        "estrategia_j0": nombre_estrategia_0,
+        "estrategia_j1": nombre_estrategia_1,
+        "duracion": round(fin - inicio, 3),
+    }
+    if medir:
+        resultado_partida["instrumentacion"] = instrumentacion
+    return resultado_partida
@@ -0,0 +1,285 @@
+"""
+multiplexado.py
+
+Partidas multiplexadas: una pareja de ranks juega varias partidas a la vez.
+
+En jugar_una_partida() cada turno es un intercambio estricto de dos mensajes y los dos
+ranks pasan la mayor parte del tiempo esperando la latencia del otro. Aquí una pareja
+mantiene hasta PARTIDAS_POR_PAREJA partidas independientes en curso, identificadas por
+un número de hueco (juego), y las hace avanzar a la vez por rondas como en partida.py:
+
+1. Al empezar la ronda, cada rank registra en todas sus partidas la respuesta pendiente
+   y decide su siguiente disparo.
+2. Rank 0 envía en un solo mensaje sus disparos de todas las partidas (con las altas de
+   las partidas nuevas) y rank 1 responde con todos los resultados en otro.
+3. Rank 1 hace lo mismo con sus disparos en las partidas que siguen en curso.
+
+Así cada intercambio cuesta una latencia para todas las partidas, y el trabajo de las
+estrategias de una ronda se reparte entre más disparos. Cada partida hace las mismas
+llamadas a su estrategia y en el mismo orden que en jugar_una_partida(), así que con la
+misma semilla los resultados son idénticos.
+
+Solo rank 0 de la pareja habla con el coordinador: recibe las partidas, se las pasa a
+rank 1 como altas dentro del lote de disparos y devuelve los resultados. Un lote sin
+altas ni disparos indica a rank 1 que termine. Los registros de eventos de rank 1 se
+envían a rank 0 al terminar cada partida, como en partida.py; la especulación de
+ESPECULAR_RESPUESTAS y la instrumentación no se usan en este modo.
+
+Clases:
+- PartidaEnCurso: estado de una partida en un rank.
+- Multiplexor: partidas en curso de un rank de la pareja y rondas de juego.
+"""
+
+import time
+
+from partida import crear_jugador
+from protocolo import CanalLotes
+from configuracion import Configuracion
+from eventos import RegistroEventos, guardar_registro, imprimir_eventos_guardados
+from constantes import ESTRATEGIAS, MOSTRAR_TABLERO, MOSTRAR_DISPAROS, DIRECTORIO_EVENTOS
+
+# Etiqueta de los registros de eventos que rank 1 envía a rank 0 (como en partida.py)
+TAG_REGISTRO = 3
+
+# Las estrategias viajan en las altas por su posición en ESTRATEGIAS
+NOMBRES_ESTRATEGIAS = list(ESTRATEGIAS)
+CODIGOS_ESTRATEGIAS = {nombre: i for i, nombre in enumerate(NOMBRES_ESTRATEGIAS)}
+
+
+class PartidaEnCurso:
+    """
+    Estado de una partida multiplexada en uno de los dos ranks.
+    """
+
+    __slots__ = (
+        "e0", "e1", "indice", "jugador", "siguiente", "pendiente", "turno",
+        "disparos", "aciertos", "disparos_rival", "aciertos_rival", "mensajes", "bytes",
+        "inicio", "registro",
+    )
+
+    def __init__(self, e0, e1, indice, rank, semilla, configuracion, registrar):
+        self.e0 = e0
+        self.e1 = e1
+        self.indice = indice
+        self.jugador = crear_jugador(e0, e1, rank, indice, semilla, configuracion)
+        self.siguiente = None   # Disparo de esta ronda
+        self.pendiente = None   # (x, y, respuesta) del último disparo, aún sin registrar
+        self.turno = 0
+        self.disparos = self.aciertos = 0
+        self.disparos_rival = self.aciertos_rival = 0
+        self.mensajes = self.bytes = 0.0   # Parte de los lotes que le corresponde
+        self.inicio = time.time()
+        tableros = (self.jugador.tablero, None) if rank == 0 else (None, self.jugador.tablero)
+        self.registro = (
+            RegistroEventos((e0, e1), tableros, configuracion.board_size) if registrar else None
+        )
+
+    def decidir(self):
+        """
+        Registra la respuesta pendiente y decide el disparo de la ronda.
+        """
+        if self.pendiente is not None:
+            self.jugador.registrar_resultado_disparo(*self.pendiente)
+            self.pendiente = None
+        self.siguiente = self.jugador.siguiente_disparo()
+
+
+class Multiplexor:
+    """
+    Partidas en curso de un rank de la pareja. Rank 0 las da de alta con alta() y juega
+    rondas con ronda(); rank 1 juega con acompanar() hasta que rank 0 llama a cerrar().
+    """
+
+    __slots__ = ("rank", "comm", "canal", "capacidad", "semilla", "configuracion", "registrar",
+                 "partidas", "altas")
+
+    def __init__(self, comm, capacidad, semilla=None, configuracion=None):
+        """
+        Parámetros:
+            comm: comunicador de la pareja (ranks 0 y 1).
+            capacidad: máximo de partidas simultáneas.
+            semilla: semilla raíz del torneo (ver semillas.py).
+            configuracion: Configuracion de las partidas (por defecto, la de constantes.py).
+        """
+        self.rank = comm.Get_rank()
+        self.comm = comm
+        self.canal = CanalLotes(comm, 1 - self.rank, capacidad)
+        self.capacidad = capacidad
+        self.semilla = semilla
+        self.configuracion = configuracion if configuracion is not None else Configuracion()
+        self.registrar = MOSTRAR_DISPAROS != "Ninguno" or DIRECTORIO_EVENTOS is not None
+        self.partidas = {}  # Hueco (juego) -> PartidaEnCurso
+        self.altas = []     # Altas que rank 0 aún no ha enviado a rank 1
+
+    def __len__(self):
+        return len(self.partidas)
+
+    @property
+    def libres(self):
+        return self.capacidad - len(self.partidas)
+
+    def _nueva(self, juego, e0, e1, indice):
+        self.partidas[juego] = PartidaEnCurso(
+            e0, e1, indice, self.rank, self.semilla, self.configuracion, self.registrar
+        )
+
+    def alta(self, e0, e1, indice):
+        """
+        Empieza una partida en el primer hueco libre (solo en rank 0). Rank 1 la recibe
+        con el siguiente lote de disparos.
+        """
+        juego = next(j for j in range(self.capacidad) if j not in self.partidas)
+        self._nueva(juego, e0, e1, indice)
+        self.altas.append((juego, CODIGOS_ESTRATEGIAS[e0], CODIGOS_ESTRATEGIAS[e1], indice))
+
+    def _repartir(self, partidas, antes):
+        """
+        Reparte entre las partidas de un intercambio los mensajes y bytes que el canal ha
+        enviado y recibido desde antes (lo que devolvió canal.trafico()).
+        """
+        mensajes, nbytes = self.canal.trafico()
+        for partida in partidas:
+            partida.mensajes += (mensajes - antes[0]) / len(partidas)
+            partida.bytes += (nbytes - antes[1]) / len(partidas)
+
+    def _disparar(self, altas=()):
+        """
+        Envía los disparos de todas las partidas en curso y anota sus resultados.
+
+        Returns:
+            partidas terminadas, como (juego, partida).
+        """
+        juegos = sorted(self.partidas)
+        en_lote = [self.partidas[juego] for juego in juegos]
+        disparos = []
+        for juego, partida in zip(juegos, en_lote):
+            if partida.siguiente is None:
+                partida.decidir()
+            disparos.append((juego, *partida.siguiente))
+        antes = self.canal.trafico()
+        self.canal.enviar_disparos(list(altas), disparos)
+
+        terminadas = []
+        for (juego, x, y), respuesta in zip(disparos, self.canal.recibir_resultados(len(disparos))):
+            partida = self.partidas[juego]
+            partida.pendiente = (x, y, respuesta)
+            partida.siguiente = None
+            partida.turno += 1
+            partida.disparos += 1
+            if respuesta in ('tocado', 'hundido'):
+                partida.aciertos += 1
+            if respuesta == "FIN":
+                terminadas.append((juego, self.partidas.pop(juego)))
+        self._repartir(en_lote, antes)
+        return terminadas
+
+    def _responder(self, disparos, antes):
+        """
+        Resuelve un lote de disparos recibido y envía sus resultados.
+
+        Parámetros:
+            disparos: lote recibido con canal.recibir_disparos().
+            antes: canal.trafico() de antes de recibirlo.
+
+        Returns:
+            partidas terminadas, como (juego, partida).
+        """
+        resultados = []
+        terminadas = []
+        en_lote = []
+        for juego, x, y in disparos.tolist():
+            partida = self.partidas[juego]
+            en_lote.append(partida)
+            resultado = partida.jugador.recibir_disparo(x, y)
+            resultados.append(resultado)
+            if partida.registro is not None:
+                partida.registro.anotar(partida.turno, 1 - self.rank, x, y, resultado)
+            partida.turno += 1
+            partida.disparos_rival += 1
+            if resultado in ('tocado', 'hundido'):
+                partida.aciertos_rival += 1
+            if resultado == "FIN":
+                terminadas.append((juego, self.partidas.pop(juego)))
+        self.canal.enviar_resultados(resultados)
+        self._repartir(en_lote, antes)
+        return terminadas
+
+    def _cerrar_partidas(self, terminadas, ganador):
+        """
+        Junta los registros de eventos de las partidas terminadas y, en rank 0, devuelve
+        sus resultados.
+        """
+        if self.rank == 1:
+            if self.registrar:
+                for _, partida in terminadas:
+                    self.comm.send(partida.registro, dest=0, tag=TAG_REGISTRO)
+            return []
+
+        resultados = []
+        fin = time.time()
+        for _, partida in terminadas:
+            if self.registrar:
+                partida.registro.fusionar(self.comm.recv(source=1, tag=TAG_REGISTRO))
+                guardar_registro(partida.registro, partida.indice)
+                if MOSTRAR_DISPAROS != "Ninguno":
+                    imprimir_eventos_guardados(partida.registro, MOSTRAR_TABLERO)
+            # Su parte de los lotes en los que ha viajado (ver _repartir)
+            resultados.append((partida.indice, {
+                "ganador": ganador,
+                "turnos": partida.turno,
+                "disparos_j0": partida.disparos,
+                "aciertos_j0": partida.aciertos,
+                "disparos_j1": partida.disparos_rival,
+                "aciertos_j1": partida.aciertos_rival,
+                "estrategia_j0": partida.e0,
+                "estrategia_j1": partida.e1,
+                "duracion": round(fin - partida.inicio, 3),
+                "mensajes": round(partida.mensajes, 3),
+                "bytes": round(partida.bytes, 1),
+            }))
+        return resultados
+
+    def ronda(self):
+        """
+        Juega una ronda (un disparo de cada jugador) de todas las partidas en curso
+        (solo en rank 0).
+
+        Returns:
+            lista de (indice, resultado) de las partidas terminadas en la ronda.
+        """
+        for partida in self.partidas.values():
+            partida.decidir()
+
+        altas, self.altas = self.altas, []
+        terminadas = self._cerrar_partidas(self._disparar(altas), ganador=0)
+        if self.partidas:
+            antes = self.canal.trafico()
+            _, disparos = self.canal.recibir_disparos()
+            terminadas += self._cerrar_partidas(self._responder(disparos, antes), ganador=1)
+        return terminadas
+
+    def acompanar(self):
+        """
+        Bucle de rank 1: juega las rondas que marca rank 0 hasta recibir un lote vacío.
+        """
+        while True:
+            for partida in self.partidas.values():
+                partida.decidir()
+
+            antes = self.canal.trafico()
+            altas, disparos = self.canal.recibir_disparos()
+            if not len(altas) and not len(disparos):
+                break
+            for juego, e0, e1, indice in altas.tolist():
+                self._nueva(juego, NOMBRES_ESTRATEGIAS[e0], NOMBRES_ESTRATEGIAS[e1], indice)
+            self._cerrar_partidas(self._responder(disparos, antes), ganador=0)
+            if self.partidas:
+                self._cerrar_partidas(self._disparar(), ganador=1)
+        self.canal.cerrar()
+
+    def cerrar(self):
+        """
+        Indica a rank 1 que termine (solo en rank 0, sin partidas en curso).
+        """
+        self.canal.enviar_disparos([], [])
+        self.canal.cerrar()
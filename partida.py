@@ -3,94 +3,142 @@ partida.py
 
 Este módulo implementa la lógica central del juego "Hundir la Flota" distribuido con MPI.
 
-Se utilizan dos procesos (rank 0 y rank 1), cada uno con su propia instancia de Jugador
-y estrategia de disparo. La comunicación se realiza de forma explícita mediante MPI_Send
-y MPI_Recv, alternando turnos hasta que un jugador pierde toda su flota.
+Se utilizan dos procesos (rank 0 y rank 1 del comunicador de la pareja), cada uno con
+su propia instancia de Jugador y estrategia de disparo. La comunicación se realiza de
+forma explícita con envíos y recepciones no bloqueantes sobre buffers binarios (ver
+protocolo.py), alternando turnos hasta que un jugador pierde toda su flota.
+
+Los mensajes viajan por un Transporte (ver transporte.py): por defecto MPI, o dos
+anillos en memoria compartida entre dos procesos del mismo nodo lanzados sin mpirun
+con ParejaMemoria.
+
+La partida avanza por rondas de dos turnos: dispara rank 0, responde rank 1, dispara
+rank 1 y responde rank 0. Como la estrategia de cada jugador solo depende de las
+respuestas a sus propios disparos, al empezar cada ronda los dos jugadores registran la
+respuesta pendiente y deciden su siguiente disparo a la vez, y durante la ronda solo se
+resuelven disparos y se intercambian mensajes. Así el cálculo de las dos estrategias se
+solapa en lugar de alternarse, y cada ronda cuesta la decisión más lenta de las dos y
+no su suma.
+
+Con ESPECULAR_RESPUESTAS, mientras un jugador espera la respuesta a su disparo (p. ej.
+porque el otro aún está decidiendo) prepara, sobre copias de la estrategia, la
+decisión de la ronda siguiente para cada respuesta posible (agua, tocado, hundido), y
+al empezar la ronda se queda con la rama de la respuesta recibida. Solo compensa si
+decidir cuesta más que copiar la estrategia.
+
+Las llamadas a la estrategia son las mismas y en el mismo orden que sin solapamiento,
+así que con la misma semilla las partidas son idénticas.
 
 Funciones:
 - jugar_una_partida(): ejecuta una única partida y devuelve estadísticas de la misma.
-- guardar_tablero_evento(): guarda eventos relevantes del juego para imprimir al final.
-- imprimir_eventos_guardados(): imprime los eventos guardados al final de la partida.
+- crear_jugador(): jugador de un rank en una partida, con su estrategia y su flota.
+- especular(): prepara las ramas de la estrategia para cada respuesta posible.
+
+Clases:
+- ParejaMemoria: pareja de procesos que juegan partidas por memoria compartida.
+
+El registro e impresión de eventos vive en eventos.py, compartido con el motor local
+de motor.py, que juega la misma partida en un único proceso sin MPI. Cada jugador
+registra los disparos que recibe y rank 1 envía su registro a rank 0 al terminar.
 """
 
 from mpi4py import MPI
 from jugador import Jugador
-from constantes import BOARD_SIZE, ESTRATEGIAS_DISPONIBLES, MOSTRAR_TABLERO, MOSTRAR_DISPAROS
-
+from protocolo import Canal, TAG_DISPARO, TAG_RESULTADO
+from transporte import TransporteMPI, crear_transportes_memoria
+from pool_flotas import pool_activo
+from semillas import generadores_jugador
+from configuracion import Configuracion
+from instrumentacion import Instrumentacion
+from eventos import RegistroEventos, guardar_registro, imprimir_eventos_guardados
+from constantes import (
+    ESTRATEGIAS, MOSTRAR_TABLERO, MOSTRAR_DISPAROS, INSTRUMENTAR,
+    DIRECTORIO_EVENTOS, ESPECULAR_RESPUESTAS,
+)
+
+import copy
+import multiprocessing
+import pickle
+import random
 import time
 
+# Respuestas para las que se prepara una rama (FIN termina la partida)
+RESPUESTAS_ESPECULADAS = ('agua', 'tocado', 'hundido')
 
-# Lista de eventos que se imprimirán al final
-eventos_tablero = []
+# Etiquetas de los mensajes de cierre de la partida y de las partidas que ParejaMemoria
+# encarga a su proceso hijo
+TAG_ESTADISTICAS = 2
+TAG_REGISTRO = 3
+TAG_ENCARGO = 6
 
-def guardar_tablero_evento(eventos_tablero, jugador_id, atacante_id, turno, coordenadas, tablero, resultado):
-    """
-    Guarda un evento relevante del juego para ser impreso después.
-
-    Args:
-        jugador_id: jugador que recibe el disparo.
-        atacante_id: jugador que ha disparado.
-        turno: número de turno.
-        tablero: estado del tablero del jugador receptor.
-        resultado: resultado del disparo ("agua", "tocado", "hundido", "FIN").
+
+def crear_jugador(nombre_estrategia_0, nombre_estrategia_1, rank, indice=None, semilla=None,
+                  configuracion=None):
     """
-    evento = {
-        "turno": turno,
-        "atacante": atacante_id,
-        "receptor": jugador_id,
-        "coordenadas": coordenadas,
-        "resultado": resultado
-    }
+    Crea el jugador de un rank en una partida: su estrategia, con los generadores de la
+    partida si hay semilla e índice, y su flota, del pool si está activo.
 
-    if MOSTRAR_TABLERO:
-        evento["tablero"] = [row[:] for row in tablero]  # Copia profunda de las filas
+    Returns:
+        Jugador listo para jugar.
+    """
+    if configuracion is None:
+        configuracion = Configuracion()
+    estrategia_nombre = nombre_estrategia_0 if rank == 0 else nombre_estrategia_1
+    rng_flota = rng_estrategia = None
+    if semilla is not None and indice is not None:
+        rng_flota, rng_estrategia = generadores_jugador(
+            semilla, indice, rank, nombre_estrategia_0, nombre_estrategia_1
+        )
+    estrategia = ESTRATEGIAS[estrategia_nombre].desde_configuracion(configuracion, rng=rng_estrategia)
+    pool = pool_activo(configuracion) if indice is not None else None
+    flota = pool.flota_partida(indice, rank) if pool else None
+    return Jugador(estrategia, configuracion, flota=flota, rng=rng_flota)
+
+def especular(estrategia, x, y, peticion):
+    """
+    Mientras llega la respuesta al disparo (x, y), prepara para cada respuesta posible
+    una copia de la estrategia que ya la ha registrado, junto con su siguiente disparo.
+    Deja de preparar ramas en cuanto la respuesta ha llegado.
 
-    eventos_tablero.append(evento)
+    Parámetros:
+        estrategia: estrategia del jugador, que no se modifica.
+        x, y: coordenadas del disparo enviado.
+        peticion: Request de la recepción de la respuesta.
 
-def imprimir_eventos_guardados(eventos_tablero, mostrar_tablero=False):
-    """
-    Imprime todos los eventos de tablero guardados tras la partida, en orden cronológico,
-    con información del disparo, modo, proceso y si se ha hundido un barco.
+    Returns:
+        dict {respuesta: (estrategia, (x, y))} con las ramas preparadas.
     """
-    for evento in sorted(eventos_tablero, key=lambda x: x['turno']):
-        turno = evento['turno']
-        atacante = evento['atacante']
-        receptor = evento['receptor']
-        coordenadas = evento['coordenadas']
-        if mostrar_tablero: tablero = evento['tablero']
-        resultado = evento['resultado']
-
-        print("\n" + "=" * 60)
-        print(f"[ Turno {turno} ]")
-        print(f" -> Jugador {atacante} ha disparado en {coordenadas} al Jugador {receptor}.")
-        if resultado == 'tocado':
-            print(f" -> [TOCADO]")
-        elif resultado == 'hundido':
-            print(f" -> [HUNDIDO]")
-        elif resultado == 'agua':
-            print(f" -> [AGUA]")
-
-        # Encabezado columnas
-        if mostrar_tablero:
-            print(f" -> Tablero del Jugador {receptor} tras recibir el disparo.")
-            titulo = f"  === TABLERO DEL JUGADOR {receptor} ==="
-            print(titulo)
-            cabecera = "    " + " ".join([f"{i:2}" for i in range(BOARD_SIZE)])
-            print(cabecera)
-
-            for i, fila in enumerate(tablero):
-                fila_str = f"{i:2} |"
-                for celda in fila:
-                    fila_str += f" {celda} "
-                print(fila_str)
-
-def jugar_una_partida(nombre_estrategia_0, nombre_estrategia_1):
+    ramas = {}
+    for respuesta in RESPUESTAS_ESPECULADAS:
+        if peticion.Test():
+            break
+        # Sin generador propio, las estrategias usan el módulo random, que no se copia
+        rama = copy.deepcopy(estrategia, {id(random): random})
+        rama.registrar_resultado(x, y, respuesta)
+        ramas[respuesta] = (rama, rama.siguiente_disparo())
+    return ramas
+
+
+def jugar_una_partida(nombre_estrategia_0, nombre_estrategia_1, comm=None, indice=None, semilla=None,
+                      configuracion=None, transporte=None):
     """
-    Ejecuta una partida entre dos procesos MPI y devuelve estadísticas.
+    Ejecuta una partida entre dos procesos y devuelve estadísticas.
 
     Parámetros:
         nombre_estrategia_0 (str): nombre de la estrategia para el jugador 0.
         nombre_estrategia_1 (str): nombre de la estrategia para el jugador 1.
+        comm: comunicador de la pareja de jugadores (ranks 0 y 1). Por defecto,
+              MPI.COMM_WORLD.
+        indice (int): índice de la partida, con el que se toman las flotas del pool
+                      si USAR_POOL_FLOTAS está activado, y con el que se guarda
+                      su registro de eventos si DIRECTORIO_EVENTOS está definido.
+        semilla (int): semilla raíz del torneo. Con semilla e índice, cada jugador
+                       coloca su flota y elige sus disparos con los generadores de la
+                       partida (ver semillas.py); si no, con el módulo random.
+        configuracion (Configuracion): tamaño del tablero y barcos de la partida. Por
+                       defecto, BOARD_SIZE y TAMANOS_BARCOS de constantes.py.
+        transporte (Transporte): transporte con el otro jugador (ver transporte.py).
+                       Por defecto, TransporteMPI sobre comm.
 
     Returns (solo en rank 0):
         dict con:
@@ -103,47 +151,96 @@ def jugar_una_partida(nombre_estrategia_0, nombre_estrategia_1):
             - 'estrategia_j0': nombre estrategia jugador 0
             - 'estrategia_j1': nombre estrategia jugador 1
             - 'duracion': duración de la partida en segundos
+            - 'mensajes': mensajes intercambiados durante los turnos
+            - 'bytes': bytes intercambiados durante los turnos
+            - 'instrumentacion': Instrumentacion de los dos jugadores (solo si
+              INSTRUMENTAR está activado)
     """
-    comm = MPI.COMM_WORLD
-    rank = comm.Get_rank()
-    size = comm.Get_size()
-    assert size == 3, "Este juego requiere exactamente 3 procesos MPI."
+    if transporte is None:
+        transporte = TransporteMPI(comm if comm is not None else MPI.COMM_WORLD)
+    rank = transporte.rank
+    assert rank in (0, 1), "Solo los ranks 0 y 1 del comunicador juegan la partida."
 
     # Instanciamos el jugador y estrategia
     estrategia_nombre = nombre_estrategia_0 if rank == 0 else nombre_estrategia_1
-    estrategia_clase = ESTRATEGIAS_DISPONIBLES[estrategia_nombre]
-    estrategia = estrategia_clase(board_size=BOARD_SIZE)
-    jugador = Jugador(estrategia, board_size=BOARD_SIZE)
+    if configuracion is None:
+        configuracion = Configuracion()
+    jugador = crear_jugador(nombre_estrategia_0, nombre_estrategia_1, rank, indice, semilla, configuracion)
 
-    # === Estadísticas locales ===
-    # Solo el jugador rank 0 lleva el turno, para no desincronizar
-    if rank == 0:
-        turno = 0
-        comm.send(turno, dest=1, tag=99)
-    else:
-        turno = comm.recv(source=0, tag=99)
+    # Canal binario con el otro jugador (ver protocolo.py)
+    canal = Canal(transporte)
 
+    # === Estadísticas locales ===
+    # Ambos jugadores empiezan en el turno 0 y lo incrementan a la vez tras cada
+    # disparo, así que no hace falta enviarlo
+    turno = 0
     juego_terminado = False
     disparos_realizados = 0
     aciertos = 0
     inicio = time.time()
-    # Inicialización para visualización
-    caza = False  # Variable para indicar si se está cazando
-    resultado_anterior = None
+    # Instrumentación opcional: con INSTRUMENTAR desactivado solo se comprueba `medir`
+    medir = INSTRUMENTAR
+    instrumentacion = Instrumentacion(partidas_mpi=1) if medir else None
+    reloj = time.perf_counter_ns
+    # Registro de los disparos recibidos, solo si se van a mostrar o guardar
+    registrar = MOSTRAR_DISPAROS != "Ninguno" or DIRECTORIO_EVENTOS is not None
+    tableros = (jugador.tablero, None) if rank == 0 else (None, jugador.tablero)
+    registro = (
+        RegistroEventos((nombre_estrategia_0, nombre_estrategia_1), tableros, configuracion.board_size)
+        if registrar else None
+    )
     ganador = None  # Inicialización segura
 
+    # La partida avanza por rondas de dos turnos (dispara rank 0 y luego rank 1). La
+    # estrategia de cada jugador solo depende de las respuestas a sus propios disparos,
+    # así que al empezar cada ronda los dos jugadores registran la respuesta pendiente y
+    # deciden su siguiente disparo a la vez, sin esperarse el uno al otro
+    siguiente = None    # Disparo del jugador en esta ronda
+    pendiente = None    # (x, y, respuesta) del último disparo, aún sin registrar
+    ramas = None        # Ramas preparadas por especular() para la respuesta pendiente
+    decidir_ns = 0
+    casillas = configuracion.board_size ** 2
+
     # === Bucle principal del juego ===
     while not juego_terminado:
 
+        # === INICIO DE RONDA: DECISIÓN DE AMBOS JUGADORES ===
+        if turno % 2 == 0:
+            if medir: t0 = reloj()
+            if ramas and pendiente[2] in ramas:
+                jugador.estrategia, siguiente = ramas[pendiente[2]]
+            else:
+                if pendiente is not None:
+                    jugador.registrar_resultado_disparo(*pendiente)
+                siguiente = jugador.siguiente_disparo()
+            pendiente = ramas = None
+            if medir: decidir_ns = reloj() - t0
+
         # === TURNO DE REALIZAR DISPARO ===
         if turno % 2 == rank:
             # Dispara el jugador que le toca y le manda las coordenadas al otro jugador
-            x, y = jugador.siguiente_disparo()
-            comm.send((x, y), dest=1 - rank, tag=0)
-
-            # Recibimos la información del jugador que encaja el disparo y la registramos
-            respuesta = comm.recv(source=1 - rank, tag=1)
-            jugador.registrar_resultado_disparo(x, y, respuesta)
+            x, y = siguiente
+            if medir: t0 = reloj()
+            canal.enviar_disparo(x, y)
+            peticion = canal.iniciar_recepcion_resultado()
+            if medir: t1 = reloj()
+
+            # Mientras llega la respuesta, preparamos la decisión de la ronda siguiente
+            # para cada respuesta posible (salvo si ya no quedan casillas: será FIN)
+            if ESPECULAR_RESPUESTAS and disparos_realizados + 1 < casillas:
+                ramas = especular(jugador.estrategia, x, y, peticion)
+
+            # Recibimos la información del jugador que encaja el disparo; se registra en
+            # la estrategia al empezar la ronda siguiente
+            if medir: t2 = reloj()
+            respuesta = canal.esperar_resultado(peticion)
+            pendiente = (x, y, respuesta)
+            if medir:
+                # El envío y la espera cuentan como comunicación; la especulación,
+                # trabajo de la estrategia, como decisión
+                instrumentacion.anotar_ataque(
+                    estrategia_nombre, decidir_ns + (t2 - t1), (t1 - t0) + (reloj() - t2)
+                )
 
             disparos_realizados += 1 # para las estadísticas
             if respuesta in ['tocado', 'hundido']:
@@ -160,81 +257,55 @@ def jugar_una_partida(nombre_estrategia_0, nombre_estrategia_1):
             # En el caso de recibir disparo, el jugador disparado recoge las coordenadas que
             # le manda el jugador atacante y responde si le ha sido agua, tocado, hundido
             # o FIN (si ha perdido toda su flota)
-            x, y = comm.recv(source=1 - rank, tag=0)
+            if medir: t0 = reloj()
+            x, y = canal.recibir_disparo()
+            if medir: t1 = reloj()
             resultado = jugador.recibir_disparo(x, y)
-            comm.send(resultado, dest=1 - rank, tag=1)
-
-            # Comprobamos si el jugador que dispara ha dado a un barco para actualizar
-            # estadísticas y ver si registramos el evento
-
-            if estrategia_nombre == "optimizada":
-                if resultado == 'tocado':
-                    caza = True
-                elif resultado == 'hundido':
-                    caza = False
-            match MOSTRAR_DISPAROS:
-                case "Solo aciertos":
-                    debe_guardar = (
-                        turno < 2 or
-                        resultado in {'tocado', 'hundido'} or
-                        resultado_anterior == 'hundido' or
-                        caza or
-                        juego_terminado
-                    )
-                    resultado_anterior = resultado
-                case "Todos":
-                    debe_guardar = True
-                case "Ninguno":
-                    debe_guardar = True
-
-            # Registramos si corresponde
-            if debe_guardar:
-                guardar_tablero_evento(
-                        eventos_tablero = eventos_tablero,
-                        jugador_id=1 - turno % 2,
-                        atacante_id=turno % 2,
-                        turno=turno,
-                        coordenadas=(x, y),
-                        tablero=jugador.tablero if MOSTRAR_TABLERO else None, # tablero del jugador que recibe el disparo
-                        resultado=resultado
-                    )
+            if medir: t2 = reloj()
+            canal.enviar_resultado(resultado)
+            if medir:
+                instrumentacion.anotar_defensa(t2 - t1, (t1 - t0) + (reloj() - t2))
+
+            # Registramos el disparo recibido (el filtrado se hace al imprimir)
+            if registrar:
+                registro.anotar(turno, 1 - rank, x, y, resultado)
 
             if resultado == "FIN":
                 juego_terminado = True
+                ganador = 1 - rank
 
-        # Actualizamos el turno: rank 0 incrementa el turno y lo envía a rank 1,
-        # este lo recibe y lo actualiza
-        if rank == 0:
-            turno += 1
-            comm.send(turno, dest=1, tag=99)
-        else:
-            turno = comm.recv(source=0, tag=99)
+        # Actualizamos el turno en ambos jugadores
+        turno += 1
+
+    canal.cerrar()
 
     # === Enviamos recogemos las estadísticas ===
     fin = time.time()
 
     stats_locales = {
         "disparos": disparos_realizados,
-        "aciertos": aciertos
+        "aciertos": aciertos,
+        "mensajes": canal.mensajes,
+        "bytes": canal.bytes,
     }
+    if medir:
+        for etiqueta in (TAG_DISPARO, TAG_RESULTADO):
+            instrumentacion.contar_mensajes(etiqueta, canal.enviados[etiqueta], canal.bytes_enviados(etiqueta))
 
-    # Enviamos las estadísticas y eventos del jugador rank 1 al
+    # Enviamos las estadísticas y el registro de eventos del jugador rank 1 al
     # jugador rank 0 para que las procese y las imprima
     if rank == 0:
-        stats_remotas = comm.recv(source=1, tag=2)
-        eventos_tablero_remoto = comm.recv(source=1, tag=3)
+        stats_remotas = transporte.recibir_objeto(TAG_ESTADISTICAS)
+        registro_remoto = transporte.recibir_objeto(TAG_REGISTRO)
 
-        # Recogemos los eventos del tablero del jugador remoto y la añadimos
-        # a los eventos del tablero local 
-        todos_los_eventos = eventos_tablero + eventos_tablero_remoto
+        # Unimos los disparos recibidos por ambos jugadores en el registro de la partida
+        if registrar:
+            registro.fusionar(registro_remoto)
+            guardar_registro(registro, indice)
+            if MOSTRAR_DISPAROS != "Ninguno":
+                imprimir_eventos_guardados(registro, MOSTRAR_TABLERO)
 
-        if MOSTRAR_DISPAROS != "Ninguno":
-            if MOSTRAR_TABLERO:
-                imprimir_eventos_guardados(todos_los_eventos, True)
-            else:
-                imprimir_eventos_guardados(todos_los_eventos, False)
-
-        return {
+        resultado_partida = {
             "ganador": ganador,
             "turnos": turno,
             "disparos_j0": stats_locales["disparos"],
@@ -244,11 +315,94 @@ def jugar_una_partida(nombre_estrategia_0, nombre_estrategia_1):
             "estrategia_j0": nombre_estrategia_0,
             "estrategia_j1": nombre_estrategia_1,
             "duracion": round(fin - inicio, 3),
+            "mensajes": stats_locales["mensajes"] + stats_remotas["mensajes"],
+            "bytes": stats_locales["bytes"] + stats_remotas["bytes"],
         }
+        if medir:
+            resultado_partida["instrumentacion"] = instrumentacion.fusionar(stats_remotas["instrumentacion"])
+        return resultado_partida
 
     else:
-        comm.send(stats_locales, dest=0, tag=2)
-        comm.send(eventos_tablero, dest=0, tag=3)
+        if medir:
+            # Mensajes de cierre (pickle), sin contar la propia instrumentación
+            instrumentacion.contar_mensajes(TAG_ESTADISTICAS, 1, len(pickle.dumps(stats_locales)))
+            instrumentacion.contar_mensajes(TAG_REGISTRO, 1, len(pickle.dumps(registro)))
+            stats_locales["instrumentacion"] = instrumentacion
+        transporte.enviar_objeto(stats_locales, TAG_ESTADISTICAS)
+        transporte.enviar_objeto(registro, TAG_REGISTRO)
         return None
 
+
+def _servir_memoria(transporte):
+    """
+    Bucle del proceso hijo de ParejaMemoria: juega como rank 1 las partidas que le
+    encarga rank 0 hasta recibir None.
+    """
+    try:
+        while True:
+            encargo = transporte.recibir_objeto(TAG_ENCARGO)
+            if encargo is None:
+                break
+            jugar_una_partida(*encargo, transporte=transporte)
+    finally:
+        transporte.liberar()
+
+
+class ParejaMemoria:
+    """
+    Pareja de procesos del mismo nodo que juegan partidas por memoria compartida, sin
+    mpirun: el proceso actual es el jugador 0 y un proceso hijo, el jugador 1.
+
+    Uso:
+        with ParejaMemoria() as pareja:
+            resultado = pareja.jugar("optimizada", "densidad", indice=0, semilla=semilla)
+    """
+
+    __slots__ = ("transporte", "proceso")
+
+    def __init__(self, contexto=None):
+        """
+        Parámetros:
+            contexto: contexto de multiprocessing con el que se lanza el proceso hijo
+                      (por defecto, el del sistema: fork en Linux).
+
+        Raises:
+            RuntimeError: fuera de x86, donde los anillos no son seguros (ver transporte.py).
+        """
+        contexto = contexto if contexto is not None else multiprocessing.get_context()
+        self.transporte, transporte_hijo = crear_transportes_memoria(contexto=contexto)
+        self.proceso = contexto.Process(target=_servir_memoria, args=(transporte_hijo,), daemon=True)
+        self.proceso.start()
+        self.transporte.entrada.productor_vivo = self.proceso.is_alive
+
+    def jugar(self, nombre_estrategia_0, nombre_estrategia_1, indice=None, semilla=None, configuracion=None):
+        """
+        Juega una partida y devuelve sus estadísticas, como jugar_una_partida().
+        """
+        self.transporte.enviar_objeto(
+            (nombre_estrategia_0, nombre_estrategia_1, None, indice, semilla, configuracion), TAG_ENCARGO
+        )
+        return jugar_una_partida(
+            nombre_estrategia_0, nombre_estrategia_1, indice=indice, semilla=semilla,
+            configuracion=configuracion, transporte=self.transporte,
+        )
+
+    def cerrar(self):
+        """
+        Termina el proceso hijo y elimina los anillos.
+        """
+        if self.proceso is None:
+            return
+        if self.proceso.is_alive():
+            self.transporte.enviar_objeto(None, TAG_ENCARGO)
+        self.proceso.join()
+        self.proceso = None
+        self.transporte.liberar()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
     
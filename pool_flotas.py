@@ -0,0 +1,153 @@
+"""
+pool_flotas.py
+
+Este módulo genera y lee pools de flotas pregeneradas.
+
+Cada partida coloca dos flotas, así que en millones de partidas la colocación se repite
+millones de veces. Un pool guarda de antemano muchas flotas para una configuración
+(Configuracion: tamaño del tablero y flota) en un único fichero .npy: un array int16 de forma
+(num_flotas, num_barcos, 4) con, para cada barco, su origen (x, y), su orientación
+(0 horizontal, 1 vertical) y su longitud.
+
+Los procesos abren el fichero como memoria mapeada y toman las flotas por índice, sin
+parsear nada ni cargarlo entero en memoria. Como la flota de cada jugador depende solo
+del índice de la partida, todas las parejas de estrategias juegan sobre las mismas
+flotas y los experimentos son reproducibles.
+
+Uso:
+    python pool_flotas.py 1000000    # genera el pool de la configuración actual
+
+Funciones:
+- ruta_pool(): ruta del fichero de pool de una configuración.
+- generar_pool(): genera un pool y lo guarda en disco.
+- pool_activo(): devuelve el pool de una configuración si USAR_POOL_FLOTAS.
+
+Clases:
+- PoolFlotas: acceso por índice a las flotas de un fichero de pool.
+"""
+
+import os
+import sys
+import numpy as np
+
+from flota import ColocadorFlota
+from configuracion import Configuracion
+from constantes import USAR_POOL_FLOTAS, DIRECTORIO_POOLS
+
+HORIZONTAL = 0
+VERTICAL = 1
+
+# Flotas generadas por bloque al escribir un pool
+FLOTAS_POR_BLOQUE = 10000
+
+
+def ruta_pool(configuracion=None, directorio=DIRECTORIO_POOLS):
+    """
+    Devuelve la ruta del fichero de pool de una configuración (por defecto, la de
+    constantes.py).
+    """
+    if configuracion is None:
+        configuracion = Configuracion()
+    tamanos = "-".join(str(t) for t in configuracion.tamanos_barcos)
+    return os.path.join(directorio, f"flotas_{configuracion.board_size}_{tamanos}.npy")
+
+def empaquetar_flota(flota):
+    """
+    Convierte una flota (lista de listas de coordenadas) en filas (x, y, orientación, longitud).
+    """
+    filas = []
+    for barco in flota:
+        x, y = barco[0]
+        orientacion = VERTICAL if len(barco) > 1 and barco[1][0] != x else HORIZONTAL
+        filas.append((x, y, orientacion, len(barco)))
+    return filas
+
+def desempaquetar_flota(filas):
+    """
+    Reconstruye una flota (lista de listas de coordenadas) a partir de sus filas.
+    """
+    flota = []
+    for x, y, orientacion, longitud in filas.tolist():
+        if orientacion == VERTICAL:
+            flota.append([(x + i, y) for i in range(longitud)])
+        else:
+            flota.append([(x, y + i) for i in range(longitud)])
+    return flota
+
+def generar_pool(num_flotas, configuracion=None, ruta=None):
+    """
+    Genera num_flotas flotas de una configuración (por defecto, la de constantes.py)
+    y las escribe en disco por bloques, sin tenerlas todas en memoria.
+
+    Returns:
+        ruta del fichero generado.
+    """
+    if configuracion is None:
+        configuracion = Configuracion()
+    if ruta is None:
+        ruta = ruta_pool(configuracion)
+    os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+
+    colocador = ColocadorFlota(configuracion.board_size, configuracion.tamanos_barcos)
+    datos = np.lib.format.open_memmap(
+        ruta, mode="w+", dtype=np.int16, shape=(num_flotas, len(configuracion.tamanos_barcos), 4)
+    )
+    for inicio in range(0, num_flotas, FLOTAS_POR_BLOQUE):
+        fin = min(inicio + FLOTAS_POR_BLOQUE, num_flotas)
+        datos[inicio:fin] = [empaquetar_flota(colocador.colocar()) for _ in range(fin - inicio)]
+    datos.flush()
+    return ruta
+
+
+class PoolFlotas:
+    """
+    Acceso por índice a las flotas de un fichero de pool, mapeado en memoria.
+    """
+
+    def __init__(self, ruta, tamanos_barcos):
+        """
+        Parámetros:
+            ruta: fichero generado con generar_pool().
+            tamanos_barcos: tamaños esperados de la flota, para validar el fichero.
+        """
+        self.datos = np.load(ruta, mmap_mode="r")
+        if list(self.datos[0, :, 3]) != list(tamanos_barcos):
+            raise ValueError(f"El pool {ruta} no corresponde a la flota {list(tamanos_barcos)}.")
+
+    def __len__(self):
+        return self.datos.shape[0]
+
+    def flota(self, indice):
+        """
+        Devuelve la flota de ese índice (módulo el tamaño del pool).
+        """
+        return desempaquetar_flota(self.datos[indice % len(self)])
+
+    def flota_partida(self, indice_partida, jugador):
+        """
+        Devuelve la flota del jugador (0 o 1) en la partida con ese índice.
+        """
+        return self.flota(2 * indice_partida + jugador)
+
+
+_pools = {}
+
+def pool_activo(configuracion=None):
+    """
+    Devuelve el pool de la configuración indicada (por defecto, la de constantes.py)
+    si USAR_POOL_FLOTAS está activado, abriéndolo la primera vez, o None si no se usa.
+    """
+    if not USAR_POOL_FLOTAS:
+        return None
+    if configuracion is None:
+        configuracion = Configuracion()
+    pool = _pools.get(configuracion)
+    if pool is None:
+        pool = _pools[configuracion] = PoolFlotas(ruta_pool(configuracion), configuracion.tamanos_barcos)
+    return pool
+
+
+if __name__ == "__main__":
+    num_flotas = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    ruta = generar_pool(num_flotas)
+    print(f"Pool de {num_flotas} flotas guardado en {ruta}")
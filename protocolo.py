@@ -0,0 +1,279 @@
+"""
+protocolo.py
+
+Este módulo define el protocolo binario con el que los dos procesos de una partida se
+intercambian disparos y resultados.
+
+En lugar de serializar con pickle tuplas y cadenas, cada mensaje es un buffer de NumPy
+de tamaño fijo, reservado una única vez y enviado con las primitivas en mayúsculas de
+mpi4py, que transmiten la memoria del buffer directamente (o copiado en un anillo de
+memoria compartida, ver transporte.py):
+
+- Disparo: dos enteros int16 con las coordenadas (x, y) -> 4 bytes.
+- Resultado: un entero int8 con el código del resultado -> 1 byte.
+
+El número de turno no viaja por la red: ambos jugadores lo derivan localmente, ya que
+cada disparo recibe exactamente una respuesta.
+
+Los envíos son no bloqueantes y las recepciones se pueden iniciar y completar más
+tarde, para que el jugador calcule su siguiente disparo mientras el
+mensaje del otro está en camino (ver partida.py). Cada sentido y etiqueta tiene su
+propio buffer, así que un envío pendiente nunca se pisa con una recepción.
+
+Para las parejas que juegan varias partidas a la vez (ver multiplexado.py), CanalLotes
+agrupa en un único mensaje los disparos de todas las partidas en curso, cada uno con
+el identificador de su partida, y en otro sus resultados, en el mismo orden:
+
+- Lote de disparos: número de altas (int32), altas de partidas nuevas (DTYPE_ALTA,
+  14 bytes) y disparos (DTYPE_DISPARO_LOTE, 8 bytes).
+- Lote de resultados: un código int8 por disparo del lote recibido.
+
+Clases:
+- Canal: envía y recibe disparos y resultados con el otro jugador sobre un Transporte
+  y cuenta los mensajes y bytes transmitidos por etiqueta.
+- CanalLotes: envía y recibe lotes de disparos y resultados de varias partidas.
+"""
+
+from mpi4py import MPI
+import numpy as np
+
+# Códigos de resultado de un disparo
+AGUA = 0
+TOCADO = 1
+HUNDIDO = 2
+FIN = 3
+
+# Traducción entre los resultados que usa Jugador y los códigos del protocolo
+RESULTADOS = ('agua', 'tocado', 'hundido', 'FIN')
+CODIGOS = {resultado: codigo for codigo, resultado in enumerate(RESULTADOS)}
+
+# Etiquetas de los mensajes de la partida
+TAG_DISPARO = 0
+TAG_RESULTADO = 1
+TAG_LOTE_DISPAROS = 4
+TAG_LOTE_RESULTADOS = 5
+
+# Alta de una partida nueva en un lote: identificador de la partida en la pareja,
+# estrategias (posición en constantes.ESTRATEGIAS) e índice de la partida
+DTYPE_ALTA = np.dtype([("juego", "<i4"), ("e0", "u1"), ("e1", "u1"), ("indice", "<i8")])
+
+# Disparo de una partida en un lote
+DTYPE_DISPARO_LOTE = np.dtype([("juego", "<i4"), ("x", "<i2"), ("y", "<i2")])
+
+
+class Canal:
+    """
+    Canal punto a punto con el otro jugador de la partida.
+
+    Los buffers se reservan al crear el canal y se reutilizan en todos los turnos, por
+    lo que el bucle de la partida no crea objetos nuevos para comunicarse. Antes de
+    reutilizar el buffer de un envío se completa el envío anterior con la misma etiqueta.
+    """
+
+    def __init__(self, transporte):
+        """
+        Parámetros:
+            transporte: Transporte con el otro jugador (ver transporte.py).
+        """
+        self.transporte = transporte
+        self.disparo_enviado = np.zeros(2, dtype=np.int16)
+        self.disparo_recibido = np.zeros(2, dtype=np.int16)
+        self.resultado_enviado = np.zeros(1, dtype=np.int8)
+        self.resultado_recibido = np.zeros(1, dtype=np.int8)
+        self.enviados = [0, 0]      # Mensajes enviados por este jugador, por etiqueta
+
+    @property
+    def mensajes(self):
+        """
+        Mensajes enviados por este jugador.
+        """
+        return self.enviados[TAG_DISPARO] + self.enviados[TAG_RESULTADO]
+
+    def bytes_enviados(self, etiqueta):
+        if etiqueta == TAG_DISPARO:
+            return self.enviados[TAG_DISPARO] * self.disparo_enviado.nbytes
+        return self.enviados[TAG_RESULTADO] * self.resultado_enviado.nbytes
+
+    @property
+    def bytes(self):
+        """
+        Bytes enviados por este jugador.
+        """
+        return self.bytes_enviados(TAG_DISPARO) + self.bytes_enviados(TAG_RESULTADO)
+
+    def _enviar(self, buffer, etiqueta):
+        self.transporte.enviar(buffer, etiqueta)
+        self.enviados[etiqueta] += 1
+
+    def enviar_disparo(self, x, y):
+        self.transporte.liberar_envio(TAG_DISPARO)
+        self.disparo_enviado[0] = x
+        self.disparo_enviado[1] = y
+        self._enviar(self.disparo_enviado, TAG_DISPARO)
+
+    def enviar_resultado(self, resultado):
+        """
+        Parámetros:
+            resultado: 'agua', 'tocado', 'hundido' o 'FIN'.
+        """
+        self.transporte.liberar_envio(TAG_RESULTADO)
+        self.resultado_enviado[0] = CODIGOS[resultado]
+        self._enviar(self.resultado_enviado, TAG_RESULTADO)
+
+    def iniciar_recepcion_disparo(self):
+        """
+        Inicia la recepción del siguiente disparo y devuelve la petición (Request).
+        """
+        return self.transporte.iniciar_recepcion(self.disparo_recibido, TAG_DISPARO)
+
+    def esperar_disparo(self, peticion):
+        """
+        Completa la recepción iniciada con iniciar_recepcion_disparo().
+
+        Returns:
+            (x, y): coordenadas del disparo recibido.
+        """
+        peticion.Wait()
+        return int(self.disparo_recibido[0]), int(self.disparo_recibido[1])
+
+    def iniciar_recepcion_resultado(self):
+        """
+        Inicia la recepción del resultado del último disparo y devuelve la petición.
+        """
+        return self.transporte.iniciar_recepcion(self.resultado_recibido, TAG_RESULTADO)
+
+    def esperar_resultado(self, peticion):
+        """
+        Completa la recepción iniciada con iniciar_recepcion_resultado().
+
+        Returns:
+            resultado: 'agua', 'tocado', 'hundido' o 'FIN'.
+        """
+        peticion.Wait()
+        return RESULTADOS[self.resultado_recibido[0]]
+
+    def recibir_disparo(self):
+        return self.esperar_disparo(self.iniciar_recepcion_disparo())
+
+    def recibir_resultado(self):
+        return self.esperar_resultado(self.iniciar_recepcion_resultado())
+
+    def cerrar(self):
+        """
+        Completa los envíos pendientes. Se llama al terminar la partida.
+        """
+        self.transporte.cerrar()
+
+
+class CanalLotes:
+    """
+    Canal punto a punto de una pareja que juega varias partidas a la vez.
+
+    En cada intercambio viaja un único mensaje con los disparos de todas las partidas en
+    curso (precedidos de las altas de las partidas que empiezan) y otro con todos sus
+    resultados. Los buffers tienen capacidad para el máximo de partidas simultáneas y se
+    reservan una única vez.
+    """
+
+    def __init__(self, comm, destino, capacidad):
+        """
+        Parámetros:
+            comm: comunicador MPI de la pareja de jugadores.
+            destino: rank del otro jugador dentro de comm.
+            capacidad: máximo de partidas simultáneas.
+        """
+        self.comm = comm
+        self.destino = destino
+        tam = 4 + capacidad * (DTYPE_ALTA.itemsize + DTYPE_DISPARO_LOTE.itemsize)
+        self.disparos_enviados = np.zeros(tam, dtype=np.uint8)
+        self.disparos_recibidos = np.zeros(tam, dtype=np.uint8)
+        self.resultados_enviados = np.zeros(capacidad, dtype=np.int8)
+        self.resultados_recibidos = np.zeros(capacidad, dtype=np.int8)
+        self.envios = {TAG_LOTE_DISPAROS: None, TAG_LOTE_RESULTADOS: None}
+        self.mensajes = 0   # Mensajes enviados por este jugador
+        self.bytes = 0      # Bytes enviados por este jugador
+        self.mensajes_recibidos = 0
+        self.bytes_recibidos = 0
+
+    def _enviar(self, buffer, etiqueta):
+        self.envios[etiqueta] = self.comm.Isend(buffer, dest=self.destino, tag=etiqueta)
+        self.mensajes += 1
+        self.bytes += buffer.nbytes
+
+    def _anotar_recibido(self, nbytes):
+        self.mensajes_recibidos += 1
+        self.bytes_recibidos += nbytes
+
+    def trafico(self):
+        """
+        Returns:
+            (mensajes, bytes) enviados y recibidos por este jugador hasta ahora.
+        """
+        return self.mensajes + self.mensajes_recibidos, self.bytes + self.bytes_recibidos
+
+    def _liberar(self, etiqueta):
+        # Completa el envío anterior con la etiqueta para poder reutilizar su buffer
+        envio = self.envios[etiqueta]
+        if envio is not None:
+            envio.Wait()
+            self.envios[etiqueta] = None
+
+    def enviar_disparos(self, altas, disparos):
+        """
+        Parámetros:
+            altas: lista de (juego, e0, e1, indice) de las partidas que empiezan.
+            disparos: lista de (juego, x, y), uno por partida en curso.
+        """
+        self._liberar(TAG_LOTE_DISPAROS)
+        buffer = self.disparos_enviados
+        buffer[:4].view("<i4")[0] = len(altas)
+        fin_altas = 4 + len(altas) * DTYPE_ALTA.itemsize
+        fin = fin_altas + len(disparos) * DTYPE_DISPARO_LOTE.itemsize
+        if altas:
+            buffer[4:fin_altas].view(DTYPE_ALTA)[:] = altas
+        if disparos:
+            buffer[fin_altas:fin].view(DTYPE_DISPARO_LOTE)[:] = disparos
+        self._enviar(buffer[:fin], TAG_LOTE_DISPAROS)
+
+    def recibir_disparos(self):
+        """
+        Returns:
+            (altas, disparos): arrays con DTYPE_ALTA y DTYPE_DISPARO_LOTE (vistas del
+            buffer de recepción, válidas hasta el siguiente lote).
+        """
+        buffer = self.disparos_recibidos
+        status = MPI.Status()
+        self.comm.Recv(buffer, source=self.destino, tag=TAG_LOTE_DISPAROS, status=status)
+        fin = status.Get_count(MPI.BYTE)
+        self._anotar_recibido(fin)
+        fin_altas = 4 + int(buffer[:4].view("<i4")[0]) * DTYPE_ALTA.itemsize
+        return buffer[4:fin_altas].view(DTYPE_ALTA), buffer[fin_altas:fin].view(DTYPE_DISPARO_LOTE)
+
+    def enviar_resultados(self, resultados):
+        """
+        Parámetros:
+            resultados: 'agua', 'tocado', 'hundido' o 'FIN' de cada disparo del lote
+                        recibido, en su orden.
+        """
+        self._liberar(TAG_LOTE_RESULTADOS)
+        buffer = self.resultados_enviados[:len(resultados)]
+        for i, resultado in enumerate(resultados):
+            buffer[i] = CODIGOS[resultado]
+        self._enviar(buffer, TAG_LOTE_RESULTADOS)
+
+    def recibir_resultados(self, n):
+        """
+        Returns:
+            lista con los n resultados del último lote de disparos enviado.
+        """
+        buffer = self.resultados_recibidos[:n]
+        self.comm.Recv(buffer, source=self.destino, tag=TAG_LOTE_RESULTADOS)
+        self._anotar_recibido(buffer.nbytes)
+        return [RESULTADOS[c] for c in buffer]
+
+    def cerrar(self):
+        """
+        Completa los envíos pendientes.
+        """
+        for etiqueta in self.envios:
+            self._liberar(etiqueta)
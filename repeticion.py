@@ -0,0 +1,80 @@
+"""
+repeticion.py
+
+Herramienta para ver una partida guardada con DIRECTORIO_EVENTOS (ver eventos.py).
+
+El registro de una partida solo contiene los tableros con la flota inicial y el flujo
+de disparos (turno, atacante, coordenadas y resultado), así que los tableros de
+cualquier turno se reconstruyen aquí aplicando los disparos sobre la flota inicial.
+
+Uso:
+    python repeticion.py <registro.npz>                  # tableros al final de la partida
+    python repeticion.py <registro.npz> --turno 40       # tableros tras el turno 40
+    python repeticion.py <registro.npz> --jugador 1      # solo el tablero del jugador 1
+    python repeticion.py <registro.npz> --eventos        # todos los disparos, uno a uno
+    python repeticion.py <registro.npz> --animar 0.05    # tablero del receptor, en el sitio
+"""
+
+import argparse
+import sys
+import time
+
+from eventos import RegistroEventos, texto_evento
+from tablero import RenderizadorTablero
+from protocolo import RESULTADOS
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconstruye los tableros de una partida guardada.")
+    parser.add_argument("registro", help="fichero .npz guardado en DIRECTORIO_EVENTOS")
+    parser.add_argument("--turno", type=int, default=None,
+                        help="turno tras el que se muestran los tableros (por defecto, el último)")
+    parser.add_argument("--jugador", type=int, choices=(0, 1), default=None,
+                        help="mostrar solo el tablero de este jugador")
+    parser.add_argument("--eventos", action="store_true",
+                        help="imprimir todos los disparos retenidos con el tablero del receptor")
+    parser.add_argument("--animar", type=float, default=None, metavar="SEGUNDOS",
+                        help="redibujar en el sitio el tablero del receptor tras cada disparo")
+    args = parser.parse_args()
+
+    registro = RegistroEventos.cargar(args.registro)
+    eventos = registro.ordenados()
+    e0, e1 = registro.estrategias
+    print(f"Partida {e0} vs {e1} en un tablero de {registro.board_size}x{registro.board_size}: "
+          f"{registro.total} disparos, {len(registro)} retenidos")
+    if len(eventos):
+        ultimo = eventos[-1]
+        print(f"Último disparo: turno {ultimo['turno']}, jugador {ultimo['atacante']} "
+              f"en ({ultimo['x']}, {ultimo['y']}) -> {RESULTADOS[ultimo['codigo']]}")
+
+    if args.eventos or args.animar is not None:
+        renderizadores = [None, None]
+        for evento, tablero in registro.recorrer():
+            receptor = 1 - evento["atacante"]
+            if renderizadores[receptor] is None:
+                renderizadores[receptor] = RenderizadorTablero(tablero, jugador_id=receptor)
+            else:
+                renderizadores[receptor].actualizar(int(evento["x"]), int(evento["y"]))
+            if args.jugador is not None and receptor != args.jugador:
+                continue
+            if args.animar is None:
+                sys.stdout.write(texto_evento(evento, renderizadores[receptor]))
+            else:
+                renderizadores[receptor].dibujar()
+                time.sleep(args.animar)
+        return
+
+    turno = args.turno
+    if turno is None:
+        turno = int(eventos[-1]["turno"]) if len(eventos) else registro.turno_base
+    jugadores = (0, 1) if args.jugador is None else (args.jugador,)
+    if turno < registro.turno_base:
+        parser.error(f"el turno {turno} ya no está en el registro (empieza en el turno {registro.turno_base})")
+    print(f"\nTableros tras el turno {turno}:")
+    for jugador in jugadores:
+        if registro.bases[jugador] is not None:
+            sys.stdout.write(RenderizadorTablero(registro.tablero_en(jugador, turno), jugador_id=jugador).fotograma())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+semillas.py
+
+Generadores aleatorios reproducibles por partida.
+
+Todas las partidas de un torneo derivan de una única semilla raíz (SEMILLA_RAIZ en
+constantes.py, o una nueva que main.py imprime y guarda en el almacén de resultados).
+Cada jugador de cada partida obtiene dos generadores propios, uno para colocar su
+flota y otro para su estrategia, derivados con numpy.random.SeedSequence a partir de
+la semilla raíz y de una clave (índice de la partida, jugador). Así, el resultado de
+una partida no depende del proceso que la juegue ni del orden del reparto.
+
+Con NUMEROS_ALEATORIOS_COMUNES activado la clave no incluye la pareja de
+estrategias: la partida i se juega con las mismas flotas (y las mismas secuencias
+aleatorias de cada jugador) en todas las parejas. Las diferencias entre porcentajes de
+victoria de dos parejas se miden entonces sobre las mismas flotas, con mucha menos
+varianza que con flotas independientes, y hacen falta menos partidas para la misma
+confianza. Desactivado, la pareja forma parte de la clave y cada pareja ve flotas
+independientes.
+
+Los generadores son random.Random (un sorteo escalar cuesta mucho menos que con
+numpy.random.Generator); el simulador vectorizado usa en cambio semilla_lote().
+
+Funciones:
+- semilla_nueva(): semilla raíz aleatoria.
+- generadores_jugador(): generadores de flota y estrategia de un jugador en una partida.
+- semilla_lote(): semilla de NumPy para un lote vectorizado de una pareja.
+"""
+
+import random
+import zlib
+import numpy as np
+
+from constantes import NUMEROS_ALEATORIOS_COMUNES
+
+
+def semilla_nueva():
+    """
+    Devuelve una semilla raíz nueva tomada de la entropía del sistema.
+    """
+    return np.random.SeedSequence().entropy
+
+def clave_pareja(nombre_estrategia_0, nombre_estrategia_1):
+    """
+    Devuelve la parte de la clave que identifica a la pareja, o () si se usan números
+    aleatorios comunes. Usa crc32 y no hash(), que cambia entre procesos.
+    """
+    if NUMEROS_ALEATORIOS_COMUNES:
+        return ()
+    return (zlib.crc32(nombre_estrategia_0.encode()), zlib.crc32(nombre_estrategia_1.encode()))
+
+def _generador(secuencia):
+    # 128 bits de estado inicial para random.Random
+    return random.Random(int.from_bytes(secuencia.generate_state(4).tobytes(), "little"))
+
+def generadores_jugador(semilla, indice, jugador, nombre_estrategia_0, nombre_estrategia_1):
+    """
+    Devuelve los generadores de un jugador en la partida con ese índice.
+
+    Returns:
+        (rng_flota, rng_estrategia): dos random.Random independientes.
+    """
+    clave = (indice, jugador) + clave_pareja(nombre_estrategia_0, nombre_estrategia_1)
+    flota, estrategia = np.random.SeedSequence(semilla, spawn_key=clave).spawn(2)
+    return _generador(flota), _generador(estrategia)
+
+def semilla_lote(semilla, nombre_estrategia_0, nombre_estrategia_1):
+    """
+    Devuelve la SeedSequence con la que el simulador vectorizado sortea los órdenes
+    de exploración de un lote de la pareja.
+    """
+    return np.random.SeedSequence(semilla, spawn_key=(2 ** 32,) + clave_pareja(nombre_estrategia_0, nombre_estrategia_1))
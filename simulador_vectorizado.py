@@ -0,0 +1,285 @@
+"""
+simulador_vectorizado.py
+
+Este módulo implementa un simulador que juega miles de partidas a la vez con NumPy.
+
+En lugar de una partida por llamada, el simulador mantiene un lote de B partidas:
+- Los tableros de ambos jugadores en un array (2, B, N, N) de int8, donde cada casilla
+  guarda 0 (agua) o el identificador del barco + 1.
+- Las máscaras de disparos realizados y de casillas descartadas (halo de los barcos
+  hundidos) de cada jugador, con la misma forma.
+
+Todas las partidas avanzan un turno por paso: como el jugador 0 dispara en los turnos
+pares y el 1 en los impares, en cada paso todas las partidas activas tienen el mismo
+atacante. Las partidas terminadas quedan enmascaradas hasta que el lote se vacía.
+
+Las estrategias se describen mediante perfiles equivalentes a las clases de estrategias/:
+- paridad: la exploración dispara primero en las casillas con (x + y) par.
+- halo: descarta las casillas adyacentes (incluidas diagonales) a los barcos hundidos.
+- caza: tras un tocado prueba los vecinos del impacto y, con dos o más impactos
+  alineados, los extremos de la línea, en el mismo orden que actualizar_candidatos().
+
+La exploración aleatoria sin repetición se implementa recorriendo, para cada partida,
+una permutación aleatoria de las casillas (con las de la clase de paridad preferida al
+principio) y disparando a la primera que siga disponible. Como las casillas descartadas
+nunca vuelven a estar disponibles, la elección es uniforme entre las disponibles, igual
+que el muestreo por rechazo de las estrategias originales.
+
+Funciones:
+- simular_lote(): juega un lote de partidas entre dos estrategias.
+- matriz_victorias(): estima el porcentaje de victorias del Jugador 1 por combinación.
+"""
+
+import time
+import numpy as np
+
+from flota import ColocadorFlota, generar_flotas
+from pool_flotas import pool_activo
+from semillas import generadores_jugador, semilla_lote, semilla_nueva
+from configuracion import Configuracion
+
+# Perfiles vectorizados de las estrategias disponibles
+PERFILES = {
+    "aleatoria": {"paridad": False, "halo": False, "caza": False},
+    "optimizada": {"paridad": False, "halo": False, "caza": True},
+    "optimizada2": {"paridad": True, "halo": True, "caza": True},
+}
+
+
+def colocar_flotas(num_partidas, semilla=None, nombres=None, configuracion=None):
+    """
+    Genera las flotas de ambos jugadores de cada partida (o las toma del pool si
+    USAR_POOL_FLOTAS está activado) y las vuelca en un array. La configuración es por
+    defecto la de constantes.py.
+
+    Con semilla (y los nombres de la pareja), la flota de cada jugador de la partida g
+    se coloca con su generador de flota (ver semillas.py), así que es la misma que
+    colocarían los motores escalares para la partida de índice g.
+
+    Returns:
+        array (2, B, N, N) de int8 con 0 en el agua y el identificador del barco + 1
+        en sus casillas.
+    """
+    if configuracion is None:
+        configuracion = Configuracion()
+    n = configuracion.board_size
+    tamanos = configuracion.tamanos_barcos
+    barcos = np.zeros((2, num_partidas, n, n), dtype=np.int8)
+    pool = pool_activo(configuracion)
+    for jugador in range(2):
+        if pool:
+            flotas = (pool.flota_partida(g, jugador) for g in range(num_partidas))
+        elif semilla is not None:
+            flotas = (
+                ColocadorFlota(n, tamanos, generadores_jugador(semilla, g, jugador, *nombres)[0]).colocar()
+                for g in range(num_partidas)
+            )
+        else:
+            flotas = generar_flotas(num_partidas, tamanos, n)
+        for g, flota in enumerate(flotas):
+            for k, barco in enumerate(flota):
+                for x, y in barco:
+                    barcos[jugador, g, x, y] = k + 1
+    return barcos
+
+def ordenes_exploracion(num_partidas, paridad, rng, configuracion):
+    """
+    Genera para cada partida una permutación aleatoria de las casillas (índices planos)
+    del tablero de la configuración. Con paridad, las casillas con (x + y) par van todas
+    antes que las impares.
+    """
+    n = configuracion.board_size
+    claves = rng.random((num_partidas, n * n))
+    if paridad:
+        x, y = np.divmod(np.arange(n * n), n)
+        claves += (x + y) % 2
+    return np.argsort(claves, axis=1).astype(np.int32)
+
+def dilatar(mascaras):
+    """
+    Dilata un array (k, N, N) de máscaras booleanas una casilla en las 8 direcciones.
+    """
+    k, n, _ = mascaras.shape
+    relleno = np.zeros((k, n + 2, n + 2), dtype=bool)
+    relleno[:, 1:-1, 1:-1] = mascaras
+    resultado = np.zeros_like(mascaras)
+    for dx in range(3):
+        for dy in range(3):
+            resultado |= relleno[:, dx:dx + n, dy:dy + n]
+    return resultado
+
+def simular_lote(nombre_estrategia_0, nombre_estrategia_1, num_partidas, semilla=None, configuracion=None):
+    """
+    Juega num_partidas partidas entre dos estrategias avanzando todas a la vez.
+
+    Parámetros:
+        nombre_estrategia_0 (str): estrategia del jugador 0 (clave de PERFILES).
+        nombre_estrategia_1 (str): estrategia del jugador 1 (clave de PERFILES).
+        num_partidas (int): tamaño del lote.
+        semilla: semilla raíz (opcional, ver semillas.py) de las flotas y de los
+                 órdenes de exploración.
+        configuracion: Configuracion de las partidas (por defecto, la de constantes.py).
+
+    Returns:
+        dict de arrays de longitud num_partidas con las claves 'ganador', 'turnos',
+        'disparos_j0', 'aciertos_j0', 'disparos_j1', 'aciertos_j1' y 'duracion'
+        (duración del lote repartida entre sus partidas).
+    """
+    nombres = (nombre_estrategia_0, nombre_estrategia_1)
+    rng = np.random.default_rng(semilla_lote(semilla, *nombres) if semilla is not None else None)
+    perfiles = [PERFILES[nombre_estrategia_0], PERFILES[nombre_estrategia_1]]
+    if configuracion is None:
+        configuracion = Configuracion()
+    n = configuracion.board_size
+    B = num_partidas
+    inicio = time.perf_counter()
+
+    barcos = colocar_flotas(B, semilla, nombres, configuracion)
+    planos = barcos.reshape(2, B, n * n)
+
+    # Casillas restantes de cada barco y barcos a flote de cada jugador
+    longitudes = np.array(configuracion.tamanos_barcos, dtype=np.int16)
+    restantes = np.broadcast_to(longitudes, (2, B, len(longitudes))).copy()
+    vivos = np.full((2, B), len(longitudes), dtype=np.int16)
+
+    # Estado de cada atacante: disparos realizados y casillas descartadas por el halo
+    disparado = np.zeros((2, B, n * n), dtype=bool)
+    descartado = np.zeros((2, B, n * n), dtype=bool)
+    ordenes = np.stack([ordenes_exploracion(B, p["paridad"], rng, configuracion) for p in perfiles])
+    punteros = np.zeros((2, B), dtype=np.int32)
+
+    # Estado de caza: número de impactos sin hundir y su rectángulo envolvente
+    num_tocados = np.zeros((2, B), dtype=np.int16)
+    fila_min = np.zeros((2, B), dtype=np.int32)
+    fila_max = np.zeros((2, B), dtype=np.int32)
+    col_min = np.zeros((2, B), dtype=np.int32)
+    col_max = np.zeros((2, B), dtype=np.int32)
+
+    disparos = np.zeros((2, B), dtype=np.int32)
+    aciertos = np.zeros((2, B), dtype=np.int32)
+    ganador = np.full(B, -1, dtype=np.int8)
+    turnos = np.zeros(B, dtype=np.int32)
+    activas = np.arange(B)
+
+    turno = 0
+    while activas.size:
+        a = turno % 2
+        d = 1 - a
+        perfil = perfiles[a]
+        celdas = np.full(activas.size, -1, dtype=np.int64)
+
+        # === Caza: primer candidato válido alrededor de los impactos ===
+        if perfil["caza"]:
+            en_caza = np.nonzero(num_tocados[a, activas] > 0)[0]
+            if en_caza.size:
+                g = activas[en_caza]
+                r0, r1 = fila_min[a, g], fila_max[a, g]
+                c0, c1 = col_min[a, g], col_max[a, g]
+                uno = num_tocados[a, g] == 1
+                horizontal = r0 == r1
+                # Con un impacto: arriba, abajo, izquierda, derecha.
+                # Con varios: los dos extremos de la línea (el cuarto hueco queda inválido).
+                cand_x = np.where(uno[:, None],
+                                  np.stack([r0 - 1, r0 + 1, r0, r0], axis=1),
+                                  np.where(horizontal[:, None],
+                                           np.stack([r0, r0, r0, r0], axis=1),
+                                           np.stack([r0 - 1, r1 + 1, r0, r0], axis=1)))
+                cand_y = np.where(uno[:, None],
+                                  np.stack([c0, c0, c0 - 1, c0 + 1], axis=1),
+                                  np.where(horizontal[:, None],
+                                           np.stack([c0 - 1, c1 + 1, c0, c0], axis=1),
+                                           np.stack([c0, c0, c0, c0], axis=1)))
+                validos = (cand_x >= 0) & (cand_x < n) & (cand_y >= 0) & (cand_y < n)
+                validos[~uno, 2:] = False
+                planas = np.where(validos, cand_x * n + cand_y, 0)
+                filas = g[:, None]
+                validos &= ~disparado[a, filas, planas] & ~descartado[a, filas, planas]
+                hay = validos.any(axis=1)
+                elegido = planas[np.arange(g.size), validos.argmax(axis=1)]
+                celdas[en_caza[hay]] = elegido[hay]
+
+        # === Exploración: primera casilla disponible de la permutación ===
+        pendientes = np.nonzero(celdas < 0)[0]
+        while pendientes.size:
+            g = activas[pendientes]
+            candidata = ordenes[a, g, punteros[a, g]]
+            libre = ~disparado[a, g, candidata] & ~descartado[a, g, candidata]
+            celdas[pendientes[libre]] = candidata[libre]
+            pendientes = pendientes[~libre]
+            punteros[a, activas[pendientes]] += 1
+
+        # === Resolución de los disparos ===
+        g = activas
+        disparado[a, g, celdas] = True
+        disparos[a, g] += 1
+        valor = planos[d, g, celdas].astype(np.int64)
+        impacto = valor > 0
+
+        gi = g[impacto]
+        barco = valor[impacto] - 1
+        restantes[d, gi, barco] -= 1
+        hundido = restantes[d, gi, barco] == 0
+        vivos[d, gi[hundido]] -= 1
+        fin = np.zeros(g.size, dtype=bool)
+        fin[np.nonzero(impacto)[0][hundido]] = vivos[d, gi[hundido]] == 0
+        aciertos[a, g[impacto & ~fin]] += 1
+
+        if perfil["caza"]:
+            # Tocado sin hundir: se amplía el rectángulo de impactos
+            tocado = gi[~hundido]
+            x, y = np.divmod(celdas[impacto][~hundido], n)
+            nuevo = num_tocados[a, tocado] == 0
+            fila_min[a, tocado] = np.where(nuevo, x, np.minimum(fila_min[a, tocado], x))
+            fila_max[a, tocado] = np.where(nuevo, x, np.maximum(fila_max[a, tocado], x))
+            col_min[a, tocado] = np.where(nuevo, y, np.minimum(col_min[a, tocado], y))
+            col_max[a, tocado] = np.where(nuevo, y, np.maximum(col_max[a, tocado], y))
+            num_tocados[a, tocado] += 1
+            # Hundido: se vuelve a explorar
+            num_tocados[a, gi[hundido]] = 0
+
+        if perfil["halo"] and hundido.any():
+            gh = gi[hundido]
+            casillas = barcos[d, gh] == (barco[hundido] + 1)[:, None, None]
+            descartado[a, gh] |= dilatar(casillas).reshape(gh.size, n * n)
+
+        ganador[g[fin]] = a
+        turnos[g[fin]] = turno + 1
+        activas = g[~fin]
+        turno += 1
+
+    duracion = (time.perf_counter() - inicio) / B
+    return {
+        "ganador": ganador,
+        "turnos": turnos,
+        "disparos_j0": disparos[0],
+        "aciertos_j0": aciertos[0],
+        "disparos_j1": disparos[1],
+        "aciertos_j1": aciertos[1],
+        "duracion": np.full(B, duracion),
+    }
+
+def matriz_victorias(estrategias, num_partidas, semilla=None, configuracion=None):
+    """
+    Estima el porcentaje de victorias del Jugador 1 para cada combinación de estrategias.
+    Todas las parejas usan la misma semilla raíz (con NUMEROS_ALEATORIOS_COMUNES, las
+    mismas flotas).
+
+    Returns:
+        array (E, E) con filas para la estrategia de J0 y columnas para la de J1.
+    """
+    semilla = semilla_nueva() if semilla is None else semilla
+    matriz = np.zeros((len(estrategias), len(estrategias)))
+    for i, e0 in enumerate(estrategias):
+        for j, e1 in enumerate(estrategias):
+            resultado = simular_lote(e0, e1, num_partidas, semilla=semilla, configuracion=configuracion)
+            matriz[i, j] = (resultado["ganador"] == 1).mean() * 100
+    return matriz
+
+
+if __name__ == "__main__":
+    inicio = time.perf_counter()
+    estrategias = list(PERFILES)
+    matriz = matriz_victorias(estrategias, 10000)
+    print(f"Porcentaje de victorias del Jugador 1 ({time.perf_counter() - inicio:.1f}s)")
+    for e0, fila in zip(estrategias, matriz):
+        print(f"{e0:>12} " + " ".join(f"{v:6.1f}%" for v in fila))
@@ -7,56 +7,207 @@ Contiene funciones para:
 - Crear un tablero vacío.
 - Marcar disparos.
 - Imprimir el tablero en consola en modo texto (compatible con cualquier terminal).
+
+El tablero se guarda como un bytearray con un código por casilla (CODIGO_* en
+constantes.py), en lugar de una lista de listas de cadenas. Al recorrerlo fila a fila
+devuelve cadenas con los símbolos SIMBOLO_*, que es lo único que necesita la impresión.
+
+En tableros de UMBRAL_TABLERO_DISPERSO casillas de lado o más, el bytearray ocuparía
+N² bytes casi todos a cero (100 MB con N = 10000), así que las casillas se guardan en
+un CeldasDispersas: un diccionario con solo las casillas no vacías (barcos y disparos)
+que se indexa igual que el bytearray. La memoria crece con los barcos y los disparos,
+no con el área. crear_celdas() elige la representación; la usan también el índice de
+la flota de Jugador y los bloqueos de ColocadorFlota.
+
+La impresión la hace RenderizadorTablero, que guarda las filas ya formateadas, cambia
+solo la casilla disparada en cada actualización y escribe el fotograma completo con
+una única llamada a write(). Para redibujar en el sitio usa secuencias de escape ANSI
+(mover el cursor y borrar la pantalla) en lugar de lanzar "clear" o "cls".
 """
 
-from constantes import BOARD_SIZE, SIMBOLO_VACIO, SIMBOLO_BARCO
-import os
-import platform
+from constantes import CODIGO_BARCO, CODIGO_VACIO, SIMBOLOS, UMBRAL_TABLERO_DISPERSO
+import sys
+
+# Tabla de traducción de códigos de casilla a símbolos imprimibles
+TABLA_SIMBOLOS = bytes(
+    ord(SIMBOLOS[codigo]) if codigo < len(SIMBOLOS) else ord("?") for codigo in range(256)
+)
+# La misma tabla con los barcos ocultos (como casillas vacías)
+TABLA_SIMBOLOS_OCULTOS = bytes(
+    TABLA_SIMBOLOS[CODIGO_VACIO] if codigo == CODIGO_BARCO else TABLA_SIMBOLOS[codigo]
+    for codigo in range(256)
+)
+
+# Secuencias ANSI: cursor al inicio y borrar la pantalla
+ANSI_INICIO = "\x1b[H"
+ANSI_BORRAR = "\x1b[2J"
+
+
+class CeldasDispersas(dict):
+    """
+    Casillas no nulas de un tablero grande: índice x * N + y -> valor. Se lee y se
+    escribe como un bytearray; las casillas que no están valen 0.
+    """
+
+    __slots__ = ()
+
+    def __missing__(self, indice):
+        return 0
+
+
+def es_disperso(board_size):
+    """
+    Devuelve True si los tableros de ese tamaño guardan solo las casillas no vacías.
+    """
+    return UMBRAL_TABLERO_DISPERSO is not None and board_size >= UMBRAL_TABLERO_DISPERSO
+
+def crear_celdas(board_size):
+    """
+    Devuelve un valor por casilla inicializado a 0: un bytearray o, en tableros
+    grandes, un CeldasDispersas.
+    """
+    if es_disperso(board_size):
+        return CeldasDispersas()
+    return bytearray(board_size * board_size)
+
+
+class Tablero:
+    """
+    Tablero cuadrado con un byte por casilla (o solo las no vacías si es disperso).
+    """
+
+    __slots__ = ("board_size", "celdas")
 
-def crear_tablero():
+    def __init__(self, board_size, celdas=None):
+        self.board_size = board_size
+        self.celdas = crear_celdas(board_size) if celdas is None else celdas
+
+    def obtener(self, x, y):
+        """
+        Devuelve el código de la casilla (x, y).
+        """
+        return self.celdas[x * self.board_size + y]
+
+    def marcar(self, x, y, codigo):
+        """
+        Guarda el código de la casilla (x, y).
+        """
+        self.celdas[x * self.board_size + y] = codigo
+
+    def copia(self):
+        """
+        Devuelve una copia independiente del tablero.
+        """
+        return Tablero(self.board_size, type(self.celdas)(self.celdas))
+
+    def fila(self, i, tabla=TABLA_SIMBOLOS):
+        """
+        Devuelve la fila i como cadena de símbolos (traducidos con tabla).
+        """
+        n = self.board_size
+        if isinstance(self.celdas, CeldasDispersas):
+            codigos = bytes(self.celdas[i * n + y] for y in range(n))
+        else:
+            codigos = self.celdas[i * n:(i + 1) * n]
+        return codigos.translate(tabla).decode("ascii")
+
+    def __len__(self):
+        return self.board_size
+
+    def __iter__(self):
+        for i in range(self.board_size):
+            yield self.fila(i)
+
+
+def crear_tablero(board_size):
     """
-    Crea y devuelve un tablero vacío.
+    Crea y devuelve un tablero vacío de board_size x board_size (el de la
+    configuración de la partida).
     """
-    return [[SIMBOLO_VACIO for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
+    return Tablero(board_size)
 
-def marcar_disparo(tablero, x, y, simbolo):
+def marcar_disparo(tablero, x, y, codigo):
     """
     Marca un disparo en el tablero.
     """
-    tablero[x][y] = simbolo
+    tablero.marcar(x, y, codigo)
+
+class RenderizadorTablero:
+    """
+    Texto de un tablero con las filas formateadas en caché.
+
+    Cada fila se guarda como "ii | a  b  c ", con cada casilla en la columna
+    INICIO_CASILLAS + 3 * y, así que un disparo solo cambia un carácter de una fila.
+    """
+
+    INICIO_CASILLAS = 5   # Longitud de "ii |" más el espacio de la primera casilla
+
+    __slots__ = ("tablero", "tabla", "titulo", "cabecera", "filas", "dibujado")
+
+    def __init__(self, tablero, mostrar_barcos=True, jugador_id=None):
+        """
+        Parámetros:
+            tablero: Tablero que se representa.
+            mostrar_barcos: si False, oculta los barcos.
+            jugador_id: número del jugador (opcional, para el título).
+        """
+        self.tablero = tablero
+        self.tabla = TABLA_SIMBOLOS if mostrar_barcos else TABLA_SIMBOLOS_OCULTOS
+        self.titulo = f"  === TABLERO DEL JUGADOR {jugador_id} ===" if jugador_id is not None else "  === TABLERO ==="
+        self.cabecera = "    " + " ".join([f"{i:2}" for i in range(len(tablero))])
+        self.dibujado = False
+        self.recargar()
+
+    def recargar(self):
+        """
+        Vuelve a formatear todas las filas a partir del tablero.
+        """
+        self.filas = [
+            f"{i:2} | " + "  ".join(self.tablero.fila(i, self.tabla)) + " "
+            for i in range(len(self.tablero))
+        ]
+
+    def actualizar(self, x, y):
+        """
+        Actualiza en la caché la casilla (x, y) tras un cambio en el tablero.
+        """
+        simbolo = chr(self.tabla[self.tablero.obtener(x, y)])
+        fila = self.filas[x]
+        k = self.INICIO_CASILLAS + 3 * y
+        self.filas[x] = fila[:k] + simbolo + fila[k + 1:]
+
+    def fotograma(self):
+        """
+        Devuelve el texto completo del tablero (título, cabecera y filas).
+        """
+        return "\n".join([self.titulo, self.cabecera, *self.filas]) + "\n"
+
+    def dibujar(self, salida=None):
+        """
+        Dibuja el tablero en el sitio: la primera vez borra la pantalla y las
+        siguientes solo lleva el cursor al inicio y sobrescribe el fotograma anterior.
+        """
+        salida = sys.stdout if salida is None else salida
+        prefijo = ANSI_INICIO if self.dibujado else ANSI_INICIO + ANSI_BORRAR
+        salida.write(prefijo + self.fotograma())
+        salida.flush()
+        self.dibujado = True
+
 
 def limpiar_consola():
     """
-    Limpia la consola del sistema actual.
+    Limpia la consola con secuencias ANSI, sin lanzar un proceso.
     """
-    if platform.system() == "Windows":
-        os.system("cls")
-    else:
-        os.system("clear")
+    sys.stdout.write(ANSI_INICIO + ANSI_BORRAR)
+    sys.stdout.flush()
 
 def imprimir_tablero(tablero, mostrar_barcos=True, jugador_id=None):
     """
-    Imprime el tablero en consola en modo texto simple.
+    Limpia la consola e imprime el tablero en modo texto simple.
 
     Parámetros:
-        tablero: matriz del tablero del jugador.
+        tablero: tablero del jugador.
         mostrar_barcos: si False, oculta los barcos.
         jugador_id: número del jugador (opcional).
     """
-    limpiar_consola()
-
-    titulo = f"  === TABLERO DEL JUGADOR {jugador_id} ===" if jugador_id is not None else "  === TABLERO ==="
-    print(titulo)
-
-    # Encabezado columnas
-    cabecera = "    " + " ".join([f"{i:2}" for i in range(BOARD_SIZE)])
-    print(cabecera)
-
-    for i, fila in enumerate(tablero):
-        fila_str = f"{i:2} |"
-        for celda in fila:
-            if celda == SIMBOLO_BARCO and not mostrar_barcos:
-                fila_str += "   "
-            else:
-                fila_str += f" {celda} "
-        print(fila_str)
+    RenderizadorTablero(tablero, mostrar_barcos, jugador_id).dibujar()
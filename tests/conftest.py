@@ -0,0 +1,11 @@
+"""
+Configuración común de las pruebas: los módulos del simulador viven en la raíz del
+proyecto, sin paquete, así que se añade al path.
+"""
+
+import os
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
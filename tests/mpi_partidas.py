@@ -0,0 +1,70 @@
+"""
+mpi_partidas.py
+
+Programa auxiliar de test_modos.py: juega con mpiexec -n 2 las mismas partidas por
+parejas de MPI (jugar_una_partida), multiplexadas (Multiplexor) y por lotes
+(ejecutar_por_lotes), y rank 0 escribe los resultados en un fichero JSON.
+
+Uso:
+    mpiexec -n 2 python tests/mpi_partidas.py <salida.json> <semilla> <num_partidas>
+"""
+
+import json
+import sys
+
+from mpi4py import MPI
+
+from partida import jugar_una_partida
+from multiplexado import Multiplexor
+from lotes import ejecutar_por_lotes
+from configuracion import Configuracion
+
+# Las mismas parejas y configuración que test_modos.py
+PAREJAS = [("optimizada2", "optimizada"), ("aleatoria", "densidad")]
+CONFIGURACION = Configuracion(10, (4, 3, 2))
+
+
+def main():
+    ruta, semilla, num_partidas = sys.argv[1], int(sys.argv[2]), int(sys.argv[3])
+    comm = MPI.COMM_WORLD
+    rank = comm.Get_rank()
+
+    pareja_mpi = {}
+    for e0, e1 in PAREJAS:
+        for indice in range(num_partidas):
+            r = jugar_una_partida(e0, e1, comm, indice, semilla, CONFIGURACION)
+            if rank == 0:
+                pareja_mpi[f"{e0}|{e1}|{indice}"] = r
+
+    # Todas las partidas a la vez en una pareja con menos huecos que partidas, para
+    # que unas empiecen cuando terminan otras
+    multiplexadas = {}
+    multiplexor = Multiplexor(comm, 3, semilla, CONFIGURACION)
+    if rank == 1:
+        multiplexor.acompanar()
+    else:
+        pendientes = [(e0, e1, i) for e0, e1 in PAREJAS for i in range(num_partidas)]
+        while pendientes or len(multiplexor):
+            while pendientes and multiplexor.libres:
+                multiplexor.alta(*pendientes.pop())
+            # Los índices se repiten entre parejas: se distinguen por la pareja
+            for indice, r in multiplexor.ronda():
+                multiplexadas[f"{r['estrategia_j0']}|{r['estrategia_j1']}|{indice}"] = r
+        multiplexor.cerrar()
+
+    agregador, _ = ejecutar_por_lotes(comm, PAREJAS, num_partidas, semilla=semilla, configuracion=CONFIGURACION)
+
+    if rank == 0:
+        lotes = {
+            f"{e0}|{e1}": {
+                campo: getattr(agregador.pareja(e0, e1), campo)
+                for campo in ("j0_gana", "j1_gana", "disparos_j0", "disparos_j1", "aciertos_j0", "aciertos_j1")
+            }
+            for e0, e1 in PAREJAS
+        }
+        with open(ruta, "w") as f:
+            json.dump({"pareja": pareja_mpi, "multiplexado": multiplexadas, "lotes": lotes}, f)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+RegistroEventos: reaplicar los disparos registrados sobre los tableros base rehace los
+tableros del final de la partida, también tras dar la vuelta al buffer circular, tras
+fusionar los registros de los dos jugadores y tras guardarlo y cargarlo.
+"""
+
+import random
+
+import pytest
+
+import tablero
+from configuracion import Configuracion
+from constantes import ESTRATEGIAS
+from eventos import RegistroEventos
+from jugador import Jugador
+
+CONFIGURACION = Configuracion(10, (5, 4, 3, 3, 2))
+NOMBRES = ("optimizada2", "aleatoria")
+
+
+def celdas(t):
+    return dict(t.celdas) if isinstance(t.celdas, tablero.CeldasDispersas) else bytes(t.celdas)
+
+
+def jugar(capacidad, semilla=1):
+    """
+    Juega una partida local registrando los disparos en un registro común y en uno
+    por receptor (como los dos ranks de una partida por MPI).
+
+    Returns:
+        (jugadores, registro común, registros por receptor, último turno)
+    """
+    rng = random.Random(semilla)
+    jugadores = [
+        Jugador(ESTRATEGIAS[nombre].desde_configuracion(CONFIGURACION, rng=random.Random(rng.random())),
+                CONFIGURACION, rng=random.Random(rng.random()))
+        for nombre in NOMBRES
+    ]
+    tableros = [j.tablero for j in jugadores]
+    n = CONFIGURACION.board_size
+    comun = RegistroEventos(NOMBRES, tableros, n, capacidad)
+    por_receptor = [
+        RegistroEventos(NOMBRES, (tableros[0], None), n, capacidad),
+        RegistroEventos(NOMBRES, (None, tableros[1]), n, capacidad),
+    ]
+    turno = 0
+    while True:
+        atacante = turno % 2
+        x, y = jugadores[atacante].siguiente_disparo()
+        resultado = jugadores[1 - atacante].recibir_disparo(x, y)
+        jugadores[atacante].registrar_resultado_disparo(x, y, resultado)
+        comun.anotar(turno, atacante, x, y, resultado)
+        por_receptor[1 - atacante].anotar(turno, atacante, x, y, resultado)
+        if resultado == "FIN":
+            return jugadores, comun, por_receptor, turno
+        turno += 1
+
+
+@pytest.mark.parametrize("capacidad", [100000, 16])
+def test_reconstruye_tablero_final(capacidad):
+    jugadores, registro, _, ultimo = jugar(capacidad)
+    for j in (0, 1):
+        assert celdas(registro.tablero_en(j, ultimo)) == celdas(jugadores[j].tablero)
+
+
+def test_recorrer_termina_en_tablero_final():
+    jugadores, registro, _, _ = jugar(100000)
+    finales = {}
+    for evento, t in registro.recorrer():
+        finales[1 - int(evento["atacante"])] = celdas(t)
+    assert finales == {j: celdas(jugadores[j].tablero) for j in (0, 1)}
+
+
+def test_turno_fuera_del_buffer():
+    _, registro, _, ultimo = jugar(16)
+    assert registro.turno_base > 0
+    with pytest.raises(ValueError):
+        registro.tablero_en(0, 0)
+    registro.tablero_en(0, ultimo)
+
+
+@pytest.mark.parametrize("capacidad", [100000, 16])
+def test_fusionar_registros_de_los_dos_jugadores(capacidad):
+    jugadores, _, (registro, otro), ultimo = jugar(capacidad)
+    registro.fusionar(otro)
+    for j in (0, 1):
+        assert celdas(registro.tablero_en(j, ultimo)) == celdas(jugadores[j].tablero)
+
+
+@pytest.mark.parametrize("disperso", [False, True])
+def test_guardar_y_cargar(tmp_path, monkeypatch, disperso):
+    monkeypatch.setattr(tablero, "UMBRAL_TABLERO_DISPERSO", 1 if disperso else None)
+    jugadores, registro, _, ultimo = jugar(100000)
+    ruta = tmp_path / "registro.npz"
+    registro.guardar(ruta)
+    cargado = RegistroEventos.cargar(ruta)
+    assert cargado.total == registro.total
+    for j in (0, 1):
+        assert isinstance(cargado.bases[j].celdas, tablero.CeldasDispersas) == disperso
+        assert celdas(cargado.tablero_en(j, ultimo)) == celdas(jugadores[j].tablero)
@@ -0,0 +1,85 @@
+"""
+Colocación de flotas: las flotas válidas respetan tamaños, límites y separación, y las
+imposibles fallan con ValueError en lugar de buscar sin fin.
+"""
+
+import random
+
+import pytest
+
+import flota
+from flota import ColocadorFlota, generar_flotas
+
+
+def comprobar_flota(colocada, board_size, tamanos):
+    assert [len(barco) for barco in colocada] == list(tamanos)
+    casillas = {}
+    for k, barco in enumerate(colocada):
+        xs = {x for x, _ in barco}
+        ys = {y for _, y in barco}
+        # Casillas consecutivas en una fila o una columna
+        assert len(xs) == 1 or len(ys) == 1
+        assert len(set(barco)) == len(barco)
+        assert max(len(xs), len(ys)) == len(barco)
+        for x, y in barco:
+            assert 0 <= x < board_size and 0 <= y < board_size
+            casillas[(x, y)] = k
+    # Ningún barco toca a otro, ni en diagonal
+    for (x, y), k in casillas.items():
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                assert casillas.get((x + dx, y + dy), k) == k
+
+
+@pytest.mark.parametrize("board_size, tamanos", [
+    (10, (5, 4, 3, 3, 2)),
+    (20, (5, 4, 3, 3, 2)),
+    (6, (3, 2, 2)),
+    (8, (4, 4, 4, 4, 4, 4)),   # ajustada: necesita backtracking
+])
+def test_flotas_validas(board_size, tamanos):
+    colocador = ColocadorFlota(board_size, tamanos, random.Random(3))
+    for _ in range(20):
+        comprobar_flota(colocador.colocar(), board_size, tamanos)
+
+
+def test_flotas_uniformes_validas():
+    colocador = ColocadorFlota(10, (5, 4, 3, 3, 2), random.Random(5))
+    for _ in range(10):
+        comprobar_flota(colocador.colocar(uniforme=True), 10, (5, 4, 3, 3, 2))
+
+
+def test_misma_semilla_misma_flota():
+    for uniforme in (False, True):
+        a = ColocadorFlota(10, (5, 4, 3, 3, 2), random.Random(9)).colocar(uniforme)
+        b = ColocadorFlota(10, (5, 4, 3, 3, 2), random.Random(9)).colocar(uniforme)
+        assert a == b
+
+
+def test_generar_flotas():
+    for colocada in generar_flotas(5, (4, 3, 2), 10):
+        comprobar_flota(colocada, 10, (4, 3, 2))
+
+
+@pytest.mark.parametrize("board_size, tamanos", [
+    (3, (4,)),              # el barco no cabe en el tablero
+    (5, (5, 5, 5, 5)),      # descartada por área
+])
+def test_flota_imposible_por_comprobacion_previa(board_size, tamanos):
+    with pytest.raises(ValueError):
+        ColocadorFlota(board_size, tamanos)
+
+
+def test_flota_imposible_por_busqueda():
+    # Pasa la comprobación de área, pero la búsqueda agota el árbol
+    colocador = ColocadorFlota(4, (3, 3, 1), random.Random(0))
+    with pytest.raises(ValueError):
+        colocador.colocar()
+
+
+def test_busqueda_limitada(monkeypatch):
+    # Sin solución y con un árbol enorme: falla al agotar el presupuesto de nodos
+    monkeypatch.setattr(flota, "MAX_NODOS_BUSQUEDA", 200)
+    colocador = ColocadorFlota(10, (4,) * 8 + (3, 3), random.Random(0))
+    with pytest.raises(ValueError, match="200 colocaciones"):
+        colocador.colocar()
@@ -0,0 +1,110 @@
+"""
+Con la misma semilla, una partida da el mismo resultado en todos los modos de
+ejecución: motor local, lotes, pareja en memoria compartida y, con mpiexec, pareja por
+MPI, partidas multiplexadas y lotes repartidos entre ranks.
+"""
+
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+from configuracion import Configuracion
+from motor import jugar_partida_local
+from lotes import jugar_lote
+from partida import ParejaMemoria
+from transporte import ARQUITECTURAS_ORDENADAS
+
+SEMILLA = 2024
+NUM_PARTIDAS = 4
+PAREJAS = [("optimizada2", "optimizada"), ("aleatoria", "densidad")]
+CONFIGURACION = Configuracion(10, (4, 3, 2))
+
+CAMPOS = ("ganador", "turnos", "disparos_j0", "aciertos_j0", "disparos_j1", "aciertos_j1")
+
+
+def resumen(r):
+    return {campo: int(r[campo]) for campo in CAMPOS}
+
+
+@pytest.fixture(scope="module")
+def locales():
+    return {
+        (e0, e1, i): resumen(jugar_partida_local(e0, e1, i, SEMILLA, CONFIGURACION))
+        for e0, e1 in PAREJAS
+        for i in range(NUM_PARTIDAS)
+    }
+
+
+def test_local_es_reproducible(locales):
+    for (e0, e1, i), esperado in locales.items():
+        assert resumen(jugar_partida_local(e0, e1, i, SEMILLA, CONFIGURACION)) == esperado
+
+
+def test_lotes_igual_que_local(locales):
+    for e0, e1 in PAREJAS:
+        registros = jugar_lote(e0, e1, range(NUM_PARTIDAS), SEMILLA, CONFIGURACION)
+        for i, registro in enumerate(registros):
+            assert resumen(registro) == locales[(e0, e1, i)]
+
+
+@pytest.mark.skipif(
+    platform.machine().lower() not in ARQUITECTURAS_ORDENADAS,
+    reason="el transporte en memoria compartida solo funciona en x86",
+)
+def test_pareja_memoria_igual_que_local(locales):
+    with ParejaMemoria() as pareja:
+        for (e0, e1, i), esperado in locales.items():
+            assert resumen(pareja.jugar(e0, e1, indice=i, semilla=SEMILLA, configuracion=CONFIGURACION)) == esperado
+
+
+@pytest.fixture(scope="module")
+def resultados_mpi(tmp_path_factory):
+    mpiexec = shutil.which("mpiexec")
+    if mpiexec is None:
+        pytest.skip("mpiexec no está disponible")
+    ruta = tmp_path_factory.mktemp("mpi") / "resultados.json"
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    entorno = dict(
+        os.environ,
+        PYTHONPATH=raiz,
+        # Open MPI se niega a lanzar como root o con más procesos que CPUs sin esto
+        OMPI_ALLOW_RUN_AS_ROOT="1",
+        OMPI_ALLOW_RUN_AS_ROOT_CONFIRM="1",
+        OMPI_MCA_rmaps_base_oversubscribe="1",
+    )
+    proceso = subprocess.run(
+        [mpiexec, "-n", "2", sys.executable, os.path.join(raiz, "tests", "mpi_partidas.py"),
+         str(ruta), str(SEMILLA), str(NUM_PARTIDAS)],
+        env=entorno, cwd=raiz, capture_output=True, text=True, timeout=600,
+    )
+    assert proceso.returncode == 0, proceso.stderr[-2000:]
+    with open(ruta) as f:
+        return json.load(f)
+
+
+def test_pareja_mpi_igual_que_local(locales, resultados_mpi):
+    for (e0, e1, i), esperado in locales.items():
+        assert resumen(resultados_mpi["pareja"][f"{e0}|{e1}|{i}"]) == esperado
+
+
+def test_multiplexado_igual_que_local(locales, resultados_mpi):
+    assert len(resultados_mpi["multiplexado"]) == len(locales)
+    for (e0, e1, i), esperado in locales.items():
+        assert resumen(resultados_mpi["multiplexado"][f"{e0}|{e1}|{i}"]) == esperado
+
+
+def test_lotes_mpi_igual_que_local(locales, resultados_mpi):
+    for e0, e1 in PAREJAS:
+        partidas = [r for (a, b, _), r in locales.items() if (a, b) == (e0, e1)]
+        esperado = {
+            "j0_gana": sum(r["ganador"] == 0 for r in partidas),
+            "j1_gana": sum(r["ganador"] == 1 for r in partidas),
+            **{campo: sum(r[campo] for r in partidas)
+               for campo in ("disparos_j0", "disparos_j1", "aciertos_j0", "aciertos_j1")},
+        }
+        assert resultados_mpi["lotes"][f"{e0}|{e1}"] == esperado
@@ -0,0 +1,461 @@
+"""
+transporte.py
+
+Capa de transporte bajo el protocolo de disparos y resultados de una partida.
+
+El canal de protocolo.py y jugar_una_partida() no usan MPI directamente, sino un
+Transporte con estas operaciones: enviar un buffer binario, esperar a poder reutilizar
+el buffer de un envío, iniciar una recepción (una petición con Test() y Wait(), como
+las de mpi4py), y enviar y recibir objetos de Python serializados con pickle (las
+estadísticas y el registro de eventos del final de la partida). Hay dos
+implementaciones:
+
+- TransporteMPI: el camino de siempre, con Isend/Irecv de mpi4py sobre un comunicador
+  de la pareja.
+- TransporteMemoria: dos procesos del mismo nodo lanzados sin mpirun (ver
+  partida.ParejaMemoria) que se comunican por dos anillos de bytes en memoria compartida
+  (multiprocessing.shared_memory), uno por sentido.
+
+Cada AnilloMemoria es un buffer circular de un productor y un consumidor: el productor
+copia los bytes y publica después el contador de bytes escritos, y el consumidor lee
+hasta ese contador y publica el de bytes leídos. Para esperar, el consumidor comprueba
+el anillo ESPERA_ACTIVA veces y, si sigue vacío, marca que está dormido y se bloquea en
+un semáforo que el productor solo libera si ve la marca. Con una sola CPU, cada
+comprobación cede la CPU (os.sched_yield()) para que el otro proceso pueda escribir: es
+mucho más barato que dormir en el semáforo, que obliga a despertar al consumidor en
+cada mensaje. Si el anillo se llena, el
+productor espera a que se vacíe comprobándolo con pausas cortas; solo ocurre con
+mensajes más grandes que el anillo.
+
+Los mensajes del transporte en memoria se entregan en el orden en que se envían: en
+una partida cada sentido lleva siempre los mensajes en el orden en que el otro jugador
+los espera, así que la etiqueta solo se comprueba.
+
+El orden entre la copia de los datos y la publicación del contador se basa en que x86
+no reordena escrituras entre sí ni lecturas entre sí; en otras arquitecturas (ARM,
+POWER...) el consumidor podría ver el contador antes que los datos y haría falta una
+barrera que Python no expone. Por eso crear_transportes_memoria() se niega a crear los
+anillos fuera de x86: allí hay que usar el transporte MPI.
+
+Clases:
+- Transporte: interfaz común.
+- TransporteMPI: transporte sobre un comunicador MPI.
+- AnilloMemoria: buffer circular de bytes en memoria compartida.
+- TransporteMemoria: transporte sobre dos anillos en memoria compartida.
+
+Funciones:
+- crear_transportes_memoria(): crea los anillos y los transportes de los dos jugadores.
+"""
+
+import os
+import pickle
+import platform
+import struct
+import time
+from abc import ABC, abstractmethod
+import multiprocessing
+from multiprocessing import shared_memory
+
+from constantes import CAPACIDAD_ANILLO, ESPERA_ACTIVA
+
+# Cabecera de un anillo: bytes escritos, bytes leídos y marca de consumidor dormido
+# (enteros de 64 bits), seguidos de los datos a partir de INICIO_DATOS
+INICIO_DATOS = 64
+
+# Plazo del semáforo: si un aviso se pierde, el consumidor vuelve a mirar el anillo
+PLAZO_BLOQUEO = 0.001
+
+# Pausa del productor mientras el anillo está lleno
+PAUSA_ANILLO_LLENO = 50e-6
+
+# Con una sola CPU, cada comprobación de la espera activa cede la CPU al otro proceso
+CEDER_CPU = len(os.sched_getaffinity(0)) < 2 if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1) < 2
+
+# Arquitecturas (platform.machine()) que no reordenan escrituras entre sí, de las que
+# depende la publicación de los anillos
+ARQUITECTURAS_ORDENADAS = ("x86_64", "amd64", "i386", "i686", "x86")
+
+# Cabecera de un mensaje en memoria: longitud y etiqueta (dos enteros de 32 bits)
+CABECERA = struct.Struct("<II")
+TAM_CABECERA = CABECERA.size
+
+
+class Transporte(ABC):
+    """
+    Transporte punto a punto entre los dos jugadores de una partida.
+    """
+
+    rank = None     # 0 o 1: jugador de este extremo
+
+    @abstractmethod
+    def enviar(self, buffer, etiqueta):
+        """
+        Envía un buffer binario (array de NumPy). El buffer no se debe modificar hasta
+        llamar a liberar_envio() con la misma etiqueta.
+        """
+
+    def liberar_envio(self, etiqueta):
+        """
+        Espera a que se complete el último envío con la etiqueta, para poder reutilizar
+        su buffer.
+        """
+
+    @abstractmethod
+    def iniciar_recepcion(self, buffer, etiqueta):
+        """
+        Inicia la recepción de un mensaje en el buffer y devuelve una petición con
+        Test() (True si ya ha llegado) y Wait() (espera a que llegue).
+        """
+
+    def recibir(self, buffer, etiqueta):
+        self.iniciar_recepcion(buffer, etiqueta).Wait()
+
+    @abstractmethod
+    def enviar_objeto(self, objeto, etiqueta):
+        """
+        Envía un objeto de Python serializado con pickle.
+        """
+
+    @abstractmethod
+    def recibir_objeto(self, etiqueta):
+        """
+        Recibe un objeto enviado con enviar_objeto().
+        """
+
+    def cerrar(self):
+        """
+        Completa los envíos pendientes. Se llama al terminar la partida.
+        """
+
+
+class TransporteMPI(Transporte):
+    """
+    Transporte sobre un comunicador MPI en el que los jugadores son los ranks 0 y 1.
+    """
+
+    def __init__(self, comm):
+        self.comm = comm
+        self.rank = comm.Get_rank()
+        self.destino = 1 - self.rank
+        self.envios = {}    # Último envío (Request) de cada etiqueta
+
+    def enviar(self, buffer, etiqueta):
+        self.envios[etiqueta] = self.comm.Isend(buffer, dest=self.destino, tag=etiqueta)
+
+    def liberar_envio(self, etiqueta):
+        envio = self.envios.pop(etiqueta, None)
+        if envio is not None:
+            envio.Wait()
+
+    def iniciar_recepcion(self, buffer, etiqueta):
+        return self.comm.Irecv(buffer, source=self.destino, tag=etiqueta)
+
+    def enviar_objeto(self, objeto, etiqueta):
+        self.comm.send(objeto, dest=self.destino, tag=etiqueta)
+
+    def recibir_objeto(self, etiqueta):
+        return self.comm.recv(source=self.destino, tag=etiqueta)
+
+    def cerrar(self):
+        for envio in self.envios.values():
+            envio.Wait()
+        self.envios.clear()
+
+
+class AnilloMemoria:
+    """
+    Buffer circular de bytes en memoria compartida entre un productor y un consumidor.
+
+    Se puede pasar a un proceso hijo: al deserializarse se vuelve a abrir por nombre.
+    """
+
+    __slots__ = ("memoria", "semaforo", "capacidad", "control", "datos", "propietario", "productor_vivo")
+
+    def __init__(self, capacidad=CAPACIDAD_ANILLO, nombre=None, semaforo=None, contexto=None):
+        """
+        Parámetros:
+            capacidad: bytes de datos del anillo.
+            nombre: nombre del segmento si ya existe; si no, se crea uno nuevo.
+            semaforo: semáforo del consumidor dormido (se crea con el anillo).
+            contexto: contexto de multiprocessing del proceso que usará el anillo, con
+                      el que se crea el semáforo (por defecto, el del sistema).
+        """
+        self.propietario = nombre is None
+        if self.propietario:
+            self.memoria = shared_memory.SharedMemory(create=True, size=INICIO_DATOS + capacidad)
+            self.memoria.buf[:INICIO_DATOS] = bytes(INICIO_DATOS)
+            contexto = contexto if contexto is not None else multiprocessing.get_context()
+            semaforo = contexto.Semaphore(0)
+        else:
+            self.memoria = shared_memory.SharedMemory(name=nombre)
+        self.semaforo = semaforo
+        self.capacidad = capacidad
+        self.control = self.memoria.buf[:24].cast("Q")
+        self.datos = self.memoria.buf[INICIO_DATOS:INICIO_DATOS + capacidad]
+        # Función opcional que indica si el productor sigue vivo; se consulta cada vez
+        # que vence el plazo del semáforo, para no esperar para siempre a un proceso muerto
+        self.productor_vivo = None
+
+    def __getstate__(self):
+        return self.capacidad, self.memoria.name, self.semaforo
+
+    def __setstate__(self, estado):
+        capacidad, nombre, semaforo = estado
+        self.__init__(capacidad, nombre, semaforo)
+
+    def abrir(self):
+        """
+        Devuelve otra vista del mismo anillo que no lo elimina al cerrarse.
+        """
+        return AnilloMemoria(self.capacidad, self.memoria.name, self.semaforo)
+
+    def disponibles(self):
+        """
+        Bytes escritos y aún no leídos.
+        """
+        return self.control[0] - self.control[1]
+
+    def escribir(self, *partes):
+        """
+        Copia las partes (objetos bytes-like de un byte por elemento) en el anillo y
+        las publica juntas, salvo que no quepan: entonces se publican por trozos
+        según se libera espacio.
+        """
+        control = self.control
+        capacidad = self.capacidad
+        cabeza = control[0]
+        for parte in partes:
+            parte = memoryview(parte).cast("B")
+            n = len(parte)
+            copiados = 0
+            while copiados < n:
+                libre = capacidad - (cabeza - control[1])
+                if not libre:
+                    # Anillo lleno: se publica lo copiado y se espera al consumidor
+                    control[0] = cabeza
+                    self._despertar()
+                    time.sleep(PAUSA_ANILLO_LLENO)
+                    continue
+                k = min(libre, n - copiados)
+                inicio = cabeza % capacidad
+                primera = min(k, capacidad - inicio)
+                self.datos[inicio:inicio + primera] = parte[copiados:copiados + primera]
+                if k > primera:
+                    self.datos[:k - primera] = parte[copiados + primera:copiados + k]
+                cabeza += k
+                copiados += k
+        control[0] = cabeza
+        self._despertar()
+
+    def _despertar(self):
+        if self.control[2]:
+            self.control[2] = 0
+            self.semaforo.release()
+
+    def esperar(self, n):
+        """
+        Espera a que haya al menos n bytes por leer: primero comprobándolo
+        ESPERA_ACTIVA veces y después bloqueado en el semáforo.
+        """
+        control = self.control
+        cola = control[1]
+        for _ in range(ESPERA_ACTIVA):
+            if control[0] - cola >= n:
+                return
+            if CEDER_CPU:
+                os.sched_yield()
+        while control[0] - cola < n:
+            control[2] = 1
+            if control[0] - cola >= n:
+                break
+            if not self.semaforo.acquire(timeout=PLAZO_BLOQUEO) and self.productor_vivo is not None:
+                if control[0] - cola < n and not self.productor_vivo():
+                    control[2] = 0
+                    raise RuntimeError("El otro proceso de la pareja ha terminado sin enviar el mensaje.")
+        control[2] = 0
+
+    def leer(self, destino):
+        """
+        Lee del anillo exactamente len(destino) bytes y los copia en destino (un
+        objeto bytes-like escribible), esperando a que lleguen si hace falta.
+        """
+        destino = memoryview(destino).cast("B")
+        control = self.control
+        capacidad = self.capacidad
+        n = len(destino)
+        leidos = 0
+        while leidos < n:
+            cola = control[1]
+            disponibles = control[0] - cola
+            if not disponibles:
+                self.esperar(1)
+                continue
+            k = min(disponibles, n - leidos)
+            inicio = cola % capacidad
+            primera = min(k, capacidad - inicio)
+            destino[leidos:leidos + primera] = self.datos[inicio:inicio + primera]
+            if k > primera:
+                destino[leidos + primera:leidos + k] = self.datos[:k - primera]
+            control[1] = cola + k
+            leidos += k
+
+    def enviar_mensaje(self, etiqueta, datos):
+        """
+        Escribe un mensaje: la cabecera (longitud, etiqueta) y los datos, un objeto
+        bytes-like de un byte por elemento.
+        """
+        control = self.control
+        capacidad = self.capacidad
+        n = len(datos)
+        total = TAM_CABECERA + n
+        cabeza = control[0]
+        inicio = cabeza % capacidad
+        # Camino rápido: hay sitio y el mensaje no da la vuelta al anillo
+        if inicio + total <= capacidad and capacidad - (cabeza - control[1]) >= total:
+            CABECERA.pack_into(self.datos, inicio, n, etiqueta)
+            self.datos[inicio + TAM_CABECERA:inicio + total] = datos
+            control[0] = cabeza + total
+            if control[2]:
+                self._despertar()
+        else:
+            self.escribir(CABECERA.pack(n, etiqueta), datos)
+
+    def recibir_mensaje(self, etiqueta, destino=None):
+        """
+        Lee el siguiente mensaje, que debe tener la etiqueta. Con destino (bytes-like
+        escribible de un byte por elemento) copia en él los datos, que deben ocupar
+        len(destino) bytes; sin él, los devuelve en un bytearray nuevo.
+        """
+        control = self.control
+        capacidad = self.capacidad
+        if destino is not None:
+            # Camino rápido: se espera el mensaje entero y se copia de una vez si no da
+            # la vuelta al anillo
+            total = TAM_CABECERA + len(destino)
+            if total <= capacidad:
+                self.esperar(total)
+                cola = control[1]
+                inicio = cola % capacidad
+                if inicio + total <= capacidad:
+                    longitud, recibida = CABECERA.unpack_from(self.datos, inicio)
+                    if recibida == etiqueta and longitud == len(destino):
+                        destino[:] = self.datos[inicio + TAM_CABECERA:inicio + total]
+                        control[1] = cola + total
+                        return destino
+
+        cabecera = bytearray(TAM_CABECERA)
+        self.leer(cabecera)
+        longitud, recibida = CABECERA.unpack(cabecera)
+        if recibida != etiqueta or (destino is not None and longitud != len(destino)):
+            esperado = f" y {len(destino)} bytes" if destino is not None else ""
+            raise RuntimeError(
+                f"Mensaje inesperado: etiqueta {recibida} y {longitud} bytes, "
+                f"se esperaba la etiqueta {etiqueta}{esperado}"
+            )
+        if destino is None:
+            destino = bytearray(longitud)
+        self.leer(destino)
+        return destino
+
+    def cerrar(self):
+        """
+        Libera la memoria del anillo; el proceso que lo creó además la elimina.
+        """
+        self.control.release()
+        self.datos.release()
+        self.memoria.close()
+        if self.propietario:
+            self.memoria.unlink()
+
+
+class PeticionMemoria:
+    """
+    Recepción pendiente de un mensaje de tamaño conocido en un TransporteMemoria.
+    """
+
+    __slots__ = ("transporte", "buffer", "etiqueta", "completada")
+
+    def __init__(self, transporte, buffer, etiqueta):
+        self.transporte = transporte
+        self.buffer = buffer
+        self.etiqueta = etiqueta
+        self.completada = False
+
+    def Test(self):
+        if not self.completada and self.transporte.entrada.disponibles() >= TAM_CABECERA + self.buffer.nbytes:
+            self.Wait()
+        return self.completada
+
+    def Wait(self):
+        if not self.completada:
+            self.transporte.leer_mensaje(self.buffer, self.etiqueta)
+            self.completada = True
+
+
+class TransporteMemoria(Transporte):
+    """
+    Transporte entre dos procesos del mismo nodo sobre dos anillos en memoria
+    compartida. Cada mensaje es una cabecera (longitud, etiqueta) seguida de los datos.
+    Los envíos copian el buffer en el anillo, así que se completan al volver.
+    """
+
+    def __init__(self, rank, salida, entrada):
+        """
+        Parámetros:
+            rank: jugador de este extremo (0 o 1).
+            salida: AnilloMemoria en el que escribe este jugador.
+            entrada: AnilloMemoria del que lee.
+        """
+        self.rank = rank
+        self.salida = salida
+        self.entrada = entrada
+
+    def enviar(self, buffer, etiqueta):
+        self.salida.enviar_mensaje(etiqueta, memoryview(buffer).cast("B"))
+
+    def leer_mensaje(self, buffer, etiqueta):
+        """
+        Lee el siguiente mensaje, que debe tener la etiqueta y el tamaño del buffer.
+        """
+        self.entrada.recibir_mensaje(etiqueta, memoryview(buffer).cast("B"))
+
+    def iniciar_recepcion(self, buffer, etiqueta):
+        return PeticionMemoria(self, buffer, etiqueta)
+
+    def enviar_objeto(self, objeto, etiqueta):
+        self.salida.enviar_mensaje(etiqueta, pickle.dumps(objeto, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def recibir_objeto(self, etiqueta):
+        return pickle.loads(self.entrada.recibir_mensaje(etiqueta))
+
+    def liberar(self):
+        """
+        Cierra los anillos de este extremo.
+        """
+        self.salida.cerrar()
+        self.entrada.cerrar()
+
+
+def crear_transportes_memoria(capacidad=CAPACIDAD_ANILLO, contexto=None):
+    """
+    Crea los dos anillos de una pareja y devuelve los transportes de los jugadores 0 y
+    1. El del jugador 1 se pasa al proceso hijo, lanzado con el mismo contexto de
+    multiprocessing.
+
+    Raises:
+        RuntimeError: si la máquina no es x86 (ver ARQUITECTURAS_ORDENADAS).
+    """
+    arquitectura = platform.machine()
+    if arquitectura.lower() not in ARQUITECTURAS_ORDENADAS:
+        raise RuntimeError(
+            f"El transporte en memoria compartida solo es seguro en x86 y esta máquina es "
+            f"{arquitectura or 'desconocida'}; usa el transporte MPI."
+        )
+    de_0_a_1 = AnilloMemoria(capacidad, contexto=contexto)
+    de_1_a_0 = AnilloMemoria(capacidad, contexto=contexto)
+    # El jugador 1 abre los anillos por nombre para no eliminarlos al cerrar, también
+    # si su proceso se crea con fork y hereda los objetos del jugador 0
+    return (
+        TransporteMemoria(0, de_0_a_1, de_1_a_0),
+        TransporteMemoria(1, de_1_a_0.abrir(), de_0_a_1.abrir()),
+    )